@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+try:
+    from audio_decode import DecodedAudio
+except ImportError:
+    from analyzer.audio_decode import DecodedAudio
+
+FRAME_SECONDS = 0.05
+# A frame is active when it is above the absolute floor and within the
+# relative range of the loudest frame; room noise and tape hiss sit below
+# both, and notes that quiet would fail clean_detected_notes' amplitude
+# floor anyway.
+ABSOLUTE_FLOOR_DBFS = -55.0
+RELATIVE_RANGE_DB = 45.0
+# Silences shorter than this stay inside a region: splitting them saves
+# less than one Basic Pitch window.
+MIN_SILENCE_SECONDS = 2.0
+PADDING_SECONDS = 0.5
+
+PredictFunction = Callable[[Any], Any]
+
+
+def active_regions(
+    samples: Any,
+    sample_rate: int,
+    *,
+    frame_seconds: float = FRAME_SECONDS,
+    absolute_floor_dbfs: float = ABSOLUTE_FLOOR_DBFS,
+    relative_range_db: float = RELATIVE_RANGE_DB,
+    min_silence_seconds: float = MIN_SILENCE_SECONDS,
+    padding_seconds: float = PADDING_SECONDS,
+) -> list[tuple[int, int]]:
+    """Sample ranges worth transcribing, padded and with short gaps merged."""
+    import numpy as np
+
+    samples = np.asarray(samples, dtype=np.float32)
+    frame = max(1, int(round(frame_seconds * sample_rate)))
+    frame_count = -(-len(samples) // frame)
+    if frame_count == 0:
+        return []
+    padded = np.zeros(frame_count * frame, dtype=np.float32)
+    padded[: len(samples)] = samples
+    power = np.mean(np.square(padded.reshape(frame_count, frame), dtype=np.float64), axis=1)
+    level = 10.0 * np.log10(np.maximum(power, 1e-12))
+    threshold = max(absolute_floor_dbfs, float(level.max()) - relative_range_db)
+    active = np.flatnonzero(level > threshold)
+    if not len(active):
+        return []
+
+    padding = int(round(padding_seconds * sample_rate))
+    min_gap_frames = max(1, int(round(min_silence_seconds / frame_seconds)))
+    breaks = np.flatnonzero(np.diff(active) > min_gap_frames)
+    firsts = np.concatenate([[active[0]], active[breaks + 1]])
+    lasts = np.concatenate([active[breaks], [active[-1]]])
+    return [
+        (max(0, int(first) * frame - padding), min(len(samples), (int(last) + 1) * frame + padding))
+        for first, last in zip(firsts, lasts)
+    ]
+
+
+def offset_event(event: Any, seconds: float) -> tuple[Any, ...]:
+    start, end, *rest = event
+    return (float(start) + seconds, float(end) + seconds, *rest)
+
+
+class GatedPredict:
+    """Run ``predict`` only on the active regions of decoded audio.
+
+    Silent intros, count-ins, gaps and fade-outs are left out of inference;
+    each region's note events are shifted back to song time. ``predict``
+    takes ``DecodedAudio`` (the warm model's ``predict``, or a
+    ``ChunkedPredict`` for long regions).
+
+    Calls keep the ``(model_output, midi_data, note_events)`` shape with
+    ``None`` for the first two values, as cache hits do. When ``predict``
+    reports ``last_diagnostics`` of its own, each region's report is kept in
+    ``last_region_diagnostics``.
+    """
+
+    def __init__(self, predict: PredictFunction) -> None:
+        self.predict = predict
+        self._local = threading.local()
+
+    @property
+    def last_diagnostics(self) -> dict[str, Any] | None:
+        """Gating report of the calling thread's most recent prediction."""
+        return getattr(self._local, "diagnostics", None)
+
+    @property
+    def last_region_diagnostics(self) -> list[dict[str, Any]]:
+        """``predict``'s own report for each region of that prediction, in order."""
+        return getattr(self._local, "region_diagnostics", [])
+
+    def __call__(self, audio: Any) -> Any:
+        if not hasattr(audio, "samples"):
+            raise TypeError("Activity gating needs decoded samples, not a file path.")
+        started = time.perf_counter()
+        regions = active_regions(audio.samples, audio.sample_rate)
+        note_events: list[Any] = []
+        region_diagnostics: list[dict[str, Any]] = []
+        for start, end in regions:
+            _, _, region_events = self.predict(
+                DecodedAudio(audio.path, audio.samples[start:end], audio.sample_rate)
+            )
+            report = getattr(self.predict, "last_diagnostics", None)
+            if report is not None:
+                region_diagnostics.append(report)
+            offset = start / audio.sample_rate
+            note_events.extend(offset_event(event, offset) for event in region_events)
+        note_events.sort(key=lambda event: (event[0], event[2]))
+
+        inference_seconds = time.perf_counter() - started
+        total = len(audio.samples)
+        inferred = sum(end - start for start, end in regions)
+        skipped_fraction = 1.0 - inferred / total if total else 0.0
+        self._local.region_diagnostics = region_diagnostics
+        self._local.diagnostics = {
+            "regions": [
+                [round(start / audio.sample_rate, 3), round(end / audio.sample_rate, 3)]
+                for start, end in regions
+            ],
+            "durationSeconds": round(total / audio.sample_rate, 3),
+            "inferredSeconds": round(inferred / audio.sample_rate, 3),
+            "skippedSeconds": round((total - inferred) / audio.sample_rate, 3),
+            "skippedFraction": round(skipped_fraction, 4),
+            "inferenceSeconds": round(inference_seconds, 4),
+            # Inference time scales with the audio it is given.
+            "estimatedSecondsSaved": round(
+                inference_seconds * skipped_fraction / max(1e-9, 1.0 - skipped_fraction),
+                4,
+            ) if inferred else 0.0,
+        }
+        return None, None, note_events
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import copy
+from collections.abc import MutableMapping, MutableSequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+
+
+class AnalysisContext:
+    """Per-request state and diagnostics for one analyzer call.
+
+    The V29-V73 chain keeps its working state in module-level names such as
+    ``v29.ACTIVE_HARMONY`` or ``v63._BEAM_DIAGNOSTICS``. Those names are now
+    scoped views that resolve to the active context, so requests served
+    concurrently by one container each see only their own state.
+    """
+
+    def __init__(self) -> None:
+        self._slots: dict[str, Any] = {}
+
+    def slot(self, name: str, factory: Callable[[], Any]) -> Any:
+        try:
+            return self._slots[name]
+        except KeyError:
+            value = self._slots[name] = factory()
+            return value
+
+    def slot_names(self) -> list[str]:
+        return sorted(self._slots)
+
+    def scoped_state(self) -> dict[str, dict[str, Any]]:
+        """Copies of every ``ScopedState`` value, e.g. to hand to a worker process."""
+        return {
+            name: copy.deepcopy(value)
+            for name, value in self._slots.items()
+            if isinstance(value, dict)
+        }
+
+    @classmethod
+    def from_scoped_state(cls, state: dict[str, dict[str, Any]]) -> AnalysisContext:
+        context = cls()
+        context._slots.update(copy.deepcopy(state))
+        return context
+
+    def list_lengths(self) -> dict[str, int]:
+        """The current length of every ``ScopedList``, to pass to ``take_appended``."""
+        return {
+            name: len(value)
+            for name, value in self._slots.items()
+            if isinstance(value, list)
+        }
+
+    def take_appended(self, lengths: dict[str, int]) -> dict[str, tuple[int, list[Any]]]:
+        """Remove what each ``ScopedList`` gained since ``lengths`` and return it.
+
+        Each list's entries come back with the position the first of them
+        had, so ``append_taken`` can renumber them.
+        """
+        taken: dict[str, tuple[int, list[Any]]] = {}
+        for name, value in self._slots.items():
+            if not isinstance(value, list):
+                continue
+            start = lengths.get(name, 0)
+            if len(value) > start:
+                taken[name] = (start, value[start:])
+                del value[start:]
+        return taken
+
+    def append_taken(self, taken: dict[str, tuple[int, list[Any]]]) -> None:
+        """Append entries from ``take_appended``, possibly another process's.
+
+        The chain numbers its diagnostics by their position in the list
+        (``phraseIndex`` or ``windowIndex``); entries numbered that way are
+        renumbered for their new position.
+        """
+        for name, (start, entries) in taken.items():
+            items = self.slot(name, list)
+            for offset, entry in enumerate(entries):
+                if isinstance(entry, dict):
+                    entry = dict(entry)
+                    for key in ("phraseIndex", "windowIndex"):
+                        if entry.get(key) == start + offset:
+                            entry[key] = len(items)
+                items.append(entry)
+
+
+# Direct, single-threaded calls (benchmarks, check scripts) keep the old
+# module-global behaviour by sharing this fallback context.
+_PROCESS_CONTEXT = AnalysisContext()
+_ACTIVE_CONTEXT: ContextVar[AnalysisContext | None] = ContextVar(
+    "analysis_context",
+    default=None,
+)
+
+
+def current_context() -> AnalysisContext:
+    return _ACTIVE_CONTEXT.get() or _PROCESS_CONTEXT
+
+
+@contextmanager
+def analysis_scope(
+    context: AnalysisContext | None = None,
+) -> Iterator[AnalysisContext]:
+    """Bind one request's context for the duration of an analyzer call.
+
+    Nested scopes reuse the context that is already active, so any layer of
+    the chain can open a scope without splitting the request's state.
+    """
+    active = _ACTIVE_CONTEXT.get()
+    if active is not None and (context is None or context is active):
+        yield active
+        return
+
+    context = context or AnalysisContext()
+    token = _ACTIVE_CONTEXT.set(context)
+    try:
+        yield context
+    finally:
+        _ACTIVE_CONTEXT.reset(token)
+
+
+class ScopedList(MutableSequence):
+    """Module-level list whose contents live in the active AnalysisContext."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def _items(self) -> list[Any]:
+        return current_context().slot(self.name, list)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._items()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self._items()[index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        del self._items()[index]
+
+    def __len__(self) -> int:
+        return len(self._items())
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._items())
+
+    def insert(self, index: int, value: Any) -> None:
+        self._items().insert(index, value)
+
+    def append(self, value: Any) -> None:
+        self._items().append(value)
+
+    def clear(self) -> None:
+        self._items().clear()
+
+    def __eq__(self, other: object) -> bool:
+        return self._items() == (list(other) if isinstance(other, ScopedList) else other)
+
+    def __repr__(self) -> str:
+        return f"ScopedList({self.name!r}, {self._items()!r})"
+
+
+class ScopedState(MutableMapping):
+    """Module-level state dict that starts from ``defaults`` in every context."""
+
+    def __init__(self, name: str, defaults: dict[str, Any]) -> None:
+        self.name = name
+        self.defaults = copy.deepcopy(defaults)
+
+    def _values(self) -> dict[str, Any]:
+        return current_context().slot(self.name, lambda: copy.deepcopy(self.defaults))
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values()[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        del self._values()[key]
+
+    def __len__(self) -> int:
+        return len(self._values())
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values())
+
+    def __repr__(self) -> str:
+        return f"ScopedState({self.name!r}, {self._values()!r})"
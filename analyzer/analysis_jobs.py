@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from typing import Any, Callable
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class InMemoryJobStore:
+    """Local stand-in for the ``modal.Dict`` that holds analyzer jobs.
+
+    Supports the subset of the Dict API the job helpers use (``get`` and item
+    assignment), so checks and local runs exercise the same code path.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._items.get(key, default)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._items
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class JobFailed(Exception):
+    """A job failure with the HTTP status the synchronous endpoint would return."""
+
+    def __init__(self, status_code: int, detail: str) -> None:
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def create_job(store: Any, request: dict[str, Any]) -> str:
+    """Record a queued job and return its id.
+
+    ``request`` is the non-secret summary kept alongside the job; tokens must
+    not be passed in.
+    """
+    job_id = uuid.uuid4().hex
+    store[job_id] = {
+        "jobId": job_id,
+        "status": QUEUED,
+        "request": dict(request),
+        "submittedAt": time.time(),
+    }
+    return job_id
+
+
+def job_status(store: Any, job_id: str) -> dict[str, Any] | None:
+    record = store.get(job_id)
+    return dict(record) if record is not None else None
+
+
+def _update(store: Any, job_id: str, **changes: Any) -> dict[str, Any]:
+    record = dict(store.get(job_id) or {"jobId": job_id})
+    record.update(changes)
+    store[job_id] = record
+    return record
+
+
+def run_job(
+    store: Any,
+    job_id: str,
+    work: Callable[[], dict[str, Any]],
+) -> dict[str, Any]:
+    """Run ``work`` for a queued job and record its result or failure."""
+    started = time.time()
+    _update(store, job_id, status=RUNNING, startedAt=started)
+    try:
+        result = work()
+    except JobFailed as error:
+        return _update(
+            store,
+            job_id,
+            status=FAILED,
+            error={"statusCode": error.status_code, "detail": error.detail},
+            finishedAt=time.time(),
+        )
+    except Exception as error:  # recorded for the poller instead of lost
+        return _update(
+            store,
+            job_id,
+            status=FAILED,
+            error={"statusCode": 500, "detail": f"Analysis failed: {type(error).__name__}"},
+            finishedAt=time.time(),
+        )
+    finished = time.time()
+    return _update(
+        store,
+        job_id,
+        status=SUCCEEDED,
+        result=result,
+        finishedAt=finished,
+        processingSeconds=round(finished - started, 3),
+    )
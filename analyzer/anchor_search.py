@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Hashable, Sequence
+
+try:
+    from beam_kernel import (
+        KERNEL_MIN_PAIRS,
+        Assignment,
+        MovementCost,
+        MovementTerms,
+        cost_matrix,
+        cost_vector,
+        movement_matrix,
+        movement_terms,
+    )
+except ImportError:
+    from analyzer.beam_kernel import (
+        KERNEL_MIN_PAIRS,
+        Assignment,
+        MovementCost,
+        MovementTerms,
+        cost_matrix,
+        cost_vector,
+        movement_matrix,
+        movement_terms,
+    )
+
+CandidateFunction = Callable[[list[dict[str, Any]], int], list[Assignment]]
+
+_UNBUILT = object()
+
+
+def identity_key(assignment: Assignment) -> tuple[tuple[int, int, int], ...]:
+    """Which note sits where; two anchors' candidates with this key are interchangeable."""
+    return tuple((id(note), int(string_index), int(fret)) for note, string_index, fret in assignment)
+
+
+class SharedWindowCosts:
+    """Anchor-independent work for one harmonic window, shared by its anchor searches.
+
+    Candidates for every anchor are generated up front, in anchor order.
+    Each group's candidates across all anchors form a union. Costs that do
+    not depend on the anchor are computed once over the union and sliced for
+    each anchor's candidates: named unary and pairwise terms, and the
+    registered movement cost's terms, to which each anchor only adds its own
+    anchor term.
+
+    Every anchor is still searched and pruned on its own, so each one's paths
+    are exactly those of a search run without the others.
+    """
+
+    def __init__(
+        self,
+        groups: Sequence[list[dict[str, Any]]],
+        anchors: Sequence[int],
+        previous_assignment: Assignment | None,
+        candidates_for: CandidateFunction,
+        movement_cost: MovementCost,
+    ) -> None:
+        self.anchor_count = len(anchors)
+        self.previous_assignment = previous_assignment
+        self.movement_cost = movement_cost
+        self.candidates = {
+            anchor: [candidates_for(group, anchor) for group in groups]
+            for anchor in anchors
+        }
+        self._unions: list[list[Assignment]] = []
+        self._positions: list[dict[Hashable, int]] = []
+        for group_index in range(len(groups)):
+            union: list[Assignment] = []
+            positions: dict[Hashable, int] = {}
+            for anchor in anchors:
+                for assignment in self.candidates[anchor][group_index]:
+                    key = identity_key(assignment)
+                    if key not in positions:
+                        positions[key] = len(union)
+                        union.append(assignment)
+            self._unions.append(union)
+            self._positions.append(positions)
+        self._vectors: dict[tuple[str, int], Any] = {}
+        self._matrices: dict[tuple[str, int], Any] = {}
+        self._movement: dict[int, Any] = {}
+
+    def _indices(self, group_index: int, assignments: Sequence[Assignment]) -> list[int]:
+        positions = self._positions[group_index]
+        return [positions[identity_key(assignment)] for assignment in assignments]
+
+    def vector(
+        self,
+        name: str,
+        group_index: int,
+        assignments: Sequence[Assignment],
+        cost: Callable[[Assignment], float],
+    ) -> Any:
+        """``cost`` for each of ``assignments``; ``cost`` must not depend on the anchor."""
+        key = (name, group_index)
+        if key not in self._vectors:
+            self._vectors[key] = cost_vector(self._unions[group_index], cost)
+        return self._vectors[key][self._indices(group_index, assignments)]
+
+    def matrix(
+        self,
+        name: str,
+        group_index: int,
+        priors: Sequence[Assignment],
+        assignments: Sequence[Assignment],
+        cost: Callable[[Assignment, Assignment], float],
+    ) -> Any:
+        """Anchor-independent ``cost`` from group ``group_index - 1`` candidates."""
+        import numpy as np
+
+        key = (name, group_index)
+        if key not in self._matrices:
+            self._matrices[key] = cost_matrix(
+                self._unions[group_index - 1],
+                self._unions[group_index],
+                cost,
+            )
+        return self._matrices[key][
+            np.ix_(self._indices(group_index - 1, priors), self._indices(group_index, assignments))
+        ]
+
+    def movement(
+        self,
+        group_index: int,
+        priors: Sequence[Assignment | None],
+        assignments: Sequence[Assignment],
+        anchor: int,
+    ) -> Any:
+        """The movement cost into ``assignments``; the first group moves from the
+        previous window's assignment."""
+        prior_union = [self.previous_assignment] if group_index == 0 else self._unions[group_index - 1]
+        terms = self._movement.get(group_index, _UNBUILT)
+        if terms is _UNBUILT:
+            pairs = len(prior_union) * len(self._unions[group_index]) * self.anchor_count
+            terms = (
+                movement_terms(self.movement_cost, prior_union, self._unions[group_index])
+                if pairs >= KERNEL_MIN_PAIRS
+                else None
+            )
+            self._movement[group_index] = terms
+        if terms is None:
+            return movement_matrix(self.movement_cost, priors, assignments, anchor)
+        rows = [0] * len(priors) if group_index == 0 else self._indices(group_index - 1, priors)
+        selected: MovementTerms = terms.take(rows, self._indices(group_index, assignments))
+        return selected.at_anchor(anchor)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import hashlib
+import subprocess
+import threading
+from typing import Any
+
+# Basic Pitch's native input: librosa.load(path, sr=22050, mono=True).
+MODEL_SAMPLE_RATE = 22050
+MODEL_CHANNELS = 1
+# The ``normalizedAudio`` block API clients have always received: the
+# 44.1 kHz stereo WAV ``normalize_audio_file`` produced. Decoding straight to
+# the model rate changed what inference reads, not this response contract.
+NORMALIZED_AUDIO_METADATA = {
+    "sampleRate": 44100,
+    "channels": 2,
+    "codec": "pcm_s16le",
+    "formatName": "wav",
+}
+READ_CHUNK_SAMPLES = 256 * 1024
+DECODE_TIMEOUT_SECONDS = 180
+
+
+class DecodedAudio:
+    """Mono float32 samples at the model rate, decoded straight from ffmpeg.
+
+    Replaces the 44.1 kHz stereo ``pcm_s16le`` WAV that ``normalize_audio_file``
+    wrote to disk only for Basic Pitch to resample it again. ``path`` is the
+    upload the samples came from and identifies the request's provider.
+    """
+
+    def __init__(self, path: str, samples: Any, sample_rate: int = MODEL_SAMPLE_RATE) -> None:
+        self.path = str(path)
+        self.samples = samples
+        self.sample_rate = int(sample_rate)
+        self._content_hash: str | None = None
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.samples) / float(self.sample_rate)
+
+    @property
+    def normalization(self) -> dict[str, Any]:
+        return {
+            "sampleRate": self.sample_rate,
+            "channels": MODEL_CHANNELS,
+            "codec": "pcm_f32le",
+        }
+
+    def content_hash(self) -> str:
+        if self._content_hash is None:
+            self._content_hash = hashlib.sha256(
+                memoryview(self.samples).cast("B")
+            ).hexdigest()
+        return self._content_hash
+
+    def metadata(self) -> dict[str, Any]:
+        """The ``normalizedAudio`` block, unchanged for API clients.
+
+        What the model was actually given is ``normalization``.
+        """
+        return dict(NORMALIZED_AUDIO_METADATA)
+
+
+def decode_for_inference(
+    source_path: str,
+    expected_seconds: float | None = None,
+    *,
+    max_seconds: float | None = None,
+    timeout: float = DECODE_TIMEOUT_SECONDS,
+) -> DecodedAudio:
+    """Stream ffmpeg's mono 22.05 kHz float32 output into one NumPy buffer.
+
+    ``expected_seconds`` (the probed duration) sizes the buffer up front so a
+    full upload is read without regrowing; the buffer still grows if ffmpeg
+    produces more samples than the container header promised.
+    ``max_seconds`` stops decoding after the opening of the upload.
+    """
+    import numpy as np
+
+    command = [
+        "ffmpeg",
+        "-v",
+        "error",
+        "-i",
+        source_path,
+        "-map",
+        "0:a:0",
+        "-vn",
+        *(["-t", f"{max_seconds:.3f}"] if max_seconds is not None else []),
+        "-ac",
+        str(MODEL_CHANNELS),
+        "-ar",
+        str(MODEL_SAMPLE_RATE),
+        "-f",
+        "f32le",
+        "-c:a",
+        "pcm_f32le",
+        "pipe:1",
+    ]
+    if max_seconds is not None:
+        expected_seconds = min(expected_seconds or max_seconds, max_seconds)
+    capacity = int((expected_seconds or 0.0) * MODEL_SAMPLE_RATE) + READ_CHUNK_SAMPLES
+    buffer = np.empty(capacity, dtype="<f4")
+    filled_bytes = 0
+
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    timed_out = threading.Event()
+
+    def kill() -> None:
+        timed_out.set()
+        process.kill()
+
+    timer = threading.Timer(timeout, kill)
+    timer.start()
+    try:
+        assert process.stdout is not None
+        while True:
+            if filled_bytes + READ_CHUNK_SAMPLES * 4 > buffer.nbytes:
+                buffer = np.resize(buffer, len(buffer) * 2)
+            view = memoryview(buffer).cast("B")[filled_bytes:]
+            read = process.stdout.readinto(view[: READ_CHUNK_SAMPLES * 4])
+            if not read:
+                break
+            filled_bytes += read
+        process.wait()
+    finally:
+        timer.cancel()
+        if process.stdout is not None:
+            process.stdout.close()
+
+    if timed_out.is_set():
+        raise ValueError("The uploaded audio normalization timed out.")
+    if process.returncode != 0:
+        raise ValueError("The uploaded audio could not be normalized.")
+    sample_count = filled_bytes // 4
+    if sample_count <= 0:
+        raise ValueError("The normalized audio file was not created.")
+    return DecodedAudio(source_path, buffer[:sample_count].astype(np.float32, copy=False))
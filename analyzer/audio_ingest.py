@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+import threading
+from typing import Any
+
+MAX_AUDIO_SIZE_BYTES = 50 * 1024 * 1024
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+DOWNLOAD_TIMEOUT_SECONDS = 120
+SESSION_POOL_SIZE = 16
+
+_SESSION: Any = None
+_SESSION_LOCK = threading.Lock()
+
+
+class AudioDownloadError(Exception):
+    """The upload could not be fetched from Blob storage."""
+
+    status_code = 502
+    detail = "The analyzer could not download the audio file."
+
+    def __init__(self, detail: str | None = None) -> None:
+        super().__init__(detail or self.detail)
+        self.detail = detail or self.detail
+
+
+class AudioTooLargeError(AudioDownloadError):
+    """The upload announced or streamed more than the size cap."""
+
+    status_code = 413
+    detail = "The uploaded audio cannot be larger than 50 MB."
+
+
+def shared_session() -> Any:
+    """Return the container-wide pooled ``requests.Session``.
+
+    Warm containers serve many uploads from the same Blob host, so keeping
+    the TLS connections alive saves a handshake per request.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=SESSION_POOL_SIZE,
+                    pool_maxsize=SESSION_POOL_SIZE,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _SESSION = session
+    return _SESSION
+
+
+def download_audio(
+    audio_url: str,
+    destination: str | os.PathLike[str],
+    headers: dict[str, str] | None = None,
+    *,
+    max_bytes: int = MAX_AUDIO_SIZE_BYTES,
+    session: Any = None,
+    chunk_bytes: int = DOWNLOAD_CHUNK_BYTES,
+    timeout: float = DOWNLOAD_TIMEOUT_SECONDS,
+) -> int:
+    """Stream an upload to ``destination`` in chunks and return its size.
+
+    The download is refused up front when ``Content-Length`` announces more
+    than ``max_bytes`` and aborted as soon as the streamed body crosses it, so
+    at most one chunk of the upload is ever held in memory.
+    """
+    import requests
+
+    session = session or shared_session()
+    written = 0
+    try:
+        with session.get(
+            audio_url,
+            headers=headers or {},
+            timeout=timeout,
+            stream=True,
+        ) as response:
+            if not response.ok:
+                raise AudioDownloadError()
+            announced = str(response.headers.get("Content-Length") or "").strip()
+            if announced.isdigit() and int(announced) > max_bytes:
+                raise AudioTooLargeError()
+
+            with open(destination, "wb") as output:
+                for chunk in response.iter_content(chunk_size=chunk_bytes):
+                    written += len(chunk)
+                    if written > max_bytes:
+                        raise AudioTooLargeError()
+                    output.write(chunk)
+    except requests.RequestException as error:
+        _discard(destination)
+        raise AudioDownloadError() from error
+    except AudioDownloadError:
+        _discard(destination)
+        raise
+    return written
+
+
+def _discard(path: str | os.PathLike[str]) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import threading
+import time
+import wave
+from typing import Any
+
+try:
+    from inference_batcher import WindowBatcher
+except ImportError:
+    from analyzer.inference_batcher import WindowBatcher
+
+WARMUP_SECONDS = 0.5
+WARMUP_SAMPLE_RATE = 22050
+
+# Mirrors basic_pitch.inference.run_inference and predict's defaults so the
+# batched path produces the same note events as ``predict(audio_path)``.
+N_OVERLAPPING_FRAMES = 30
+ONSET_THRESHOLD = 0.5
+FRAME_THRESHOLD = 0.3
+MINIMUM_NOTE_LENGTH_MS = 127.70
+MIDI_TEMPO = 120
+
+
+class BasicPitchModel:
+    """Container-wide Basic Pitch model, imported and loaded exactly once.
+
+    ``basic_pitch.inference.predict`` reloads the saved model from disk when it
+    is given a path, and importing ``basic_pitch`` pulls in TensorFlow. Both
+    costs used to land inside the first request of every container. Holding
+    the loaded model here lets a ``@modal.enter`` hook (or a memory snapshot)
+    pay them at startup, and every later prediction reuses the same model.
+
+    Predictions go through a ``WindowBatcher``: concurrent requests in one
+    container share forward passes over their audio windows, and each request
+    still decodes its own note events from its own rows.
+    """
+
+    def __init__(self) -> None:
+        self._model: Any = None
+        self.batcher = WindowBatcher(self.infer_windows)
+        self._lock = threading.Lock()
+        self.import_seconds: float | None = None
+        self.load_seconds: float | None = None
+        self.warmup_seconds: float | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> Any:
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                started = time.perf_counter()
+                from basic_pitch import ICASSP_2022_MODEL_PATH
+                from basic_pitch import inference
+
+                imported = time.perf_counter()
+                model_class = getattr(inference, "Model", None)
+                if model_class is not None:
+                    model = model_class(ICASSP_2022_MODEL_PATH)
+                else:
+                    # basic-pitch < 0.3 predicts straight from a TF SavedModel.
+                    import tensorflow as tf
+
+                    model = tf.saved_model.load(str(ICASSP_2022_MODEL_PATH))
+                self.import_seconds = imported - started
+                self.load_seconds = time.perf_counter() - imported
+                self._model = model
+        return self._model
+
+    def audio_windows(self, audio_path: str) -> tuple[Any, int]:
+        """Cut one file into Basic Pitch's overlapping model windows."""
+        import numpy as np
+        from basic_pitch import inference
+        from basic_pitch.constants import AUDIO_N_SAMPLES, FFT_HOP
+
+        overlap_len = N_OVERLAPPING_FRAMES * FFT_HOP
+        hop_size = AUDIO_N_SAMPLES - overlap_len
+        produced = inference.get_audio_input(audio_path, overlap_len, hop_size)
+        if isinstance(produced, tuple):
+            # basic-pitch < 0.3 returns every window in a single array.
+            windows, _, original_length = produced
+            return np.asarray(windows), int(original_length)
+        parts = []
+        original_length = 0
+        for window, _, original_length in produced:
+            parts.append(np.asarray(window))
+        return np.concatenate(parts, axis=0), int(original_length)
+
+    def sample_windows(self, samples: Any) -> tuple[Any, int]:
+        """Window already-decoded model-rate samples exactly like ``get_audio_input``."""
+        import numpy as np
+        from basic_pitch.constants import AUDIO_N_SAMPLES, FFT_HOP
+
+        overlap_len = N_OVERLAPPING_FRAMES * FFT_HOP
+        hop_size = AUDIO_N_SAMPLES - overlap_len
+        original_length = len(samples)
+        padded = np.concatenate(
+            [np.zeros(overlap_len // 2, dtype=np.float32), np.asarray(samples, dtype=np.float32)]
+        )
+        starts = range(0, len(padded), hop_size)
+        windows = np.zeros((len(starts), AUDIO_N_SAMPLES, 1), dtype=np.float32)
+        for index, start in enumerate(starts):
+            window = padded[start : start + AUDIO_N_SAMPLES]
+            windows[index, : len(window), 0] = window
+        return windows, original_length
+
+    def infer_windows(self, windows: Any) -> dict[str, Any]:
+        model = self.load()
+        if hasattr(model, "predict"):
+            return dict(model.predict(windows))
+        return {key: value.numpy() for key, value in model(windows).items()}
+
+    def decode(self, outputs: dict[str, Any], original_length: int) -> Any:
+        """Turn one request's window outputs into ``predict``'s return value."""
+        import numpy as np
+        from basic_pitch import inference
+        from basic_pitch import note_creation
+        from basic_pitch.constants import AUDIO_SAMPLE_RATE, FFT_HOP
+
+        model_output = {
+            key: inference.unwrap_output(value, original_length, N_OVERLAPPING_FRAMES)
+            for key, value in outputs.items()
+        }
+        min_note_len = int(
+            np.round(MINIMUM_NOTE_LENGTH_MS / 1000 * (AUDIO_SAMPLE_RATE / FFT_HOP))
+        )
+        midi_data, note_events = note_creation.model_output_to_notes(
+            model_output,
+            onset_thresh=ONSET_THRESHOLD,
+            frame_thresh=FRAME_THRESHOLD,
+            min_note_len=min_note_len,
+            min_freq=None,
+            max_freq=None,
+            multiple_pitch_bends=False,
+            melodia_trick=True,
+            midi_tempo=MIDI_TEMPO,
+        )
+        return model_output, midi_data, note_events
+
+    def predict(self, audio: Any) -> Any:
+        """Predict from a file path or from ``audio_decode.DecodedAudio`` samples."""
+        self.load()
+        if isinstance(audio, str):
+            windows, original_length = self.audio_windows(audio)
+        else:
+            windows, original_length = self.sample_windows(audio.samples)
+        return self.decode(self.batcher.run(windows), original_length)
+
+    def warm(self) -> dict[str, Any]:
+        """Load the model and trace it once on a short silent clip."""
+        self.load()
+        if self.warmup_seconds is None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                silence_path = os.path.join(temp_dir, "warmup.wav")
+                write_silence(silence_path, WARMUP_SECONDS, WARMUP_SAMPLE_RATE)
+                started = time.perf_counter()
+                self.predict(silence_path)
+                self.warmup_seconds = time.perf_counter() - started
+        return self.diagnostics()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "loaded": self.loaded,
+            "importSeconds": _rounded(self.import_seconds),
+            "modelLoadSeconds": _rounded(self.load_seconds),
+            "warmupSeconds": _rounded(self.warmup_seconds),
+            "batching": self.batcher.diagnostics(),
+        }
+
+
+def write_silence(path: str, seconds: float, sample_rate: int) -> None:
+    frames = int(seconds * sample_rate)
+    with wave.open(path, "wb") as output:
+        output.setnchannels(1)
+        output.setsampwidth(2)
+        output.setframerate(sample_rate)
+        output.writeframes(b"\x00\x00" * frames)
+
+
+def _rounded(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds, 4)
+
+
+_SHARED_MODEL = BasicPitchModel()
+
+
+def shared_model() -> BasicPitchModel:
+    return _SHARED_MODEL
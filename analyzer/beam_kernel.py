@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import statistics
+from typing import Any, Callable, Protocol, Sequence
+
+Assignment = list[tuple[dict[str, Any], int, int]]
+MovementCost = Callable[[Assignment | None, Assignment, int], float]
+
+
+class MovementTerms(Protocol):
+    """Anchor-independent part of a movement cost over (prior, current) pairs."""
+
+    def take(self, rows: list[int], columns: list[int]) -> MovementTerms: ...
+
+    def at_anchor(self, anchor: int) -> Any: ...
+
+
+MovementTermsBuilder = Callable[[Sequence[Assignment | None], Sequence[Assignment]], MovementTerms]
+
+# Scalar movement costs that have a vectorized equivalent; see
+# ``register_movement_terms``.
+_MOVEMENT_TERMS: dict[MovementCost, MovementTermsBuilder] = {}
+# Below this many (prior, candidate) pairs NumPy's per-call overhead costs
+# more than calling the scalar cost directly.
+KERNEL_MIN_PAIRS = 64
+
+
+class AssignmentFeatures:
+    """Per-assignment values the movement kernels reuse across a beam step.
+
+    ``string_frets`` maps string index to fret with the last note on a string
+    winning and -1 for unused strings, as ``dict`` construction does in the
+    scalar costs. ``string_counts`` counts every note on each string.
+    """
+
+    __slots__ = (
+        "size",
+        "fretted_center",
+        "mapped_center",
+        "string_mean",
+        "string_frets",
+        "string_counts",
+        "single",
+        "start",
+        "note_strings",
+        "note_ends",
+    )
+
+    def __init__(self, assignment: Assignment | None, width: int) -> None:
+        import numpy as np
+
+        assignment = assignment or []
+        self.size = len(assignment)
+        fretted = [int(fret) for _, _, fret in assignment if int(fret) > 0]
+        self.fretted_center = float(statistics.median(fretted)) if fretted else None
+        self.string_frets = np.full(width, -1, dtype=np.int64)
+        self.string_counts = np.zeros(width, dtype=np.int64)
+        for _, string_index, fret in assignment:
+            self.string_frets[int(string_index)] = int(fret)
+            self.string_counts[int(string_index)] += 1
+        mapped = [int(fret) for fret in self.string_frets if fret > 0]
+        self.mapped_center = float(statistics.median(mapped)) if mapped else None
+        strings = [int(string_index) for _, string_index, _ in assignment]
+        # Integer true division rounds exactly like statistics.mean on ints.
+        self.string_mean = sum(strings) / len(strings) if strings else 0.0
+        self.single = (
+            (int(assignment[0][0]["midi"]), int(assignment[0][1]), int(assignment[0][2]))
+            if self.size == 1
+            else None
+        )
+        self.start = min((float(note["start"]) for note, _, _ in assignment), default=0.0)
+        self.note_strings = strings
+        self.note_ends = [float(note.get("end") or note["start"]) for note, _, _ in assignment]
+
+
+def string_width(assignments: Sequence[Assignment | None]) -> int:
+    return 1 + max(
+        (int(string_index) for assignment in assignments for _, string_index, _ in assignment or []),
+        default=0,
+    )
+
+
+def register_movement_terms(cost: MovementCost, builder: MovementTermsBuilder) -> None:
+    """Declare ``builder`` as the vectorized form of the scalar ``cost``.
+
+    ``builder(priors, currents).at_anchor(anchor)`` must equal
+    ``[[cost(prior, current, anchor) for current in currents] for prior in priors]``
+    bit for bit, so the beam keeps the same paths in the same order.
+    """
+    _MOVEMENT_TERMS[cost] = builder
+
+
+def movement_terms(
+    cost: MovementCost,
+    priors: Sequence[Assignment | None],
+    currents: Sequence[Assignment],
+) -> MovementTerms | None:
+    """``cost``'s vectorized terms for these pairs, or ``None`` if it has none."""
+    builder = _MOVEMENT_TERMS.get(cost)
+    return builder(priors, currents) if builder is not None else None
+
+
+def cost_vector(candidates: Sequence[Any], cost: Callable[[Any], float]) -> Any:
+    import numpy as np
+
+    return np.fromiter((cost(candidate) for candidate in candidates), float, len(candidates))
+
+
+def cost_matrix(
+    rows: Sequence[Any],
+    columns: Sequence[Any],
+    cost: Callable[[Any, Any], float],
+) -> Any:
+    """``cost(row, column)`` for every pair, shaped ``(len(rows), len(columns))``."""
+    import numpy as np
+
+    return np.fromiter(
+        (cost(row, column) for row in rows for column in columns),
+        float,
+        len(rows) * len(columns),
+    ).reshape(len(rows), len(columns))
+
+
+def movement_matrix(
+    cost: MovementCost,
+    priors: Sequence[Assignment | None],
+    currents: Sequence[Assignment],
+    anchor: int,
+) -> Any:
+    """``cost(prior, current, anchor)`` for every pair, shaped ``(priors, currents)``.
+
+    Beam entries share their last assignment, so the matrix is built over the
+    distinct priors and expanded back to one row per entry. Costs without a
+    registered kernel, and steps smaller than ``KERNEL_MIN_PAIRS``, are
+    called pair by pair.
+    """
+    rows: dict[int, int] = {}
+    distinct: list[Assignment | None] = []
+    for prior in priors:
+        if id(prior) not in rows:
+            rows[id(prior)] = len(distinct)
+            distinct.append(prior)
+
+    builder = _MOVEMENT_TERMS.get(cost)
+    if builder is not None and len(distinct) * len(currents) >= KERNEL_MIN_PAIRS:
+        values = builder(distinct, currents).at_anchor(anchor)
+    else:
+        values = cost_matrix(distinct, currents, lambda prior, current: cost(prior, current, anchor))
+    return values[[rows[id(prior)] for prior in priors]]
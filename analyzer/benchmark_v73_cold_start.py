@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+
+# Runs in a fresh interpreter so module import is measured cold.
+PHASES = r"""
+import json, sys, time
+sys.path.insert(0, {script_dir!r})
+audio_path = {audio_path!r}
+report = {{}}
+
+started = time.perf_counter()
+import modal_analyzer_v73 as analyzer
+report["importSeconds"] = time.perf_counter() - started
+
+started = time.perf_counter()
+from resolved_pipeline import build_resolved_pipeline
+pipeline = build_resolved_pipeline(analyzer)
+report["pipelineResolveSeconds"] = time.perf_counter() - started
+
+from basic_pitch_model import shared_model
+from note_event_provider import NoteEventProvider
+if audio_path:
+    model = shared_model()
+    model.warm()
+    report["modelImportSeconds"] = model.import_seconds
+    report["modelLoadSeconds"] = model.load_seconds
+    report["modelWarmupSeconds"] = model.warmup_seconds
+    make_provider = lambda: NoteEventProvider(audio_path)
+else:
+    from check_phrase_beam_parity_v73 import stairway_note_events
+    report["modelLoadSeconds"] = None
+    report["model"] = "skipped: no --audio given, using synthetic note events"
+    audio_path = "stairway.wav"
+    events = stairway_note_events()
+    make_provider = lambda: NoteEventProvider(
+        audio_path, predict=lambda _path: (None, None, list(events))
+    )
+
+for label in ("firstRequestSeconds", "warmRequestSeconds"):
+    started = time.perf_counter()
+    pipeline.analyze(audio_path, {part!r}, make_provider())
+    report[label] = time.perf_counter() - started
+
+print("COLD_START_REPORT " + json.dumps(report))
+"""
+
+
+def run_cold_start(audio_path: str | None, part: str) -> dict[str, Any]:
+    code = PHASES.format(
+        script_dir=str(SCRIPT_DIR),
+        audio_path=audio_path,
+        part=part,
+    )
+    completed = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in completed.stdout.splitlines():
+        if line.startswith("COLD_START_REPORT "):
+            return json.loads(line.split(" ", 1)[1])
+    raise RuntimeError("Cold-start run did not report timings")
+
+
+def summarize(runs: list[dict[str, Any]]) -> dict[str, Any]:
+    summary: dict[str, Any] = {"runs": len(runs)}
+    for key, value in runs[0].items():
+        if isinstance(value, (int, float)):
+            values = sorted(float(run[key]) for run in runs)
+            summary[key] = {
+                "median": round(values[len(values) // 2], 4),
+                "max": round(values[-1], 4),
+            }
+        else:
+            summary[key] = value
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measure V73 cold start as separate import, model load and "
+            "first-request phases, each in a fresh interpreter."
+        )
+    )
+    parser.add_argument("--audio", help="Normalized audio file; loads the real Basic Pitch model.")
+    parser.add_argument("--part", default="lead", choices=["lead", "rhythm", "bass"])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [run_cold_start(args.audio, args.part) for _ in range(args.runs)]
+    print(json.dumps(summarize(runs), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import numpy as np  # noqa: E402
+
+from activity_gate import GatedPredict, active_regions  # noqa: E402
+from audio_decode import MODEL_SAMPLE_RATE, DecodedAudio  # noqa: E402
+from check_chunked_inference import (  # noqa: E402
+    CHUNK_SECONDS,
+    OVERLAP_SECONDS,
+    matches,
+    render,
+    toy_transcribe,
+)
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from chunked_inference import ChunkedPredict, chunk_spans, merge_chunk_diagnostics  # noqa: E402
+
+
+INTRO_SECONDS = 12.0
+BREAK_SECONDS = 6.0
+OUTRO_SECONDS = 20.0
+HISS_DBFS = -70.0
+
+
+def with_silence(events_a: list[Any], events_b: list[Any]) -> np.ndarray:
+    """Silent intro, song A, a long break, song B and a long silent tail."""
+    rng = np.random.default_rng(3)
+    parts = [
+        np.zeros(int(INTRO_SECONDS * MODEL_SAMPLE_RATE), np.float32),
+        render(events_a),
+        np.zeros(int(BREAK_SECONDS * MODEL_SAMPLE_RATE), np.float32),
+        render(events_b),
+        np.zeros(int(OUTRO_SECONDS * MODEL_SAMPLE_RATE), np.float32),
+    ]
+    samples = np.concatenate(parts)
+    hiss = rng.standard_normal(len(samples)).astype(np.float32) * 10 ** (HISS_DBFS / 20)
+    return samples + hiss
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    require(active_regions(np.zeros(MODEL_SAMPLE_RATE * 5, np.float32), MODEL_SAMPLE_RATE) == [], "Digital silence has no active region")
+
+    audio = DecodedAudio("gated.wav", with_silence(stairway_note_events(), gomyway_note_events()))
+    regions = active_regions(audio.samples, audio.sample_rate)
+    require(len(regions) == 2, f"Expected the two songs as regions, got {len(regions)}")
+    require(
+        abs(regions[0][0] / MODEL_SAMPLE_RATE - (INTRO_SECONDS - 0.5)) < 0.1,
+        "The first region does not start at the end of the intro (less padding)",
+    )
+
+    inferred_samples: list[int] = []
+
+    def predict(region: DecodedAudio) -> tuple[None, None, list[Any]]:
+        inferred_samples.append(len(region.samples))
+        return None, None, toy_transcribe(region.samples)
+
+    gated = GatedPredict(predict)
+    _, _, gated_events = gated(audio)
+    single = toy_transcribe(audio.samples)
+    report = gated.last_diagnostics
+
+    require(len(inferred_samples) == 2, "Inference did not run once per active region")
+    require(sum(inferred_samples) < len(audio.samples) * 0.7, "Gating did not shrink the inference input")
+    require(
+        matches(single, gated_events),
+        f"{len(gated_events)} gated notes do not match {len(single)} whole-file notes in song time",
+    )
+    require(
+        report["skippedSeconds"] >= INTRO_SECONDS + BREAK_SECONDS + OUTRO_SECONDS - 3.0,
+        f"Only {report['skippedSeconds']} s of silence were skipped",
+    )
+    require(report["estimatedSecondsSaved"] > 0, "Time saved was not reported")
+    print(
+        f"{report['durationSeconds']:.0f} s upload: inferred {report['inferredSeconds']:.1f} s in "
+        f"{len(report['regions'])} regions, skipped {report['skippedSeconds']:.1f} s "
+        f"({report['skippedFraction']:.0%}); {len(single)} notes in song time"
+    )
+
+    # A long upload with a gap is chunked once per region; its report covers both.
+    chunked = ChunkedPredict(
+        lambda chunks: map(toy_transcribe, chunks),
+        chunk_seconds=CHUNK_SECONDS,
+        overlap_seconds=OVERLAP_SECONDS,
+    )
+    gated_chunked = GatedPredict(chunked)
+    _, _, chunked_events = gated_chunked(audio)
+    region_reports = gated_chunked.last_region_diagnostics
+    chunking = merge_chunk_diagnostics(region_reports)
+    expected_chunks = [
+        len(chunk_spans(end - start, audio.sample_rate, CHUNK_SECONDS, OVERLAP_SECONDS))
+        for start, end in regions
+    ]
+    require(len(region_reports) == 2 and chunking["regionCount"] == 2, "Each region's chunking must be reported")
+    require(
+        chunking["chunkCount"] == sum(expected_chunks) > chunked.last_diagnostics["chunkCount"],
+        f"{chunking['chunkCount']} chunks reported for regions of {expected_chunks}",
+    )
+    require(
+        chunking["extendedAcrossBoundaries"] == sum(report["extendedAcrossBoundaries"] for report in region_reports)
+        and chunking["duplicatesRemoved"] == sum(report["duplicatesRemoved"] for report in region_reports),
+        "Stitching counts were not added up across regions",
+    )
+    require(len(chunked_events) > 0, "Gated chunked inference found no notes")
+    require(GatedPredict(predict).last_region_diagnostics == [], "A plain predict has no region reports")
+    print(
+        f"gated chunking: {chunking['chunkCount']} chunks over {chunking['regionCount']} regions, "
+        f"{chunking['extendedAcrossBoundaries']} joined across cuts"
+    )
+
+    try:
+        gated("song.wav")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Gated predict must refuse undecoded paths")
+
+    print("SILENCE-GATED INFERENCE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
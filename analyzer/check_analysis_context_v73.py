@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v29 as v29  # noqa: E402
+import modal_analyzer_v63 as v63  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from analysis_context import current_context  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+
+
+TIMING_KEYS = {"searchMilliseconds", "savedMilliseconds"}
+
+
+def without_timings(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: without_timings(item)
+            for key, item in value.items()
+            if key not in TIMING_KEYS
+        }
+    if isinstance(value, list):
+        return [without_timings(item) for item in value]
+    return value
+
+
+def run(name: str, transcription_type: str) -> str:
+    note_events = stairway_note_events() if name == "stairway" else gomyway_note_events()
+    provider = NoteEventProvider(
+        f"{name}.wav",
+        predict=lambda _path: (None, None, list(note_events)),
+    )
+    result = analyzer.analyze_audio_file(f"{name}.wav", transcription_type, provider)
+    return json.dumps(without_timings(result), sort_keys=True, default=str)
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    jobs = [
+        ("stairway", "lead"),
+        ("gomyway", "rhythm"),
+        ("stairway", "rhythm"),
+        ("gomyway", "lead"),
+    ]
+    sequential = [run(name, part) for name, part in jobs]
+
+    process_context = current_context()
+    require(
+        not process_context.slot_names(),
+        "V73 requests leaked state into the process-wide context",
+    )
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        concurrent = list(pool.map(lambda job: run(*job), jobs))
+
+    for job, alone, together in zip(jobs, sequential, concurrent):
+        require(alone == together, f"Concurrent {job} result differs from a solo run")
+
+    require(len(v63._BEAM_DIAGNOSTICS) == 0, "Beam diagnostics escaped their request")
+    require(
+        dict(v29.ACTIVE_HARMONY) == v29.ACTIVE_HARMONY.defaults,
+        "Active harmony escaped its request",
+    )
+    print("V73 REQUEST-SCOPED ANALYSIS CONTEXT PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
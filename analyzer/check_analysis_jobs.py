@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from analysis_jobs import (  # noqa: E402
+    FAILED,
+    QUEUED,
+    SUCCEEDED,
+    InMemoryJobStore,
+    JobFailed,
+    create_job,
+    job_status,
+    run_job,
+)
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+TIMING_KEYS = {"searchMilliseconds", "savedMilliseconds"}
+
+
+def without_timings(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: without_timings(item)
+            for key, item in value.items()
+            if key not in TIMING_KEYS
+        }
+    if isinstance(value, list):
+        return [without_timings(item) for item in value]
+    return value
+
+
+def fingerprint(result: dict[str, Any]) -> str:
+    return json.dumps(without_timings(result), sort_keys=True, default=str)
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+
+    def analyze(name: str, part: str) -> dict[str, Any]:
+        events = fixtures[name]
+        provider = NoteEventProvider(
+            f"{name}.wav",
+            predict=lambda _path: (None, None, list(events)),
+        )
+        return analyzer.to_json_safe(pipeline.analyze(f"{name}.wav", part, provider))
+
+    store = InMemoryJobStore()
+    jobs = {
+        ("stairway", "lead"): None,
+        ("gomyway", "rhythm"): None,
+    }
+    for name, part in jobs:
+        job_id = create_job(store, {"audioUrl": f"https://blob/{name}.mp3", "transcriptionType": part})
+        jobs[(name, part)] = job_id
+        record = job_status(store, job_id)
+        require(record is not None and record["status"] == QUEUED, "Submitted job is not queued")
+        require("token" not in json.dumps(record), "Job record leaked a credential")
+
+    # Submission returns immediately; the work runs in the background.
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        for (name, part), job_id in jobs.items():
+            pool.submit(run_job, store, job_id, lambda name=name, part=part: analyze(name, part))
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            states = {job_status(store, job_id)["status"] for job_id in jobs.values()}
+            if states == {SUCCEEDED}:
+                break
+            time.sleep(0.05)
+
+    for (name, part), job_id in jobs.items():
+        record = job_status(store, job_id)
+        require(record["status"] == SUCCEEDED, f"Job for {name} {part} did not finish")
+        require(
+            fingerprint(record["result"]) == fingerprint(analyze(name, part)),
+            f"Polled result for {name} {part} differs from a direct run",
+        )
+        require(record["processingSeconds"] >= 0, "Job timing missing")
+
+    def rejected() -> dict[str, Any]:
+        raise JobFailed(413, "The uploaded audio cannot be larger than 50 MB.")
+
+    failed_id = create_job(store, {"transcriptionType": "bass"})
+    record = run_job(store, failed_id, rejected)
+    require(record["status"] == FAILED, "Rejected job was not marked failed")
+    require(record["error"]["statusCode"] == 413, "Rejected job lost its status code")
+
+    crashed_id = create_job(store, {"transcriptionType": "lead"})
+    record = run_job(store, crashed_id, lambda: {}["missing"])
+    require(
+        record["status"] == FAILED and record["error"]["statusCode"] == 500,
+        "Crashed job was not recorded as a server error",
+    )
+
+    require(job_status(store, "no-such-job") is None, "Unknown job ids must not resolve")
+    print("ASYNC ANALYZER JOB LIFECYCLE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import math
+import shutil
+import struct
+import sys
+import tempfile
+import wave
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from audio_decode import MODEL_SAMPLE_RATE, DecodedAudio, decode_for_inference  # noqa: E402
+from inference_cache import CachedPredict, NoteEventCache  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+
+
+# The block the WAV-normalizing endpoints returned, which clients still read.
+NORMALIZED_AUDIO = {"sampleRate": 44100, "channels": 2, "codec": "pcm_s16le", "formatName": "wav"}
+
+
+class RecordingPredict:
+    def __init__(self) -> None:
+        self.sources: list[Any] = []
+
+    def __call__(self, source: Any) -> tuple[Any, Any, list[Any]]:
+        self.sources.append(source)
+        return None, None, [(0.0, 0.5, 60, 0.7, None)]
+
+
+def write_stereo_tone(path: Path, seconds: float, sample_rate: int = 44100) -> None:
+    frames = bytearray()
+    for index in range(int(seconds * sample_rate)):
+        value = int(12000 * math.sin(2 * math.pi * 220 * index / sample_rate))
+        frames += struct.pack("<hh", value, value)
+    with wave.open(str(path), "wb") as output:
+        output.setnchannels(2)
+        output.setsampwidth(2)
+        output.setframerate(sample_rate)
+        output.writeframes(bytes(frames))
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    samples = np.sin(np.linspace(0, 440 * np.pi, MODEL_SAMPLE_RATE * 3)).astype(np.float32)
+    decoded = DecodedAudio("upload.m4a", samples)
+    same = DecodedAudio("other-name.m4a", samples.copy())
+    require(decoded.content_hash() == same.content_hash(), "Sample hash depends on the file name")
+    require(decoded.metadata() == NORMALIZED_AUDIO, "normalizedAudio changed for API clients")
+    require(decoded.normalization["sampleRate"] == MODEL_SAMPLE_RATE, "normalization must describe the model input")
+    require(abs(decoded.duration_seconds - 3.0) < 1e-9, "Decoded duration drifted")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        predict = RecordingPredict()
+        cache = NoteEventCache(str(Path(temp_dir) / "cache"), max_bytes=1024 * 1024)
+        cached = CachedPredict(predict, cache, model_version="fixture-model")
+
+        first = NoteEventProvider("upload.m4a", cached, audio=decoded)
+        second = NoteEventProvider("other-name.m4a", cached, audio=same)
+        require(
+            [list(event[:3]) for event in first.note_events()]
+            == [list(event[:3]) for event in second.note_events()],
+            "Decoded requests disagree",
+        )
+        require(len(predict.sources) == 1, "Identical samples did not share one inference")
+        require(predict.sources[0] is decoded, "Inference did not receive the decoded buffer")
+        require(cache.hits == 1 and cache.misses == 1, "Decoded-audio cache accounting drifted")
+
+        if shutil.which("ffmpeg") is None:
+            print("ffmpeg not on PATH; skipping the live decode comparison")
+        else:
+            source = Path(temp_dir) / "tone.wav"
+            write_stereo_tone(source, 3.0)
+            live = decode_for_inference(str(source), 3.0)
+            require(live.samples.dtype == np.float32, "Decoded buffer is not float32")
+            require(
+                abs(len(live.samples) - 3 * MODEL_SAMPLE_RATE) <= MODEL_SAMPLE_RATE // 100,
+                "Decoded buffer is not 22.05 kHz mono",
+            )
+            require(0.3 < float(np.max(np.abs(live.samples))) < 0.4, "Decoded level drifted")
+            try:
+                decode_for_inference(str(Path(temp_dir) / "missing.wav"))
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("A failed decode was not reported")
+
+    print("MODEL-RATE AUDIO DECODE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
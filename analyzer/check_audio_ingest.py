@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from audio_ingest import (  # noqa: E402
+    AudioDownloadError,
+    AudioTooLargeError,
+    download_audio,
+    shared_session,
+)
+
+
+UPLOAD_BYTES = 24 * 1024 * 1024
+SERVE_CHUNK = bytes(range(256)) * 256  # 64 KiB
+CLIENT_PORTS: set[int] = set()
+
+
+class BlobHandler(BaseHTTPRequestHandler):
+    """Serves generated bodies so the server never holds an upload either."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *_args: object) -> None:
+        return
+
+    def do_GET(self) -> None:
+        CLIENT_PORTS.add(self.client_address[1])
+        if self.path == "/missing.mp3":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.path == "/announced-huge.mp3":
+            self.send_response(200)
+            self.send_header("Content-Length", str(80 * 1024 * 1024))
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        if self.path == "/unannounced.mp3":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            sent = 0
+            try:
+                while sent < UPLOAD_BYTES:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(SERVE_CHUNK), SERVE_CHUNK))
+                    sent += len(SERVE_CHUNK)
+                self.wfile.write(b"0\r\n\r\n")
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True
+            return
+
+        self.send_header("Content-Length", str(UPLOAD_BYTES))
+        self.end_headers()
+        for _ in range(UPLOAD_BYTES // len(SERVE_CHUNK)):
+            self.wfile.write(SERVE_CHUNK)
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BlobHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            destination = Path(temp_dir) / "uploaded.mp3"
+
+            # Warm the session first so pool setup is not counted as upload memory.
+            download_audio(f"{base_url}/song.mp3", destination)
+            tracemalloc.start()
+            size = download_audio(f"{base_url}/song.mp3", destination)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            require(size == UPLOAD_BYTES, "Streamed size drifted")
+            require(destination.stat().st_size == UPLOAD_BYTES, "Streamed file is incomplete")
+            require(
+                peak < UPLOAD_BYTES // 8,
+                f"Download held {peak} bytes for a {UPLOAD_BYTES}-byte upload",
+            )
+            print(f"{UPLOAD_BYTES // (1024 * 1024)} MB upload streamed with {peak / 1024:.0f} KiB peak")
+
+            require(
+                len(CLIENT_PORTS) == 1,
+                "Warm downloads did not reuse the pooled connection",
+            )
+            require(shared_session() is shared_session(), "Session is not shared")
+
+            try:
+                download_audio(f"{base_url}/announced-huge.mp3", destination)
+            except AudioTooLargeError as error:
+                require(error.status_code == 413, "Oversize upload must map to 413")
+            else:
+                raise AssertionError("Content-Length over the cap was accepted")
+
+            try:
+                download_audio(
+                    f"{base_url}/unannounced.mp3",
+                    destination,
+                    max_bytes=4 * 1024 * 1024,
+                )
+            except AudioTooLargeError:
+                require(not destination.exists(), "Partial oversize upload was left on disk")
+            else:
+                raise AssertionError("Streamed body over the cap was accepted")
+
+            try:
+                download_audio(f"{base_url}/missing.mp3", destination)
+            except AudioTooLargeError:
+                raise AssertionError("A failed download was reported as too large")
+            except AudioDownloadError as error:
+                require(error.status_code == 502, "Failed download must map to 502")
+            else:
+                raise AssertionError("A 404 download was accepted")
+    finally:
+        server.shutdown()
+
+    print("STREAMING SIZE-CAPPED AUDIO INGEST PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
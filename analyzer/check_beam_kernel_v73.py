@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import beam_kernel  # noqa: E402
+import modal_analyzer_v28 as v28  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import phrase_viterbi  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+class CheckedTerms:
+    """Movement terms that compare every anchor's matrix with the scalar cost."""
+
+    def __init__(self, spy: KernelSpy, terms: Any, priors: list[Any], currents: list[Any]) -> None:
+        self.spy = spy
+        self.terms = terms
+        self.priors = priors
+        self.currents = currents
+
+    def take(self, rows: list[int], columns: list[int]) -> CheckedTerms:
+        return CheckedTerms(
+            self.spy,
+            self.terms.take(rows, columns),
+            [self.priors[row] for row in rows],
+            [self.currents[column] for column in columns],
+        )
+
+    def at_anchor(self, anchor: int) -> Any:
+        values = self.terms.at_anchor(anchor)
+        expected = [
+            [v28.held_shape_transition_cost(prior, current, anchor) for current in self.currents]
+            for prior in self.priors
+        ]
+        require(values.tolist() == expected, "The movement kernel differs from the scalar cost")
+        self.spy.matrices += 1
+        self.spy.pairs += len(self.priors) * len(self.currents)
+        return values
+
+
+class KernelSpy:
+    """Build the registered movement terms, checking each anchor's matrix."""
+
+    def __init__(self) -> None:
+        self.builds = 0
+        self.matrices = 0
+        self.pairs = 0
+
+    def __call__(self, priors: list[Any], currents: list[Any]) -> CheckedTerms:
+        self.builds += 1
+        return CheckedTerms(self, v28.held_shape_transition_terms(priors, currents), list(priors), list(currents))
+
+
+def wide_step() -> tuple[list[Any], list[Any]]:
+    """48 three-note priors against 48 three-note candidates."""
+    priors: list[Any] = []
+    currents: list[Any] = []
+    for index in range(48):
+        frets = [index % 7, (index * 3) % 9, (index * 5) % 11]
+        priors.append([
+            ({"midi": 50 + string, "start": 0.0, "end": 0.6 + 0.1 * (index % 3)}, string + index % 3, fret)
+            for string, fret in enumerate(frets)
+        ])
+        currents.append([
+            ({"midi": 52 + string, "start": 0.5}, (string * 2 + index) % 6, (fret + index) % 12)
+            for string, fret in enumerate(frets)
+        ])
+    return priors, currents
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+    spy = KernelSpy()
+    beam_kernel.register_movement_terms(v28.held_shape_transition_cost, spy)
+    # Every step, however small, and both chord and single-note windows go
+    # through the kernel here.
+    min_pairs = beam_kernel.KERNEL_MIN_PAIRS
+    beam_kernel.KERNEL_MIN_PAIRS = 0
+    is_monophonic = phrase_viterbi.is_monophonic
+    phrase_viterbi.is_monophonic = lambda groups: False
+    try:
+        for name, events in fixtures.items():
+            for part in ("lead", "rhythm"):
+                pipeline.analyze(
+                    f"{name}.wav",
+                    part,
+                    NoteEventProvider(f"{name}.wav", predict=lambda _path, events=events: (None, None, list(events))),
+                )
+    finally:
+        phrase_viterbi.is_monophonic = is_monophonic
+        beam_kernel.KERNEL_MIN_PAIRS = min_pairs
+        beam_kernel.register_movement_terms(v28.held_shape_transition_cost, v28.held_shape_transition_terms)
+
+    require(spy.matrices > 0, "The beam never used the movement kernel")
+    print(
+        f"{spy.builds} shared term stacks, {spy.matrices} anchor matrices, "
+        f"{spy.pairs} (prior, candidate) pairs: bit-identical"
+    )
+
+    # The fixtures' steps are small; a full 48 x 48 chord step is where the
+    # kernel pays off.
+    priors, currents = wide_step()
+    started = time.perf_counter()
+    values = v28.held_shape_transition_matrix(priors, currents, 5)
+    kernel_ms = (time.perf_counter() - started) * 1000
+    started = time.perf_counter()
+    expected = [[v28.held_shape_transition_cost(prior, current, 5) for current in currents] for prior in priors]
+    scalar_ms = (time.perf_counter() - started) * 1000
+    require(values.tolist() == expected, "The wide step differs from the scalar cost")
+    print(f"{len(priors)} x {len(currents)} step: kernel {kernel_ms:.1f} ms vs scalar {scalar_ms:.1f} ms")
+
+    # Beam entries sharing a last assignment share one kernel row; the root
+    # row and an unregistered cost take the scalar path's values too.
+    note = {"midi": 64, "start": 0.0, "end": 0.5}
+    chord = [(note, 2, 2), ({"midi": 69, "start": 0.0, "end": 0.5}, 3, 2)]
+    single = [({"midi": 64, "start": 0.25, "end": 0.5}, 1, 5)]
+    priors = [chord, None, chord, single]
+    values = beam_kernel.movement_matrix(v28.held_shape_transition_cost, priors, [single, chord], 5)
+    expected = [[v28.held_shape_transition_cost(prior, current, 5) for current in (single, chord)] for prior in priors]
+    require(values.tolist() == expected, "Shared rows or the root row drifted")
+    fallback = beam_kernel.movement_matrix(lambda prior, current, anchor: len(prior or []) - anchor, priors, [single], 1)
+    require(fallback.tolist() == [[1.0], [-1.0], [1.0], [0.0]], "Unregistered costs must be called per pair")
+
+    print("V73 VECTORIZED BEAM COST KERNEL PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
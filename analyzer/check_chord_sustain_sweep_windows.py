@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from chord_sustain import (  # noqa: E402
+    build_soft_register_windows,
+    prepare_harmonic_events,
+    register_weight,
+)
+
+
+def scan_soft_register_windows(
+    events: list[dict[str, Any]],
+    window_seconds: float = 0.46,
+    hop_seconds: float = 0.08,
+) -> list[dict[str, Any]]:
+    """All-events scan kept as the parity reference for the sweep line."""
+    if not events:
+        return []
+
+    last = max(float(event["end"]) for event in events)
+    windows: list[dict[str, Any]] = []
+    cursor = min(float(event["start"]) for event in events)
+    index = 0
+    while cursor <= last:
+        window_end = cursor + window_seconds
+        active = [
+            event
+            for event in events
+            if float(event["start"]) < window_end
+            and float(event["end"]) > cursor
+        ]
+        if active:
+            support: Counter[int] = Counter()
+            weighted_duration: Counter[int] = Counter()
+            raw_duration: Counter[int] = Counter()
+            for event in active:
+                pitch_class = int(event["pitchClass"])
+                overlap = max(
+                    0.0,
+                    min(float(event["end"]), window_end)
+                    - max(float(event["start"]), cursor),
+                )
+                support[pitch_class] += 1
+                raw_duration[pitch_class] += overlap
+                weighted_duration[pitch_class] += overlap * register_weight(int(event["midi"]))
+            windows.append({
+                "windowIndex": index,
+                "start": cursor,
+                "end": window_end,
+                "eventCount": len(active),
+                "uniqueMidiCount": len({int(event["midi"]) for event in active}),
+                "midis": sorted({int(event["midi"]) for event in active}),
+                "pitchClasses": sorted(support),
+                "rankedPitchClasses": sorted(
+                    support,
+                    key=lambda pitch_class: (
+                        weighted_duration[pitch_class],
+                        raw_duration[pitch_class],
+                        support[pitch_class],
+                    ),
+                    reverse=True,
+                ),
+                "pitchClassSupport": {str(key): value for key, value in support.items()},
+                "pitchClassWeightedDuration": {
+                    str(key): round(value, 4)
+                    for key, value in weighted_duration.items()
+                },
+                "maximumEventDuration": max(
+                    float(event.get("duration") or 0.0) for event in active
+                ),
+            })
+        cursor += hop_seconds
+        index += 1
+    return windows
+
+
+def random_song(seed: int, seconds: float) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    notes: list[dict[str, Any]] = []
+    cursor = 0.0
+    while cursor < seconds:
+        for _ in range(rng.randint(1, 5)):
+            start = cursor + rng.choice([0.0, 0.01, 0.04])
+            notes.append({
+                "start": round(start, 4),
+                "end": round(start + rng.choice([0.0, 0.12, 0.3, 0.9, 2.4]), 4),
+                "midi": rng.randint(28, 88),
+                "amplitude": 0.7,
+            })
+        cursor += rng.choice([0.08, 0.16, 0.25, 0.5, 1.3])
+    # Production event lists are not guaranteed to be start-sorted.
+    rng.shuffle(notes)
+    return notes
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    require(build_soft_register_windows([]) == [], "Empty input produced windows")
+
+    for seed in range(6):
+        events = prepare_harmonic_events(random_song(seed, 40.0))
+        require(
+            build_soft_register_windows(events) == scan_soft_register_windows(events),
+            f"Sweep-line windows drifted from the full scan (seed {seed})",
+        )
+        require(
+            build_soft_register_windows(events, 0.3, 0.05)
+            == scan_soft_register_windows(events, 0.3, 0.05),
+            f"Custom window and hop drifted from the full scan (seed {seed})",
+        )
+
+    # A 15-minute upload must stay linear in song length.
+    long_events = prepare_harmonic_events(random_song(99, 15 * 60.0))
+    started = time.perf_counter()
+    windows = build_soft_register_windows(long_events)
+    elapsed = time.perf_counter() - started
+    require(len(windows) > 10_000, "Long-song fixture did not cover a full upload")
+    print(f"{len(long_events)} events -> {len(windows)} windows in {elapsed:.2f}s")
+
+    print("CHORD SUSTAIN SWEEP-LINE WINDOWS PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import numpy as np  # noqa: E402
+
+from audio_decode import MODEL_SAMPLE_RATE, DecodedAudio  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from chunked_inference import (  # noqa: E402
+    ONSET_TOLERANCE_SECONDS,
+    ChunkedPredict,
+    chunk_spans,
+    stitch_note_events,
+)
+
+
+# A small spectral transcriber stands in for Basic Pitch: like the model it
+# only sees the samples it is given, so chunk edges cut notes the same way.
+FRAME = 4096
+HOP = 256
+PITCHES = np.arange(36, 90)
+MIN_FRAMES = 5
+# Short chunks with a thin overlap so sustained notes really cross the cuts.
+CHUNK_SECONDS = 3.0
+OVERLAP_SECONDS = 0.5
+
+
+def render(events: list[Any]) -> np.ndarray:
+    end = max(float(event[1]) for event in events) + 1.0
+    samples = np.zeros(int(end * MODEL_SAMPLE_RATE), dtype=np.float32)
+    for start, stop, pitch, amplitude, _ in events:
+        first = int(start * MODEL_SAMPLE_RATE)
+        count = int((stop - start) * MODEL_SAMPLE_RATE)
+        time_axis = np.arange(count) / MODEL_SAMPLE_RATE
+        frequency = 440.0 * 2 ** ((pitch - 69) / 12)
+        samples[first : first + count] += float(amplitude) * np.sin(2 * np.pi * frequency * time_axis)
+    return samples
+
+
+def toy_transcribe(samples: np.ndarray) -> list[tuple[float, float, int, float, None]]:
+    padded = np.concatenate([np.zeros(FRAME // 2, np.float32), samples, np.zeros(FRAME // 2, np.float32)])
+    frames = np.lib.stride_tricks.sliding_window_view(padded, FRAME)[::HOP]
+    frequencies = 440.0 * 2 ** ((PITCHES - 69) / 12)
+    basis = np.hanning(FRAME)[:, None] * np.exp(
+        -2j * np.pi * np.arange(FRAME)[:, None] * frequencies[None, :] / MODEL_SAMPLE_RATE
+    )
+    magnitude = np.abs(frames @ basis) / (FRAME / 4)
+    neighbours = np.maximum(
+        np.pad(magnitude[:, :-1], ((0, 0), (1, 0))),
+        np.pad(magnitude[:, 1:], ((0, 0), (0, 1))),
+    )
+    active = (magnitude > 0.25) & (magnitude >= neighbours)
+
+    events = []
+    for column, pitch in enumerate(PITCHES):
+        edges = np.diff(np.concatenate([[0], active[:, column].astype(np.int8), [0]]))
+        for first, last in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+            if last - first >= MIN_FRAMES:
+                events.append((
+                    first * HOP / MODEL_SAMPLE_RATE,
+                    last * HOP / MODEL_SAMPLE_RATE,
+                    int(pitch),
+                    round(float(magnitude[first:last, column].mean()), 3),
+                    None,
+                ))
+    return events
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def matches(single: list[Any], stitched: list[Any]) -> bool:
+    if len(single) != len(stitched):
+        return False
+    unmatched = list(stitched)
+    for start, end, pitch, *_ in single:
+        match = next(
+            (
+                other
+                for other in unmatched
+                if other[2] == pitch
+                and abs(other[0] - start) <= ONSET_TOLERANCE_SECONDS
+                and abs(other[1] - end) <= ONSET_TOLERANCE_SECONDS
+            ),
+            None,
+        )
+        if match is None:
+            return False
+        unmatched.remove(match)
+    return True
+
+
+def main() -> None:
+    spans = chunk_spans(MODEL_SAMPLE_RATE * 20, MODEL_SAMPLE_RATE, 8.0, 2.0)
+    require([span.start for span in spans] == [0, 6 * MODEL_SAMPLE_RATE, 12 * MODEL_SAMPLE_RATE], "Chunk starts drifted")
+    require(spans[-1].end == MODEL_SAMPLE_RATE * 20 and spans[-1].cut_end is None, "Last chunk must run to the end")
+    require(spans[1].own_start == spans[0].own_end == 7.0, "Own regions must meet mid-overlap")
+    require(len(chunk_spans(MODEL_SAMPLE_RATE * 5, MODEL_SAMPLE_RATE)) == 1, "Short uploads must stay one chunk")
+
+    # Only a boundary's double sighting is collapsed. A tremolo in the middle
+    # of a chunk, and one inside an overlap but kept from a single chunk,
+    # stay separate notes.
+    tremolo = [(2.0, 2.03, 64, 0.8, None), (2.03, 2.06, 64, 0.8, None), (2.06, 2.2, 64, 0.8, None)]
+    near_cut = [(6.9, 6.93, 60, 0.8, None), (6.93, 6.96, 60, 0.8, None)]
+    boundary = [(6.97, 7.4, 67, 0.8, None)]
+    first_chunk = [*tremolo, *near_cut, *boundary]
+    # The second chunk starts at 6 s and sees the boundary note 40 ms late.
+    second_chunk = [(1.01, 1.4, 67, 0.8, None)]
+    stitched, counts = stitch_note_events([first_chunk, second_chunk, []], spans, MODEL_SAMPLE_RATE)
+    require(
+        [note[:3] for note in stitched if note[2] == 64] == [event[:3] for event in tremolo],
+        "A fast repeat in the middle of a chunk was merged",
+    )
+    require(len([note for note in stitched if note[2] == 60]) == 2, "Repeats kept from one chunk were merged")
+    require(
+        len([note for note in stitched if note[2] == 67]) == 1 and counts["duplicatesRemoved"] == 1,
+        "A note seen by both chunks of a boundary was not collapsed",
+    )
+
+    with ProcessPoolExecutor(max_workers=4) as pool:
+        chunked = ChunkedPredict(
+            lambda chunks: pool.map(toy_transcribe, chunks),
+            chunk_seconds=CHUNK_SECONDS,
+            overlap_seconds=OVERLAP_SECONDS,
+        )
+        fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+        for name, fixture in fixtures.items():
+            audio = DecodedAudio(f"{name}.wav", render(fixture))
+            started = time.perf_counter()
+            single = toy_transcribe(audio.samples)
+            single_ms = (time.perf_counter() - started) * 1000
+
+            model_output, midi_data, stitched = chunked(audio)
+            report = chunked.last_diagnostics
+            require(model_output is None and midi_data is None, "Chunked predict changed its return shape")
+            require(report["chunkCount"] > 2, f"{name}: fixture did not span several chunks")
+            require(report["extendedAcrossBoundaries"] > 0, f"{name}: no note crossed a chunk cut")
+            require(
+                matches(single, stitched),
+                f"{name}: {len(stitched)} stitched notes do not match {len(single)} single-pass notes",
+            )
+            print(
+                f"{name}: {audio.duration_seconds:.0f} s in {report['chunkCount']} chunks, "
+                f"{len(single)} notes, {report['extendedAcrossBoundaries']} joined across cuts, "
+                f"{report['duplicatesRemoved']} duplicates dropped; "
+                f"single pass {single_ms:.0f} ms, chunked {report['inferenceSeconds'] * 1000:.0f} ms"
+            )
+
+    try:
+        chunked("song.wav")
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Chunked predict must refuse undecoded paths")
+
+    print("CHUNKED LONG-AUDIO INFERENCE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
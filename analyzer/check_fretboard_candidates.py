@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import itertools
+import random
+import statistics
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v25 as v25  # noqa: E402
+from fretboard_candidates import playable_combinations  # noqa: E402
+
+engine = v25.engine
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def loop_positions(midi: int, transcription_type: str) -> list[tuple[int, int]]:
+    positions: list[tuple[int, int]] = []
+    for string_index, (_, open_pitch) in enumerate(engine.get_tuning(transcription_type)):
+        fret = midi - open_pitch
+        if 0 <= fret <= engine.MAX_FRET:
+            positions.append((string_index, fret))
+    return positions
+
+
+def loop_combinations(
+    options: list[list[tuple[int, int]]],
+    max_string_span: int,
+    max_fret_span: int,
+    limit: int | None = None,
+) -> list[tuple[int, ...]]:
+    survivors: list[tuple[int, ...]] = []
+    ranges = [range(len(slot)) for slot in options]
+    for tested, row in enumerate(itertools.product(*ranges), start=1):
+        if limit is not None and tested > limit:
+            break
+        strings = [options[slot][index][0] for slot, index in enumerate(row)]
+        if len(set(strings)) != len(strings):
+            continue
+        if max(strings) - min(strings) > max_string_span:
+            continue
+        frets = [options[slot][index][1] for slot, index in enumerate(row)]
+        fretted = [fret for fret in frets if fret > 0]
+        if fretted and max(fretted) - min(fretted) > max_fret_span:
+            continue
+        survivors.append(row)
+    return survivors
+
+
+def legacy_all_group_assignments(
+    group: list[dict[str, Any]],
+    transcription_type: str,
+    anchor: int,
+) -> list[list[tuple[dict[str, Any], int, int]]]:
+    note_options: list[list[tuple[dict[str, Any], int, int]]] = []
+    for note in sorted(group, key=lambda item: int(item["midi"]), reverse=True):
+        ranked = []
+        for string_index, fret in loop_positions(int(note["midi"]), transcription_type):
+            distance = abs(float(fret) - float(anchor))
+            open_bonus = -1.0 if fret == 0 and anchor <= 2 else 0.0
+            ranked.append((distance + open_bonus + max(0, fret - 15) * 0.5, note, string_index, fret))
+        ranked.sort(key=lambda item: item[0])
+        note_options.append([(item[1], item[2], item[3]) for item in ranked[:6]])
+
+    candidates = []
+    for combination in itertools.product(*note_options):
+        strings = [item[1] for item in combination]
+        if len(set(strings)) != len(strings) or max(strings) - min(strings) > 5:
+            continue
+        frets = [item[2] for item in combination if item[2] > 0]
+        if frets and max(frets) - min(frets) > 5:
+            continue
+        candidates.append(list(combination))
+
+    def initial_cost(candidate: list[tuple[dict[str, Any], int, int]]) -> float:
+        frets = [item[2] for item in candidate]
+        non_open = [fret for fret in frets if fret > 0]
+        strings = [item[1] for item in candidate]
+        cost = 0.0
+        if non_open:
+            cost += abs(statistics.median(non_open) - anchor) * 1.2
+            cost += (max(non_open) - min(non_open)) * 1.4
+        cost += (max(strings) - min(strings)) * 0.45
+        cost -= sum(1 for fret in frets if fret == 0 and anchor <= 2) * 0.7
+        return cost
+
+    candidates.sort(key=initial_cost)
+    return candidates[:28]
+
+
+def main() -> None:
+    for transcription_type in ("lead", "bass"):
+        for midi in range(0, 128):
+            require(
+                engine.playable_positions(midi, transcription_type)
+                == loop_positions(midi, transcription_type),
+                f"Position table drifted for MIDI {midi} ({transcription_type})",
+            )
+
+    rng = random.Random(11)
+    for _ in range(200):
+        options = [
+            [(rng.randrange(6), rng.randrange(0, 20)) for _ in range(rng.randint(1, 6))]
+            for _ in range(rng.randint(1, 5))
+        ]
+        limit = rng.choice([None, 7, 200])
+        require(
+            playable_combinations(options, 5, 5, limit=limit)
+            == loop_combinations(options, 5, 5, limit=limit),
+            f"Vectorized combination filter drifted for {options}",
+        )
+
+    chords = [[40, 47, 52, 55, 59, 64], [45, 52, 57, 61, 64], [57, 60, 64], [64], [50, 57, 62, 66]]
+    for chord in chords:
+        for anchor in v25.ANCHORS:
+            for transcription_type in ("lead", "rhythm"):
+                group = [{"midi": midi, "start": 0.0, "end": 1.0} for midi in chord]
+                require(
+                    v25.all_group_assignments(group, transcription_type, anchor)
+                    == legacy_all_group_assignments(group, transcription_type, anchor),
+                    f"Group assignments drifted for {chord} at anchor {anchor}",
+                )
+
+    v25.GROUP_SHAPE_CACHE.clear()
+    misses = v25.GROUP_SHAPE_CACHE.misses
+    for repeat in range(4):
+        group = [{"midi": midi, "start": float(repeat), "end": repeat + 1.0} for midi in chords[0]]
+        assignments = v25.all_group_assignments(group, "rhythm", 0)
+        require(
+            all(
+                any(note is item for item in group)
+                for assignment in assignments
+                for note, _, _ in assignment
+            ),
+            "Cached shapes were not rebound to the current group's notes",
+        )
+    require(
+        v25.GROUP_SHAPE_CACHE.misses - misses == 1,
+        "Repeated riff chords did not reuse the cached shapes",
+    )
+
+    # v62 replaces v25.all_group_assignments when it is imported, so its
+    # expansion is checked after the v25 generator.
+    import modal_analyzer_v62 as v62
+
+    def positions(group: list[dict[str, Any]], assignments: list[Any]) -> list[Any]:
+        return [
+            [(next(index for index, item in enumerate(group) if item is note), string_index, fret) for note, string_index, fret in assignment]
+            for assignment in assignments
+        ]
+
+    for chord in chords:
+        for anchor in v25.ANCHORS:
+            group = [{"midi": midi, "start": 0.0, "end": 1.0} for midi in chord]
+            v62.EXPANDED_SHAPE_CACHE.clear()
+            fresh = positions(group, v62.expanded_group_assignments(group, "rhythm", anchor))
+            repeat = [{"midi": midi, "start": 0.0, "end": 1.0} for midi in chord]
+            require(
+                positions(repeat, v62.expanded_group_assignments(repeat, "rhythm", anchor)) == fresh,
+                f"Cached expansion drifted for {chord} at anchor {anchor}",
+            )
+
+    v62.EXPANDED_SHAPE_CACHE.clear()
+    misses = v62.EXPANDED_SHAPE_CACHE.misses
+    zones = set()
+    for repeat in range(4):
+        oracle = v62.previous.previous.oracle_chord_for_start(float(repeat))
+        zones.add((tuple(oracle["preferredRange"]), bool(oracle.get("allowOpen"))))
+        group = [{"midi": midi, "start": float(repeat), "end": repeat + 1.0} for midi in chords[0]]
+        v62.expanded_group_assignments(group, "rhythm", 0)
+    require(
+        v62.EXPANDED_SHAPE_CACHE.misses - misses == len(zones),
+        "Repeated riff chords did not reuse the cached expanded shapes",
+    )
+
+    print("FRETBOARD POSITION TABLE AND CANDIDATE CACHE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
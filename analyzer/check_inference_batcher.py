@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from inference_batcher import WindowBatcher  # noqa: E402
+
+
+WINDOW_SAMPLES = 512
+PROJECTION = np.random.default_rng(3).standard_normal((WINDOW_SAMPLES, 8))
+
+
+def window_model(windows: Any) -> dict[str, Any]:
+    """Row-independent stand-in with Basic Pitch's output layout."""
+    flat = windows[:, :, 0]
+    return {
+        "note": flat @ PROJECTION,
+        "onset": np.tanh(flat[:, :16]),
+        "contour": flat.sum(axis=1, keepdims=True),
+    }
+
+
+def request_windows(seed: int) -> Any:
+    rng = np.random.default_rng(seed)
+    count = int(rng.integers(1, 12))
+    return rng.standard_normal((count, WINDOW_SAMPLES, 1)).astype(np.float32)
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def same(left: dict[str, Any], right: dict[str, Any]) -> bool:
+    return left.keys() == right.keys() and all(
+        np.array_equal(left[key], right[key]) for key in left
+    )
+
+
+def main() -> None:
+    requests = [request_windows(seed) for seed in range(12)]
+    solo = [window_model(windows) for windows in requests]
+
+    batcher = WindowBatcher(window_model, collect_seconds=0.05, max_batch_windows=16)
+    barrier = threading.Barrier(len(requests))
+
+    def submit(index: int) -> dict[str, Any]:
+        barrier.wait()
+        return batcher.run(requests[index])
+
+    with ThreadPoolExecutor(max_workers=len(requests)) as pool:
+        batched = list(pool.map(submit, range(len(requests))))
+
+    for index, (alone, together) in enumerate(zip(solo, batched)):
+        require(same(alone, together), f"Request {index} got rows from another request")
+
+    diagnostics = batcher.diagnostics()
+    require(diagnostics["jobs"] == len(requests), "Batcher lost a request")
+    require(
+        diagnostics["rounds"] < len(requests),
+        "Concurrent requests were not collected into shared rounds",
+    )
+    require(
+        diagnostics["windows"] == sum(len(windows) for windows in requests),
+        "Batcher miscounted windows",
+    )
+    print(
+        f"{len(requests)} requests -> {diagnostics['rounds']} rounds, "
+        f"{diagnostics['modelCalls']} model calls"
+    )
+
+    alone = WindowBatcher(window_model, collect_seconds=0.0)
+    require(same(alone.run(requests[0]), solo[0]), "Solo request drifted")
+
+    def broken(_windows: Any) -> dict[str, Any]:
+        raise RuntimeError("model failed")
+
+    failing = WindowBatcher(broken, collect_seconds=0.0)
+    try:
+        failing.run(requests[0])
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Model failure was not raised to the caller")
+    failing.infer = window_model
+    require(same(failing.run(requests[1]), solo[1]), "Batcher stayed stuck after a failure")
+
+    # A late caller arrives during every round; the first caller must still
+    # return once its own rows are back.
+    stop = threading.Event()
+    first: list[dict[str, Any]] = []
+    late: list[bool] = []
+    callers: list[threading.Thread] = []
+
+    def late_caller(index: int) -> None:
+        late.append(same(streaming.run(requests[index]), solo[index]))
+
+    def streaming_model(windows: Any) -> dict[str, Any]:
+        if not stop.is_set():
+            caller = threading.Thread(target=late_caller, args=(len(callers) % len(requests),))
+            callers.append(caller)
+            caller.start()
+            time.sleep(0.01)
+        return window_model(windows)
+
+    streaming = WindowBatcher(streaming_model, collect_seconds=0.0)
+    leader = threading.Thread(target=lambda: first.append(streaming.run(requests[0])))
+    leader.start()
+    leader.join(timeout=2.0)
+    leader_returned = not leader.is_alive()
+    stop.set()
+    leader.join()
+    while callers:
+        callers.pop(0).join()
+    require(leader_returned, "Late callers kept the first caller running their rounds")
+    require(same(first[0], solo[0]), "The first caller got rows from a late caller")
+    require(late and all(late), "A late caller got rows from another request")
+
+    print("BATCHED WINDOW INFERENCE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+from inference_cache import CachedPredict, NoteEventCache  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+
+
+NOTE_EVENTS = [
+    (0.0, 0.42, 57, 0.71, None),
+    (0.25, 0.61, 60, 0.64, [0, 12, 40, 12]),
+    (0.5, 1.2, 64, 0.8, []),
+]
+
+
+class CountingPredict:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, audio_path: str) -> tuple[Any, Any, list[Any]]:
+        self.calls += 1
+        return "model-output", "midi-data", list(NOTE_EVENTS)
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        audio = root / "upload.wav"
+        audio.write_bytes(b"RIFF-fixture-audio")
+        same_audio = root / "copy.wav"
+        same_audio.write_bytes(audio.read_bytes())
+        other_audio = root / "other.wav"
+        other_audio.write_bytes(b"RIFF-different-audio")
+
+        predict = CountingPredict()
+        cache = NoteEventCache(str(root / "cache"), max_bytes=1024 * 1024)
+        cached = CachedPredict(predict, cache, model_version="fixture-model")
+
+        parts = {}
+        for part in ("lead", "rhythm", "bass"):
+            provider = NoteEventProvider(str(same_audio if part == "bass" else audio), cached)
+            parts[part] = provider.note_events()
+
+        require(predict.calls == 1, "Lead, rhythm and bass did not share one inference")
+        require(cache.hits == 2 and cache.misses == 1, "Cache hit accounting drifted")
+        for events in parts.values():
+            require(
+                [list(event[:3]) for event in events]
+                == [list(event[:3]) for event in NOTE_EVENTS],
+                "Cached note timing or pitch changed",
+            )
+        require(parts["bass"][1][4] == [0, 12, 40, 12], "Pitch bends were not preserved")
+        require(parts["bass"][2][4] == [], "Empty pitch bends were not preserved")
+        require(parts["bass"][0][4] is None, "Missing pitch bends became empty lists")
+        require(
+            abs(parts["bass"][0][3] - 0.71) < 1e-6,
+            "Amplitude precision drifted",
+        )
+
+        renormalized = CachedPredict(
+            predict,
+            cache,
+            model_version="fixture-model",
+            normalization={"sampleRate": 22050, "channels": 1},
+        )
+        renormalized(str(audio))
+        upgraded = CachedPredict(predict, cache, model_version="fixture-model-2")
+        upgraded(str(audio))
+        cached(str(other_audio))
+        require(predict.calls == 4, "Cache key ignored normalization, model or content")
+
+        entry_size = cache.path_for(cached.key_for(str(audio))).stat().st_size
+        small = NoteEventCache(str(root / "cache"), max_bytes=entry_size * 2)
+        small.evict()
+        remaining = list((root / "cache").glob("*.npz"))
+        require(len(remaining) <= 2, "LRU eviction did not respect max_bytes")
+        require(small.evictions >= 2, "Evictions were not reported")
+
+    print("CONTENT-ADDRESSED INFERENCE CACHE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
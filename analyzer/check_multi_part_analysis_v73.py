@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from check_analysis_jobs import fingerprint  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+PARTS = ["lead", "rhythm"]
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    parse = analyzer.parse_transcription_type
+    require(parse(" Lead ") == "lead", "A single part must stay a string")
+    require(parse("all") == ["lead", "rhythm", "bass"], "'all' must expand to every part")
+    require(parse(["rhythm", "LEAD", "rhythm"]) == ["rhythm", "lead"], "Part lists must keep order and drop repeats")
+    for invalid in ("drums", [], ["lead", "keys"], None):
+        require(parse(invalid) is None, f"{invalid!r} must be rejected")
+
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+    for name, events in fixtures.items():
+        predictions: list[str] = []
+
+        def predict(path: str, events=events) -> tuple[None, None, list]:
+            predictions.append(path)
+            return None, None, list(events)
+
+        started = time.perf_counter()
+        results = pipeline.analyze_parts(
+            f"{name}.wav",
+            PARTS,
+            NoteEventProvider(f"{name}.wav", predict=predict),
+        )
+        combined_ms = (time.perf_counter() - started) * 1000
+        require(list(results) == PARTS, f"{name}: parts came back out of order")
+        require(len(predictions) == 1, f"{name}: {len(predictions)} inferences for one multi-part request")
+
+        started = time.perf_counter()
+        for part in PARTS:
+            # The flat single-part run is itself checked against the wrapped
+            # chain by check_resolved_pipeline_v73.
+            separate = pipeline.analyze(
+                f"{name}.wav",
+                part,
+                NoteEventProvider(f"{name}.wav", predict=lambda _path, events=events: (None, None, list(events))),
+            )
+            require(
+                fingerprint(analyzer.to_json_safe(results[part]))
+                == fingerprint(analyzer.to_json_safe(separate)),
+                f"{name} {part}: multi-part result differs from a single-part run",
+            )
+        separate_ms = (time.perf_counter() - started) * 1000
+        print(f"{name}: {len(PARTS)} parts combined {combined_ms:.0f} ms, separately {separate_ms:.0f} ms")
+
+    print("V73 MULTI-PART ANALYSIS PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+
+
+ARPEGGIO_MIDI = [57, 60, 64, 69, 71, 64, 60, 71, 72, 64, 60, 72]
+
+
+def arpeggio_note_events() -> list[tuple[float, float, int, float, None]]:
+    events: list[tuple[float, float, int, float, None]] = []
+    cursor = 0.0
+    for _ in range(2):
+        for midi in ARPEGGIO_MIDI:
+            events.append((cursor, cursor + 0.35, midi, 0.7, None))
+            cursor += 0.25
+        cursor += 0.9
+    return events
+
+
+class CountingPredict:
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+    def __call__(self, audio_path: str) -> tuple[Any, Any, list[Any]]:
+        self.calls.append(audio_path)
+        return None, None, arpeggio_note_events()
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    for transcription_type in ("lead", "rhythm"):
+        predict = CountingPredict()
+        provider = NoteEventProvider("fixture.wav", predict=predict)
+        result = analyzer.analyze_audio_file(
+            "fixture.wav",
+            transcription_type,
+            provider,
+        )
+        inference = result.get("noteEventInference") or {}
+
+        require(len(predict.calls) == 1, "Basic Pitch ran more than once")
+        require(inference.get("inferenceRuns") == 1, "Inference counter drifted")
+        require(
+            int(inference.get("noteEventRequests") or 0) >= 2,
+            "Key-context and mapping passes no longer share the provider",
+        )
+        require(
+            inference.get("noteEventCount") == len(arpeggio_note_events()),
+            "Shared note events were altered",
+        )
+        require(
+            result.get("engineVersion") == analyzer.ENGINE_VERSION,
+            "V73 entry point no longer owns the response",
+        )
+
+    print("V73 SINGLE-PASS NOTE EVENT PROVIDER PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
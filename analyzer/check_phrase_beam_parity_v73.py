@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import modal_analyzer_v67 as v67  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+
+v63 = v67.v63
+v25 = v63.v25
+
+Assignment = list[tuple[dict[str, Any], int, int]]
+
+STAIRWAY_MIDI = [57, 60, 64, 69, 71, 64, 60, 71, 72, 64, 60, 72, 66, 62, 57, 66]
+GOMYWAY_MIDI = [52, 55, 57, 59, 60, 62, 64, 67, 69, 72, 74, 76]
+
+
+def stairway_note_events() -> list[tuple[float, float, int, float, None]]:
+    events: list[tuple[float, float, int, float, None]] = []
+    cursor = 0.0
+    for _ in range(3):
+        for midi in STAIRWAY_MIDI:
+            events.append((cursor, cursor + 0.35, midi, 0.7, None))
+            cursor += 0.25
+        for midi in (40, 47, 52):
+            events.append((cursor, cursor + 1.0, midi, 0.8, None))
+        cursor += 1.2
+    return events
+
+
+def gomyway_note_events() -> list[tuple[float, float, int, float, Any]]:
+    rng = random.Random(7)
+    events: list[tuple[float, float, int, float, Any]] = []
+    cursor = 0.0
+    for index in range(60):
+        if index % 9 == 0:
+            for midi in (45, 52, 57, 61):
+                events.append((cursor, cursor + 0.8, midi, 0.8, None))
+            cursor += 0.9
+        bends = [0, 1, 2] if index % 13 == 0 else None
+        events.append((cursor, cursor + 0.3, rng.choice(GOMYWAY_MIDI), 0.6, bends))
+        cursor += rng.choice([0.18, 0.25, 0.33, 0.5])
+    return events
+
+
+def legacy_diverse_oracle_build_phrase_paths(
+    groups: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchor: int,
+    previous_assignment: Assignment | None,
+) -> list[tuple[float, list[Assignment]]]:
+    """List-copying V63 beam kept verbatim as the parity reference."""
+    beam: list[tuple[float, list[Assignment]]] = [(0.0, [])]
+    for group in groups:
+        oracle = v63.oracle_for_group(group)
+        assignments = v25.all_group_assignments(group, transcription_type, anchor)
+        if not assignments:
+            assignments = v63.previous.previous.previous.previous.previous.previous.group_assignments(
+                group,
+                transcription_type,
+                anchor,
+            )
+
+        next_beam: list[tuple[float, list[Assignment]]] = []
+        for accumulated, path in beam:
+            prior = path[-1] if path else previous_assignment
+            for assignment in assignments:
+                cost = accumulated
+                cost += v25.guitarist_assignment_cost(assignment, transcription_type, anchor)
+                cost += v25.phrase_movement_cost(prior, assignment, anchor)
+                cost += v63.oracle_assignment_adjustment(assignment, oracle)
+                next_beam.append((cost, path + [assignment]))
+
+        next_beam.sort(key=lambda item: item[0])
+        target_paths = [
+            item for item in next_beam
+            if item[1] and v63.in_oracle_zone(item[1][-1], oracle)
+        ]
+        target_paths.sort(key=lambda item: item[0])
+
+        merged: list[tuple[float, list[Assignment]]] = []
+        seen: set[tuple[Any, ...]] = set()
+        for item in target_paths[:32] + next_beam[:64]:
+            path_key = tuple(v25.assignment_key(assignment) for assignment in item[1])
+            if path_key in seen:
+                continue
+            seen.add(path_key)
+            merged.append(item)
+            if len(merged) >= 80:
+                break
+        beam = merged
+
+    rescored: list[tuple[float, list[Assignment]]] = []
+    for base_cost, path in beam:
+        metrics = v63.previous.previous.previous.previous.previous.path_metrics(path)
+        total = base_cost
+        total += metrics["positionShiftTotal"] * 0.35
+        total += metrics["largeShiftCount"] * 1.5
+        total -= metrics["repeatConsistency"] * 5.5
+        for group, assignment in zip(groups, path):
+            total += v63.oracle_assignment_adjustment(assignment, v63.oracle_for_group(group))
+        rescored.append((total, path))
+
+    rescored.sort(key=lambda item: item[0])
+    return rescored[:8]
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+class ParitySpy:
+    """Run the legacy beam beside the engine for every phrase V73 searches."""
+
+    def __init__(self, builder: Any) -> None:
+        self.builder = builder
+        self.phrases = 0
+
+    def __call__(self, *args: Any, **shared: Any) -> list[tuple[float, list[Assignment]]]:
+        engine_result = self.builder(*args, **shared)
+        legacy_result = legacy_diverse_oracle_build_phrase_paths(*args)
+        require(
+            [cost for cost, _ in engine_result] == [cost for cost, _ in legacy_result],
+            f"Beam costs drifted on phrase {self.phrases}",
+        )
+        require(
+            [path for _, path in engine_result] == [path for _, path in legacy_result],
+            f"Beam winners drifted on phrase {self.phrases}",
+        )
+        self.phrases += 1
+        return engine_result
+
+
+def main() -> None:
+    fixtures = {
+        "stairway": stairway_note_events(),
+        "gomyway": gomyway_note_events(),
+    }
+    spy = ParitySpy(v67._original_builder)
+    v67._original_builder = spy
+    try:
+        for name, note_events in fixtures.items():
+            for transcription_type in ("lead", "rhythm"):
+                provider = NoteEventProvider(
+                    f"{name}.wav",
+                    predict=lambda _path, events=note_events: (None, None, list(events)),
+                )
+                result = analyzer.analyze_audio_file(
+                    f"{name}.wav",
+                    transcription_type,
+                    provider,
+                )
+                require(bool(result.get("generatedTab")), f"{name} produced no tab")
+                beam = result["musicalUnderstanding"]["oracleBeamPreservation"]
+                timings = [phrase.get("searchMilliseconds") for phrase in beam["phrases"]]
+                require(
+                    bool(timings) and all(isinstance(value, float) for value in timings),
+                    "Per-phrase beam timing is missing",
+                )
+    finally:
+        v67._original_builder = spy.builder
+
+    require(spy.phrases > 0, "V73 never reached the phrase beam")
+    print(f"Compared {spy.phrases} phrase searches against the list-copying beam")
+    print("V73 INCREMENTAL PHRASE BEAM PARITY PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
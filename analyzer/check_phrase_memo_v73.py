@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v29 as v29  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import phrase_memo  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def placements(rows: list[tuple[int, float, Any]]) -> list[tuple[int, float, list[list[tuple[int, int, int]]]]]:
+    return [
+        (anchor, score, [[(id(note), int(string_index), int(fret)) for note, string_index, fret in assignment] for assignment in path])
+        for anchor, score, path in rows
+    ]
+
+
+class MemoSpy:
+    """Search again behind every memo hit and require the same paths."""
+
+    def __init__(self) -> None:
+        self.search = phrase_memo.PhraseMemo.search
+        self.hit_windows = 0
+
+    def __call__(
+        self,
+        memo: phrase_memo.PhraseMemo,
+        window: list[list[dict[str, Any]]],
+        anchors: list[int],
+        previous_assignment: Any,
+        context: Any,
+        search: Any,
+    ) -> list[tuple[int, float, Any]]:
+        hits = memo.hits
+        rows = self.search(memo, window, anchors, previous_assignment, context, search)
+        if memo.hits > hits:
+            self.hit_windows += 1
+            require(
+                placements(rows) == placements(search(anchors)),
+                f"A memo hit differs from a fresh search on hit window {self.hit_windows}",
+            )
+        return rows
+
+
+def tab_and_diagnostics(result: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        result["generatedTab"],
+        [(round(float(event["start"]), 4), event["midi"], event["stringIndex"], event["fret"]) for event in result["events"]],
+        result["candidateDiagnostics"],
+    )
+
+
+def riff(offset: float, jitter: float = 0.0, end: float = 0.35) -> list[list[dict[str, Any]]]:
+    return [
+        [{"midi": 57, "start": offset + jitter, "end": offset + end}],
+        [{"midi": 64, "start": offset + 0.25, "end": offset + 0.6}, {"midi": 60, "start": offset + 0.25, "end": offset + 0.6}],
+    ]
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+
+    def analyze(name: str, part: str, enabled: bool) -> dict[str, Any]:
+        events = fixtures[name]
+        pipeline.scoped_overrides = [(v29.PHRASE_MEMO, {"enabled": enabled})]
+        return pipeline.analyze(
+            f"{name}.wav",
+            part,
+            NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(events))),
+        )
+
+    spy = MemoSpy()
+    # A plain function, so the memo instance is still bound as ``self``.
+    phrase_memo.PhraseMemo.search = lambda memo, *args: spy(memo, *args)
+    overrides = pipeline.scoped_overrides
+    hits = 0
+    try:
+        for name in fixtures:
+            for part in ("lead", "rhythm"):
+                memoized = analyze(name, part, True)
+                report = memoized["musicalUnderstanding"]["phraseMemo"]
+                require(
+                    tab_and_diagnostics(memoized) == tab_and_diagnostics(analyze(name, part, False)),
+                    f"{name} {part}: the phrase memo changed the tab",
+                )
+                hits += report["hits"]
+                print(
+                    f"{name} {part}: {report['hits']}/{report['lookups']} anchor searches reused "
+                    f"({report['hitRate']:.0%}), {report['savedMilliseconds']:.0f} ms saved"
+                )
+    finally:
+        phrase_memo.PhraseMemo.search = spy.search
+        pipeline.scoped_overrides = overrides
+    require(hits > 0 and spy.hit_windows > 0, "No repeated window reached the memo")
+    require(
+        analyze("stairway", "lead", False)["musicalUnderstanding"]["phraseMemo"] == {"enabled": False},
+        "A disabled memo must say so",
+    )
+
+    # Keys: timing jitter inside the grid still hits; a different pitch,
+    # sustain or boundary state is a different search.
+    memo = phrase_memo.PhraseMemo()
+    searched: list[list[int]] = []
+
+    def search_for(window: list[list[dict[str, Any]]]) -> Any:
+        def search(anchors: list[int]) -> list[tuple[int, float, Any]]:
+            searched.append(anchors)
+            return [(anchor, float(anchor), [[(window[0][0], 2, 7)], [(window[1][1], 1, 5), (window[1][0], 0, 3)]]) for anchor in anchors]
+
+        return search
+
+    first = riff(0.0)
+    memo.search(first, [5, 7], None, "lead", search_for(first))
+    repeat = riff(8.0, jitter=0.01)
+    rows = memo.search(repeat, [7, 5, 9], None, "lead", search_for(repeat))
+    require(searched == [[5, 7], [9]], "Only the new anchor of a repeated window is searched")
+    require([anchor for anchor, _, _ in rows] == [7, 5, 9], "Memo rows keep the caller's anchor order")
+    require(
+        rows[0][2] == [[(repeat[0][0], 2, 7)], [(repeat[1][1], 1, 5), (repeat[1][0], 0, 3)]],
+        "A reused path must land on the repeat's own notes",
+    )
+    require(all(note is not first[0][0] for _, _, path in rows for note, _, _ in path[0]), "A reused path kept old notes")
+
+    ringing = [(first[1][0], 1, 5)]
+    for window, previous, context in (
+        (riff(16.0, end=0.6), None, "lead"),
+        (riff(24.0), ringing, "lead"),
+        (riff(32.0), None, "rhythm"),
+        ([[{"midi": 59, "start": 40.0, "end": 40.35}], riff(40.0)[1]], None, "lead"),
+    ):
+        memo.search(window, [5], previous, context, search_for(window))
+    require(len(searched) == 6, "Sustain, boundary, context and pitch must all key the memo")
+    require(memo.diagnostics()["hits"] == 2, "The memo miscounted its hits")
+
+    print("V73 PHRASE MEMO FOR REPEATED RIFFS PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import pickle
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v29 as v29  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import phrase_parallel  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+WORKERS = 2
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def phrased(events: list[Any], every: int = 10, gap: float = 2.0) -> list[Any]:
+    """The fixture with a rest after every ``every`` notes, so it splits into phrases."""
+    shifted = []
+    shift = 0.0
+    for index, (start, end, *rest) in enumerate(events):
+        if index and index % every == 0:
+            shift += gap
+        shifted.append((start + shift, end + shift, *rest))
+    return shifted
+
+
+def winning_total(result: dict[str, Any]) -> float:
+    return sum(float(item["winningScore"]) for item in result["candidateDiagnostics"])
+
+
+def without_timings(value: Any) -> Any:
+    """The result as JSON, minus wall-clock fields and the memo and pool reports."""
+    if isinstance(value, dict):
+        return {
+            key: without_timings(item)
+            for key, item in value.items()
+            if not key.endswith(("Milliseconds", "Seconds")) and key not in {"phraseMemo", "phraseParallel"}
+        }
+    if isinstance(value, list):
+        return [without_timings(item) for item in value]
+    return value
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    parallel = phrase_parallel.build_parallel_pipeline(pipeline, WORKERS)
+    require(
+        (v29.PHRASE_PARALLEL, {"enabled": True, "module": analyzer.__name__, "workers": WORKERS})
+        in parallel.scoped_overrides,
+        "The parallel pipeline must enable the pool for its own chain",
+    )
+    require(not pipeline.scoped_overrides, "Building the parallel pipeline changed the original")
+    require(
+        analyzer.maps_phrases_in_parallel({"mode": "full", "phraseMapping": "parallel"})
+        and not analyzer.maps_phrases_in_parallel({"mode": "full", "phraseMapping": "sequential"})
+        and not analyzer.maps_phrases_in_parallel({"mode": "full"})
+        and not analyzer.maps_phrases_in_parallel({"mode": "preview", "phraseMapping": "parallel"}),
+        "Parallel phrase mapping must stay opt-in and full-analysis only",
+    )
+    fixtures = {"stairway": phrased(stairway_note_events()), "gomyway": phrased(gomyway_note_events())}
+
+    def analyze(chosen: Any, name: str, part: str, events: list[Any]) -> dict[str, Any]:
+        result = chosen.analyze(
+            f"{name}.wav",
+            part,
+            NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(events))),
+        )
+        return analyzer.to_json_safe(result)
+
+    def require_sequential(stitched: dict[str, Any], sequential: dict[str, Any], label: str) -> None:
+        report = stitched["musicalUnderstanding"]["phraseParallel"]
+        require(report["enabled"] and report["workers"] == WORKERS, f"{label}: the pool did not map the phrases")
+        require(report["stitchedPhraseCount"] == stitched["phraseCount"] > 1, f"{label}: a phrase was not stitched")
+        require(
+            abs(report["sequentialScore"] - winning_total(sequential)) <= 1e-2,
+            f"{label}: the walked sequential chain scored differently from the sequential run",
+        )
+        require(report["chosen"] == "sequential", f"{label}: a stitch no better than the sequential chain was kept")
+        require(
+            without_timings(stitched) == without_timings(sequential),
+            f"{label}: the kept sequential chain differs from the sequential run or lost its diagnostics",
+        )
+        require(
+            stitched["musicalUnderstanding"]["phraseMemo"]["lookups"] > 0,
+            f"{label}: the workers' memo counts were not merged",
+        )
+
+    # The first parallel request also spawns the pool.
+    analyze(parallel, "stairway", "lead", fixtures["stairway"])
+    sequential_runs: dict[tuple[str, str], dict[str, Any]] = {}
+    for name, events in fixtures.items():
+        for part in ("lead", "rhythm"):
+            started = time.perf_counter()
+            sequential = sequential_runs[name, part] = analyze(pipeline, name, part, events)
+            sequential_seconds = time.perf_counter() - started
+            started = time.perf_counter()
+            stitched = analyze(parallel, name, part, events)
+            parallel_seconds = time.perf_counter() - started
+            report = stitched["musicalUnderstanding"]["phraseParallel"]
+            require(
+                winning_total(stitched) <= winning_total(sequential) + 1e-2,
+                f"{name} {part}: the stitched chain scored worse than the sequential one",
+            )
+            if report["chosen"] == "sequential":
+                require_sequential(stitched, sequential, f"{name} {part}")
+            else:
+                require(
+                    report["stitchedScore"] < report["sequentialScore"],
+                    f"{name} {part}: a stitch was kept without beating the sequential chain",
+                )
+            print(
+                f"{name} {part}: {report['phraseCount']} phrases, "
+                f"score {winning_total(stitched):.3f} vs sequential {winning_total(sequential):.3f} "
+                f"({report['chosen']} kept, {report['remappedPhraseCount']} remapped); "
+                f"{parallel_seconds:.2f}s on {WORKERS} workers vs {sequential_seconds:.2f}s"
+            )
+
+    # A proposal of every phrase's second opening scores no better, so the
+    # sequential chain is kept.
+    propose_stitch = v29.propose_stitch
+    v29.propose_stitch = lambda candidates: [min(1, len(phrase.chains) - 1) for phrase in candidates]
+    try:
+        for name, events in fixtures.items():
+            stitched = analyze(parallel, name, "rhythm", events)
+            report = stitched["musicalUnderstanding"]["phraseParallel"]
+            require(
+                report["stitchedScore"] is None or report["stitchedScore"] >= report["sequentialScore"],
+                f"{name}: a later opening everywhere beat the sequential chain",
+            )
+            require_sequential(stitched, sequential_runs[name, "rhythm"], f"{name} second openings")
+    finally:
+        v29.propose_stitch = propose_stitch
+
+    # With a single opening per phrase, seams whose winner the worker never
+    # mapped are mapped in the parent, and the result is still sequential.
+    single_opening = replace(
+        parallel,
+        scoped_overrides=[*parallel.scoped_overrides, (v29.PHRASE_PARALLEL, {"candidates": 1})],
+    )
+    remapped = 0
+    for name, events in fixtures.items():
+        for part in ("lead", "rhythm"):
+            stitched = analyze(single_opening, name, part, events)
+            remapped += stitched["musicalUnderstanding"]["phraseParallel"]["remappedPhraseCount"]
+            require_sequential(stitched, sequential_runs[name, part], f"{name} {part} single opening")
+    print(f"{remapped} phrases remapped in the parent with one opening per phrase")
+
+    require(
+        analyze(pipeline, "gomyway", "lead", fixtures["gomyway"])["musicalUnderstanding"]["phraseParallel"]
+        == {"enabled": False},
+        "The default pipeline must map phrases in process",
+    )
+    single = stairway_note_events()
+    require(
+        analyze(parallel, "stairway", "lead", single)["musicalUnderstanding"]["phraseParallel"] == {"enabled": False},
+        "A single phrase is not worth the pool",
+    )
+
+    # Paths cross the pool by note position and land on the parent's notes.
+    window = [
+        [{"midi": 57, "start": 0.0, "end": 0.3}],
+        [{"midi": 64, "start": 0.25, "end": 0.6}, {"midi": 60, "start": 0.25, "end": 0.6}],
+    ]
+    path = [[(window[0][0], 2, 7)], [(window[1][1], 1, 5), (window[1][0], 0, 3)]]
+    encoded = pickle.loads(pickle.dumps(phrase_parallel.encode_path(window, path)))
+    require(encoded == [[(0, 2, 7)], [(1, 1, 5), (0, 0, 3)]], "Paths must be encoded by note position")
+    decoded = phrase_parallel.decode_path(window, encoded)
+    require(
+        all(
+            note is original and (string_index, fret) == (original_string, original_fret)
+            for assignment, original_assignment in zip(decoded, path)
+            for (note, string_index, fret), (original, original_string, original_fret) in zip(assignment, original_assignment)
+        ),
+        "A decoded path must reuse the window's own notes",
+    )
+
+    print("V73 PARALLEL PHRASE MAPPING WITH BOUNDARY STITCHING PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
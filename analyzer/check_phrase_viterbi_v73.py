@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import itertools
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v67 as v67  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import phrase_viterbi  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+v63 = v67.v63
+v25 = v63.v25
+
+Assignment = list[tuple[dict[str, Any], int, int]]
+
+# Windows with at most this many complete paths are also solved by brute force.
+BRUTE_FORCE_PATHS = 4096
+TOLERANCE = 1e-6
+
+
+def path_score(
+    groups: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchor: int,
+    previous_assignment: Assignment | None,
+    path: list[Assignment],
+) -> float:
+    """The V63 beam's step costs and rerank plus the V67 pair terms."""
+    total = 0.0
+    prior = previous_assignment
+    for group, assignment in zip(groups, path):
+        oracle = v63.oracle_for_group(group)
+        total += v25.guitarist_assignment_cost(assignment, transcription_type, anchor)
+        total += v25.phrase_movement_cost(prior, assignment, anchor)
+        total += v63.oracle_assignment_adjustment(assignment, oracle)
+        prior = assignment
+    total += v63.path_metric_adjustment(path)
+    for group, assignment in zip(groups, path):
+        total += v63.oracle_assignment_adjustment(assignment, v63.oracle_for_group(group))
+    return total + v67.paired_transition_adjustment(groups, path)[0]
+
+
+class ViterbiSpy:
+    """Check every exact search against the beam and, when small, brute force."""
+
+    def __init__(self, search: Any) -> None:
+        self.search = search
+        self.windows = 0
+        self.brute_forced = 0
+        self.beam_improved = 0
+        self.viterbi_seconds = 0.0
+        self.beam_seconds = 0.0
+
+    def __call__(
+        self,
+        groups: list[list[dict[str, Any]]],
+        transcription_type: str,
+        anchor: int,
+        previous_assignment: Assignment | None,
+        **shared: Any,
+    ) -> list[tuple[float, list[Assignment]]]:
+        started = time.perf_counter()
+        exact = self.search(groups, transcription_type, anchor, previous_assignment, **shared)
+        self.viterbi_seconds += time.perf_counter() - started
+        self.windows += 1
+        require(len(exact) == 1, "The exact search must return its single optimum")
+        score, path = exact[0]
+        total = score + v67.paired_transition_adjustment(groups, path)[0]
+        require(
+            math.isclose(
+                total,
+                path_score(groups, transcription_type, anchor, previous_assignment, path),
+                abs_tol=TOLERANCE,
+            ),
+            "The exact search misreports its path's score",
+        )
+
+        started = time.perf_counter()
+        beam = v67._original_builder(groups, transcription_type, anchor, previous_assignment)
+        self.beam_seconds += time.perf_counter() - started
+        beam_best = min(
+            beam_score + v67.paired_transition_adjustment(groups, beam_path)[0]
+            for beam_score, beam_path in beam
+        )
+        require(total <= beam_best + TOLERANCE, "The beam found a cheaper path than the exact search")
+        self.beam_improved += total < beam_best - TOLERANCE
+
+        options = [v63.group_candidates(group, transcription_type, anchor) for group in groups]
+        if math.prod(len(choices) for choices in options) <= BRUTE_FORCE_PATHS:
+            self.brute_forced += 1
+            optimum = min(
+                path_score(groups, transcription_type, anchor, previous_assignment, list(candidate))
+                for candidate in itertools.product(*options)
+            )
+            require(math.isclose(total, optimum, abs_tol=TOLERANCE), "The exact search missed the optimum")
+        return exact
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def tab_and_events(result: dict[str, Any]) -> tuple[str, list[tuple[Any, ...]]]:
+    return result["generatedTab"], [
+        (round(float(event["start"]), 4), event["midi"], event["stringIndex"], event["fret"])
+        for event in result["events"]
+    ]
+
+
+def main() -> None:
+    require(phrase_viterbi.is_monophonic([[{}], [{}]]), "Single-note groups are monophonic")
+    require(not phrase_viterbi.is_monophonic([[{}], [{}, {}]]), "A chord must fall back to the beam")
+    require(not phrase_viterbi.is_monophonic([]), "An empty window is not a run")
+
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+
+    def analyze(name: str, part: str) -> dict[str, Any]:
+        events = fixtures[name]
+        return pipeline.analyze(
+            f"{name}.wav",
+            part,
+            NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(events))),
+        )
+
+    spy = ViterbiSpy(v67.monophonic_build_phrase_paths)
+    v67.monophonic_build_phrase_paths = spy
+    try:
+        exact = {(name, part): analyze(name, part) for name in fixtures for part in ("lead", "rhythm")}
+    finally:
+        v67.monophonic_build_phrase_paths = spy.search
+    require(spy.windows > 0, "No single-note window reached the exact search")
+    require(spy.brute_forced > 0, "No window was small enough to brute force")
+    print(
+        f"{spy.windows} single-note searches: exact {spy.viterbi_seconds * 1000:.0f} ms, "
+        f"beam {spy.beam_seconds * 1000:.0f} ms; {spy.brute_forced} brute-forced, "
+        f"{spy.beam_improved} cheaper than the beam"
+    )
+
+    # With every window on the beam the fixtures map to the same tab.
+    is_monophonic = phrase_viterbi.is_monophonic
+    phrase_viterbi.is_monophonic = lambda groups: False
+    try:
+        for (name, part), result in exact.items():
+            require(
+                tab_and_events(analyze(name, part)) == tab_and_events(result),
+                f"{name} {part}: the exact search changed the fixture's tab",
+            )
+    finally:
+        phrase_viterbi.is_monophonic = is_monophonic
+
+    print("V73 MONOPHONIC VITERBI SEARCH PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v38 as v38  # noqa: E402
+import modal_analyzer_v62 as v62  # noqa: E402
+import modal_analyzer_v63 as v63  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from analysis_context import analysis_scope  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from preview_mode import (  # noqa: E402
+    DIAGNOSTIC_FINALIZERS,
+    PREVIEW_RESULT_KEYS,
+    build_preview_pipeline,
+    preview_result,
+)
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+# The fixtures are short, so the check previews their first eight seconds
+# and compares everything that starts before the final two, where the cut
+# changes what the last window can look ahead to.
+PREVIEW_SECONDS = 8.0
+SETTLED_SECONDS = 6.0
+
+
+def opening_of(note_events: list[Any], seconds: float) -> list[Any]:
+    """What Basic Pitch reports for audio decoded with ``max_seconds``."""
+    return [
+        (start, min(end, seconds), pitch, amplitude, bends)
+        for start, end, pitch, amplitude, bends in note_events
+        if start < seconds
+    ]
+
+
+def opening_measures(result: dict[str, Any]) -> list[tuple[float, int, int, int]]:
+    return [
+        (round(float(event["start"]), 3), int(event["midi"]), int(event["stringIndex"]), int(event["fret"]))
+        for event in result["events"]
+        if float(event["start"]) < SETTLED_SECONDS
+    ]
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def timed(function: Any) -> tuple[Any, float]:
+    started = time.perf_counter()
+    value = function()
+    return value, time.perf_counter() - started
+
+
+def main() -> None:
+    full_pipeline = build_resolved_pipeline(analyzer)
+    preview_pipeline = build_preview_pipeline(full_pipeline)
+    require(
+        not {layer.__name__ for layer in preview_pipeline.finalizers} & DIAGNOSTIC_FINALIZERS,
+        "Preview still runs the candidate inventory",
+    )
+    require(
+        len(full_pipeline.finalizers) - len(preview_pipeline.finalizers) == len(DIAGNOSTIC_FINALIZERS),
+        "Preview skipped more than the inventory finalizers",
+    )
+
+    # Nor does its search collect the inventory those finalizers would report;
+    # v38's collector still runs wherever v62 falls back to it.
+    require(
+        (v38.INVENTORY_STATE, {"collect": False}) in preview_pipeline.scoped_overrides,
+        "Preview does not switch off the search-time inventory",
+    )
+    group = [{"midi": 57, "start": 0.0, "end": 0.5}, {"midi": 64, "start": 0.0, "end": 0.5}]
+    for overrides, expected in (([], 1), (preview_pipeline.scoped_overrides, 0)):
+        with analysis_scope():
+            for state, values in overrides:
+                state.update(values)
+            candidates = v38.inventory_group_assignments(group, "rhythm", 5)
+            require(candidates, "The inventory switch changed the candidates")
+            require(
+                len(v38.POSITION_INVENTORY) == expected,
+                f"Expected {expected} inventory entries, got {len(v38.POSITION_INVENTORY)}",
+            )
+    require(v38.INVENTORY_STATE["collect"], "Preview leaked its inventory switch")
+
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+    for name, events in fixtures.items():
+        for part in ("lead", "rhythm"):
+            full, full_seconds = timed(
+                lambda: full_pipeline.analyze(
+                    f"{name}.wav",
+                    part,
+                    NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(events))),
+                )
+            )
+            opening = opening_of(events, PREVIEW_SECONDS)
+            results, preview_seconds = timed(
+                lambda: preview_pipeline.analyze_parts(
+                    f"{name}.wav",
+                    [part],
+                    NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(opening))),
+                )
+            )
+            preview = analyzer.to_json_safe(preview_result(results[part], PREVIEW_SECONDS))
+
+            require(set(preview) == {*PREVIEW_RESULT_KEYS, "mode", "previewSeconds"}, "Preview shape drifted")
+            require(preview["mode"] == "preview" and preview["generatedTab"], "Preview lost its tab")
+            expected = opening_measures(full)
+            require(expected, f"{name} {part}: fixture has no opening measures")
+            require(
+                opening_measures(preview) == expected,
+                f"{name} {part}: preview disagrees with the full run's opening measures",
+            )
+            require(preview_seconds < full_seconds, f"{name} {part}: preview was not faster")
+            print(
+                f"{name} {part}: {len(expected)} opening notes agree; "
+                f"preview {preview_seconds * 1000:.0f} ms vs full {full_seconds * 1000:.0f} ms"
+            )
+
+    # The preview budgets live in each request's context, not in the modules.
+    require(v62.CANDIDATE_BUDGET["totalCandidates"] == 48, "Preview leaked its candidate budget")
+    require(v63.BEAM_BUDGET["keptPaths"] == 80, "Preview leaked its beam width")
+
+    print("V73 PREVIEW MODE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
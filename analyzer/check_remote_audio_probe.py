@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v15 as engine  # noqa: E402
+
+
+def probe_output(duration: float | None, size: int | None, with_audio: bool = True) -> dict[str, Any]:
+    streams = [{"codec_type": "video", "codec_name": "mjpeg"}]
+    if with_audio:
+        streams.append({
+            "codec_type": "audio",
+            "codec_name": "mp3",
+            "sample_rate": "44100",
+            "channels": 2,
+        })
+    format_data: dict[str, Any] = {"format_name": "mp3"}
+    if duration is not None:
+        format_data["duration"] = str(duration)
+    if size is not None:
+        format_data["size"] = str(size)
+    return {"streams": streams, "format": format_data}
+
+
+def rejected(metadata: dict[str, Any]) -> str | None:
+    try:
+        engine.validate_remote_metadata(metadata)
+    except ValueError as error:
+        return str(error)
+    return None
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    song = engine.metadata_from_probe(probe_output(212.4, 8_400_000))
+    require(song["codec"] == "mp3" and song["channels"] == 2, "Probe parsing drifted")
+    require(rejected(song) is None, "A valid upload was rejected before download")
+
+    unknown_size = engine.metadata_from_probe(probe_output(212.4, None))
+    require(unknown_size["fileSize"] == 0, "Missing size should parse as unknown")
+    require(
+        rejected(unknown_size) is None,
+        "An unknown remote size must be left to the streaming download cap",
+    )
+
+    # A chunked response or an estimate-only stream probes with no duration;
+    # it must be left to the downloaded file, not rejected as too short.
+    for duration in (None, 0.0):
+        require(
+            engine.remote_metadata_from_probe(probe_output(duration, None)) is None,
+            f"A probe with duration {duration} must defer to the downloaded file",
+        )
+    require(
+        rejected({**unknown_size, "durationSeconds": 0.0}) is None,
+        "An unprobed duration must not be bounds-checked before download",
+    )
+    too_short = engine.metadata_from_probe(probe_output(1.5, 40_000))
+    require("3 seconds" in (rejected(too_short) or ""), "A probed short upload was not rejected early")
+
+    too_long = engine.metadata_from_probe(probe_output(16 * 60.0, 40_000_000))
+    require("15 minutes" in (rejected(too_long) or ""), "Over-long upload was not rejected early")
+
+    too_big = engine.metadata_from_probe(probe_output(600.0, 60 * 1024 * 1024))
+    require("50 MB" in (rejected(too_big) or ""), "Announced oversize upload was not rejected early")
+
+    try:
+        engine.metadata_from_probe(probe_output(60.0, 1_000_000, with_audio=False))
+    except ValueError as error:
+        require("no audio stream" in str(error), "Audio-less upload gave the wrong reason")
+    else:
+        raise AssertionError("Audio-less upload was not rejected early")
+
+    # An unprobeable URL (or no ffprobe on PATH) must fall back to the
+    # post-download inspection instead of failing the request.
+    require(
+        engine.inspect_remote_audio("http://127.0.0.1:9/unreachable.mp3") is None,
+        "A failed remote probe must defer to the downloaded file",
+    )
+
+    # Only http(s) URLs reach ffprobe, and ffprobe may not leave HTTP(S) or
+    # the accepted container formats from there.
+    commands: list[list[str]] = []
+
+    def recorded_run(command: list[str], **_kwargs: Any) -> subprocess.CompletedProcess:
+        commands.append(command)
+        return subprocess.CompletedProcess(command, 1, "", "")
+
+    run = engine.subprocess.run
+    engine.subprocess.run = recorded_run
+    try:
+        for url in (
+            "file:///etc/passwd",
+            "concat:/etc/passwd|/etc/hosts",
+            "subfile,,start,0,end,0,,:/etc/passwd",
+            "/etc/passwd",
+            "http:///no-host.mp3",
+        ):
+            require(engine.inspect_remote_audio(url) is None, f"{url} was not deferred")
+        require(not commands, f"A non-HTTP URL reached ffprobe: {commands}")
+        engine.inspect_remote_audio("https://blob.example/song.mp3", {"Authorization": "Bearer t"})
+    finally:
+        engine.subprocess.run = run
+    command = commands[0]
+    require(
+        command[command.index("-protocol_whitelist") + 1] == "https,http,tcp,tls",
+        "The probe must whitelist HTTP(S) protocols only",
+    )
+    formats = command[command.index("-format_whitelist") + 1].split(",")
+    require("hls" not in formats and "concat" not in formats, "The probe must not open playlists")
+    require(int(command[command.index("-probesize") + 1]) > 0, "The probe must cap what it reads")
+    require(command[-1] == "https://blob.example/song.mp3", "The probed URL must come last")
+
+    print("PRE-DOWNLOAD REMOTE AUDIO PROBE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from analysis_jobs import JobFailed  # noqa: E402
+from check_analysis_jobs import fingerprint  # noqa: E402
+from check_phrase_beam_parity_v73 import stairway_note_events  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+from request_coalescing import InMemoryFlightStore, SingleFlight  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+from result_cache import result_cache_key  # noqa: E402
+
+
+CONCURRENT_REQUESTS = 4
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def coalesced(flights: SingleFlight, key: str, work: Any) -> tuple[dict[str, Any], str]:
+    """One part of ``AnalyzerService.analyze_parts``: lead, or await the leader."""
+    while True:
+        if flights.claim(key):
+            try:
+                result = work()
+            except ValueError as error:
+                flights.fail(key, 400, str(error))
+                raise
+            except BaseException:
+                flights.release(key)
+                raise
+            flights.publish(key, result)
+            return result, "leader"
+        result = flights.wait(key)
+        if result is not None:
+            return result, "coalesced"
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    events = stairway_note_events()
+    key = result_cache_key("stairway-samples", "lead", analyzer.ENGINE_VERSION)
+    require(
+        key != result_cache_key("stairway-samples", "rhythm", analyzer.ENGINE_VERSION),
+        "Parts of one upload must not coalesce with each other",
+    )
+
+    runs: list[str] = []
+    runs_lock = threading.Lock()
+
+    def work() -> dict[str, Any]:
+        with runs_lock:
+            runs.append(threading.current_thread().name)
+        result = pipeline.analyze(
+            "stairway.wav",
+            "lead",
+            NoteEventProvider("stairway.wav", predict=lambda _path: (None, None, list(events))),
+        )
+        return analyzer.to_json_safe(result)
+
+    flights = SingleFlight(InMemoryFlightStore(), poll_seconds=0.01)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CONCURRENT_REQUESTS) as pool:
+        answers = list(pool.map(lambda _index: coalesced(flights, key, work), range(CONCURRENT_REQUESTS)))
+    coalesced_ms = (time.perf_counter() - started) * 1000
+
+    require(len(runs) == 1, f"{len(runs)} pipelines ran for {CONCURRENT_REQUESTS} identical requests")
+    roles = sorted(role for _, role in answers)
+    require(roles == ["coalesced"] * (CONCURRENT_REQUESTS - 1) + ["leader"], f"Unexpected roles {roles}")
+    require(
+        len({fingerprint(result) for result, _ in answers}) == 1,
+        "Followers did not receive the leader's result",
+    )
+    answers[0][0]["events"].clear()
+    require(flights.wait(key)["events"], "A caller's edits leaked into the shared record")
+    print(
+        f"{CONCURRENT_REQUESTS} identical requests: 1 pipeline run in {coalesced_ms:.0f} ms; "
+        f"{flights.diagnostics()}"
+    )
+
+    # A leader that dies without a record hands the key to the next waiter.
+    store = InMemoryFlightStore()
+    flights = SingleFlight(store, poll_seconds=0.01)
+    require(flights.claim("dropped"), "First claim must lead")
+    require(not flights.claim("dropped"), "Second claim must follow")
+    waiter = ThreadPoolExecutor(max_workers=1).submit(flights.wait, "dropped")
+    time.sleep(0.05)
+    flights.release("dropped")
+    require(waiter.result(timeout=5) is None, "A released claim must wake its waiters")
+    require(flights.claim("dropped"), "A released key must be claimable")
+
+    # An expired lease is taken over.
+    expiring = SingleFlight(store, lease_seconds=0.0)
+    require(expiring.claim("expired") and expiring.claim("expired"), "An expired claim was not taken over")
+    require(expiring.takeovers == 1, "The takeover was not counted")
+
+    # A rejected upload is answered the same way for every waiting request.
+    flights.claim("rejected")
+    flights.fail("rejected", 400, "Audio has no decodable stream.")
+    try:
+        flights.wait("rejected")
+    except JobFailed as error:
+        require(error.status_code == 400, "The leader's status code was not shared")
+    else:
+        raise AssertionError("Followers must see the leader's rejection")
+
+    print("SINGLE-FLIGHT REQUEST COALESCING PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v29 as v29  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+
+# The flat pipeline asks its provider for note events once instead of twice,
+# so the request counters legitimately differ from the wrapped chain.
+IGNORED_KEYS = {"searchMilliseconds", "savedMilliseconds", "noteEventRequests", "sharedRequests"}
+
+
+def comparable(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: comparable(item)
+            for key, item in value.items()
+            if key not in IGNORED_KEYS
+        }
+    if isinstance(value, list):
+        return [comparable(item) for item in value]
+    return value
+
+
+def provider_for(name: str) -> NoteEventProvider:
+    note_events = stairway_note_events() if name == "stairway" else gomyway_note_events()
+    return NoteEventProvider(
+        f"{name}.wav",
+        predict=lambda _path: (None, None, list(note_events)),
+    )
+
+
+def timed(run: Any) -> tuple[dict[str, Any], float]:
+    started = time.perf_counter()
+    result = run()
+    return result, (time.perf_counter() - started) * 1000.0
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    require(pipeline.core is v29, "Chain did not resolve down to the V29 core")
+    require(pipeline.layers[0] is analyzer, "Chain did not start at V73")
+    stage_names = [stage["stage"] for stage in pipeline.stage_list()]
+    require(
+        stage_names[:8]
+        == ["extract", "clean", "group", "key", "phrase", "window", "candidates", "beam"],
+        f"Unexpected core stage order: {stage_names[:8]}",
+    )
+    require(
+        stage_names[-1] == "finalize:modal_analyzer_v73",
+        "The V73 handoff must be the last stage",
+    )
+    print(f"{len(pipeline.layers)} layers -> {len(stage_names)} stages")
+    for stage in pipeline.stage_list():
+        print(f"  {stage['stage']:<36} {stage['implementation']}")
+
+    for name in ("stairway", "gomyway"):
+        for part in ("lead", "rhythm"):
+            chained, chained_ms = timed(
+                lambda: analyzer.analyze_audio_file(f"{name}.wav", part, provider_for(name))
+            )
+            flat, flat_ms = timed(
+                lambda: pipeline.analyze(f"{name}.wav", part, provider_for(name))
+            )
+            require(
+                json.dumps(comparable(flat), sort_keys=True, default=str)
+                == json.dumps(comparable(chained), sort_keys=True, default=str),
+                f"Resolved pipeline drifted from V73 on {name} {part}",
+            )
+            inference = flat["noteEventInference"]
+            require(inference["inferenceRuns"] == 1, "Flat pipeline re-ran inference")
+            require(inference["noteEventRequests"] == 1, "Flat pipeline re-read events")
+            print(f"{name} {part}: chained {chained_ms:.0f} ms, flat {flat_ms:.0f} ms")
+
+    try:
+        pipeline.analyze("stairway.wav", "keys", provider_for("stairway"))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("The V72 part gate was not applied")
+
+    print("V73 RESOLVED FLAT PIPELINE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from check_phrase_beam_parity_v73 import stairway_note_events  # noqa: E402
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+from result_cache import ResultCache, result_cache_key  # noqa: E402
+
+
+AUDIO_HASH = "a" * 64
+CONTEXT = {
+    "referenceChords": [{"name": "Am", "pitchClasses": [9, 0, 4]}],
+    "expectedProgression": ["Am"],
+}
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def main() -> None:
+    key = result_cache_key(AUDIO_HASH, "lead", analyzer.ENGINE_VERSION, CONTEXT)
+    require(
+        key == result_cache_key(AUDIO_HASH, "lead", analyzer.ENGINE_VERSION, dict(CONTEXT)),
+        "Cache key is not stable",
+    )
+    variants = {
+        "part": result_cache_key(AUDIO_HASH, "rhythm", analyzer.ENGINE_VERSION, CONTEXT),
+        "engine": result_cache_key(AUDIO_HASH, "lead", analyzer.ENGINE_VERSION + "-next", CONTEXT),
+        "context": result_cache_key(AUDIO_HASH, "lead", analyzer.ENGINE_VERSION, None),
+        "audio": result_cache_key("b" * 64, "lead", analyzer.ENGINE_VERSION, CONTEXT),
+    }
+    for field, other in variants.items():
+        require(other != key, f"Changing the {field} did not change the cache key")
+
+    events = stairway_note_events()
+    provider = NoteEventProvider("stairway.wav", predict=lambda _path: (None, None, list(events)))
+    pipeline = build_resolved_pipeline(analyzer)
+    result = analyzer.to_json_safe(pipeline.analyze("stairway.wav", "lead", provider))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        cache = ResultCache(temp_dir, max_bytes=64 * 1024 * 1024)
+        require(cache.load(key) is None, "Empty cache returned a result")
+        cache.store(key, result)
+        require(cache.load(key) == result, "Cached result does not round-trip")
+        require(cache.hits == 1 and cache.misses == 1, "Hit/miss accounting drifted")
+
+        stored_bytes = cache.path_for(key).stat().st_size
+        raw_bytes = len(json.dumps(result, separators=(",", ":")).encode("utf-8"))
+        require(stored_bytes * 4 < raw_bytes, "Stored results are not compressed")
+        print(f"result {raw_bytes / 1024:.0f} KiB stored as {stored_bytes / 1024:.0f} KiB")
+
+        cache.path_for(variants["part"]).write_bytes(b"not gzip")
+        require(cache.load(variants["part"]) is None, "Corrupt entry was served")
+
+        small = ResultCache(temp_dir, max_bytes=stored_bytes * 2 + stored_bytes // 2)
+        for other in variants.values():
+            small.store(other, result)
+        remaining = sorted(path.name for path in Path(temp_dir).glob("*.json.gz"))
+        require(len(remaining) == 2, f"Size-based eviction kept {len(remaining)} entries")
+        require(small.evictions >= 3, "Evictions were not reported")
+
+    # Another container's entry is only visible after a reload.
+    with tempfile.TemporaryDirectory() as writer_dir, tempfile.TemporaryDirectory() as reader_dir:
+        writer = ResultCache(writer_dir)
+        writer.store(key, result)
+        reader = ResultCache(
+            reader_dir,
+            refresh=lambda: shutil.copytree(writer_dir, reader_dir, dirs_exist_ok=True),
+            refresh_interval=0.0,
+        )
+        require(reader.load(key) == result, "A miss did not reload before giving up")
+        require(reader.load(key) == result, "A reloaded entry was not kept")
+        require(
+            (reader.hits, reader.misses, reader.refreshes) == (2, 0, 1),
+            "A hit must only reload when the first lookup missed",
+        )
+        require(reader.load(variants["audio"]) is None, "A reload invented an entry")
+        require((reader.misses, reader.refreshes) == (1, 2), "A miss after a reload was not counted once")
+
+    # Misses inside the interval share the last refresh.
+    with tempfile.TemporaryDirectory() as temp_dir:
+        reloads: list[int] = []
+        throttled = ResultCache(temp_dir, refresh=lambda: reloads.append(1), refresh_interval=60.0)
+        for other in variants.values():
+            require(throttled.load(other) is None, "An empty cache returned a result")
+        require(len(reloads) == 1 and throttled.refreshes == 1, f"{len(reloads)} reloads for misses within one interval")
+        require(throttled.misses == len(variants), "Throttled misses were not counted")
+
+    class BusyVolume:
+        def reload(self) -> None:
+            raise RuntimeError("there are open files preventing the operation")
+
+    volume = analyzer.RESULT_CACHE_VOLUME
+    analyzer.RESULT_CACHE_VOLUME = BusyVolume()
+    try:
+        analyzer.reload_result_cache()
+    finally:
+        analyzer.RESULT_CACHE_VOLUME = volume
+
+    print("VERSIONED ANALYSIS RESULT CACHE PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v73 as analyzer  # noqa: E402
+from check_analysis_jobs import fingerprint  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+from result_stream import STREAM_FORMATS, ProgressiveStream  # noqa: E402
+
+
+PARTS = ["lead", "rhythm"]
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+def provider_for(name: str, events: list[Any]) -> NoteEventProvider:
+    return NoteEventProvider(f"{name}.wav", predict=lambda _path: (None, None, list(events)))
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+    for name, events in fixtures.items():
+        stream = ProgressiveStream(pipeline.render_tab)
+        records: list[dict[str, Any]] = []
+        generator = stream.run(
+            lambda on_window, name=name, events=events: pipeline.analyze_parts(
+                f"{name}.wav",
+                PARTS,
+                provider_for(name, events),
+                on_window=on_window,
+            )
+        )
+        while True:
+            try:
+                records.append(next(generator))
+            except StopIteration as finished:
+                results = finished.value
+                break
+        total_seconds = stream.elapsed()
+
+        for part in PARTS:
+            expected = pipeline.analyze(f"{name}.wav", part, provider_for(name, events))
+            require(
+                fingerprint(analyzer.to_json_safe(results[part]))
+                == fingerprint(analyzer.to_json_safe(expected)),
+                f"{name} {part}: streamed run changed the final result",
+            )
+            windows = [record for record in records if record["transcriptionType"] == part]
+            require(
+                [(record["phraseIndex"], record["windowIndex"]) for record in windows]
+                == [
+                    (window["phraseIndex"], window["windowIndex"])
+                    for window in expected["musicalUnderstanding"]["harmonicWindows"]
+                ],
+                f"{name} {part}: window records do not cover every window in order",
+            )
+            require(
+                sum(len(record["groups"]) for record in windows) == expected["onsetGroupCount"],
+                f"{name} {part}: window records lost mapped groups",
+            )
+            require(all(record["tab"] for record in windows), f"{name} {part}: a window lost its tab system")
+
+        require(stream.window_records == len(records), "Window records were not counted")
+        require(
+            stream.first_measure_seconds is not None and stream.first_measure_seconds < total_seconds / 2,
+            f"{name}: first measure at {stream.first_measure_seconds} s of {total_seconds} s",
+        )
+        print(
+            f"{name}: {len(records)} window records, first measure after "
+            f"{stream.first_measure_seconds * 1000:.0f} ms of {total_seconds * 1000:.0f} ms"
+        )
+
+        _, ndjson = STREAM_FORMATS["ndjson"]
+        lines = "".join(ndjson(analyzer.to_json_safe(record)) for record in records).splitlines()
+        require(
+            [json.loads(line)["windowIndex"] for line in lines] == [record["windowIndex"] for record in records],
+            "NDJSON records do not round-trip",
+        )
+        _, sse = STREAM_FORMATS["sse"]
+        require(sse(analyzer.to_json_safe(records[0])).startswith("event: window\ndata: {"), "SSE framing drifted")
+
+    # A client that disconnects after the first record stops the analysis.
+    calls: list[int] = []
+
+    def slow_analysis(on_window: Any) -> str:
+        for index in range(50):
+            calls.append(index)
+            on_window("lead", 0, index, [])
+            time.sleep(0.01)
+        return "finished"
+
+    generator = ProgressiveStream(pipeline.render_tab).run(slow_analysis)
+    next(generator)
+    generator.close()
+    time.sleep(0.1)
+    require(len(calls) < 50, "Analysis kept running after the client disconnected")
+
+    def failing_analysis(on_window: Any) -> None:
+        raise ValueError("The uploaded audio could not be normalized.")
+
+    try:
+        list(ProgressiveStream(pipeline.render_tab).run(failing_analysis))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Analysis errors must reach the consuming thread")
+
+    summary = analyzer.time_to_first_measure_summary([0.4, 0.1, 0.3])
+    require(summary == {"count": 3, "medianSeconds": 0.3, "maxSeconds": 0.4}, "Metric summary drifted")
+
+    print("PROGRESSIVE WINDOW STREAMING PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import modal_analyzer_v67 as v67  # noqa: E402
+import modal_analyzer_v73 as analyzer  # noqa: E402
+import phrase_viterbi  # noqa: E402
+from check_phrase_beam_parity_v73 import (  # noqa: E402
+    gomyway_note_events,
+    stairway_note_events,
+)
+from note_event_provider import NoteEventProvider  # noqa: E402
+from resolved_pipeline import build_resolved_pipeline  # noqa: E402
+
+v29 = v67.v29
+
+
+def require(condition: bool, message: str) -> None:
+    if not condition:
+        raise AssertionError(message)
+
+
+class SharedSearchSpy:
+    """Run the shared search and the per-anchor loop on every window."""
+
+    def __init__(self) -> None:
+        self.windows = 0
+        self.anchors = 0
+        self.shared_seconds = 0.0
+        self.per_anchor_seconds = 0.0
+
+    def __call__(
+        self,
+        window: list[list[dict[str, Any]]],
+        transcription_type: str,
+        anchors: list[int],
+        previous_assignment: Any,
+    ) -> list[tuple[int, float, Any]]:
+        started = time.perf_counter()
+        shared = v67.shared_anchor_phrase_paths(window, transcription_type, anchors, previous_assignment)
+        self.shared_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        per_anchor = v67._per_anchor_phrase_paths(window, transcription_type, anchors, previous_assignment)
+        self.per_anchor_seconds += time.perf_counter() - started
+        require(
+            [(anchor, score) for anchor, score, _ in shared]
+            == [(anchor, score) for anchor, score, _ in per_anchor],
+            f"Anchor scores drifted on window {self.windows}",
+        )
+        require(
+            [path for _, _, path in shared] == [path for _, _, path in per_anchor],
+            f"Anchor paths drifted on window {self.windows}",
+        )
+        self.windows += 1
+        self.anchors += len(anchors)
+        return shared
+
+
+def main() -> None:
+    pipeline = build_resolved_pipeline(analyzer)
+    fixtures = {"stairway": stairway_note_events(), "gomyway": gomyway_note_events()}
+
+    def run(label: str) -> SharedSearchSpy:
+        spy = SharedSearchSpy()
+        v29.anchor_phrase_paths = spy
+        try:
+            for name, events in fixtures.items():
+                for part in ("lead", "rhythm"):
+                    pipeline.analyze(
+                        f"{name}.wav",
+                        part,
+                        NoteEventProvider(f"{name}.wav", predict=lambda _path, events=events: (None, None, list(events))),
+                    )
+        finally:
+            v29.anchor_phrase_paths = v67.shared_anchor_phrase_paths
+        require(spy.windows > 0, f"{label}: no window reached the anchor search")
+        print(
+            f"{label}: {spy.windows} windows, {spy.anchors} anchors: "
+            f"shared {spy.shared_seconds * 1000:.0f} ms vs per-anchor {spy.per_anchor_seconds * 1000:.0f} ms"
+        )
+        return spy
+
+    run("Exact single-note search")
+    # Chord windows, and with every window on the beam, share the most.
+    is_monophonic = phrase_viterbi.is_monophonic
+    phrase_viterbi.is_monophonic = lambda groups: False
+    try:
+        run("All windows on the beam")
+    finally:
+        phrase_viterbi.is_monophonic = is_monophonic
+
+    # A replaced phrase builder is still called once per anchor.
+    calls: list[int] = []
+    builder = v67.v25.build_phrase_paths
+    v67.v25.build_phrase_paths = lambda window, transcription_type, anchor, previous: calls.append(anchor) or []
+    try:
+        require(v29.anchor_phrase_paths([[]], "lead", [5, 0, 7], None) == [], "A custom builder found paths")
+    finally:
+        v67.v25.build_phrase_paths = builder
+    require(calls == [5, 0, 7], "A custom builder must be called per anchor, in order")
+
+    print("V73 SHARED MULTI-ANCHOR SEARCH PRESERVED 💚")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import bisect
 from collections import Counter
 from typing import Any
 
@@ -54,43 +55,73 @@ def build_soft_register_windows(
     window_seconds: float = 0.46,
     hop_seconds: float = 0.08,
 ) -> list[dict[str, Any]]:
+    """Slide the soft-register window across the harmonic events.
+
+    Events enter a sweep-line active set as the window reaches their start and
+    leave once the cursor passes their end, so each hop only touches events
+    that overlap it. Pitch-class evidence is summed in 12-wide vectors in the
+    original event order, which keeps the window dicts identical to the
+    all-events scan.
+    """
     if not events:
         return []
 
-    first = min(float(event["start"]) for event in events)
-    last = max(float(event["end"]) for event in events)
+    import numpy as np
+
+    starts = [float(event["start"]) for event in events]
+    ends = [float(event["end"]) for event in events]
+    midis = [int(event["midi"]) for event in events]
+    durations = [float(event.get("duration") or 0.0) for event in events]
+    start_array = np.asarray(starts, dtype=np.float64)
+    end_array = np.asarray(ends, dtype=np.float64)
+    pitch_class_array = np.asarray(
+        [int(event["pitchClass"]) for event in events],
+        dtype=np.intp,
+    )
+    weight_array = np.asarray(
+        [register_weight(midi) for midi in midis],
+        dtype=np.float64,
+    )
+    by_start = sorted(range(len(events)), key=lambda position: starts[position])
+
+    first = min(starts)
+    last = max(ends)
     windows: list[dict[str, Any]] = []
     cursor = first
     index = 0
+    pending = 0
+    active: list[int] = []
 
     while cursor <= last:
         window_end = cursor + window_seconds
-        active = [
-            event
-            for event in events
-            if float(event["start"]) < window_end
-            and float(event["end"]) > cursor
-        ]
+        while pending < len(by_start) and starts[by_start[pending]] < window_end:
+            bisect.insort(active, by_start[pending])
+            pending += 1
+        active = [position for position in active if ends[position] > cursor]
 
         if active:
-            support: Counter[int] = Counter()
-            weighted_duration: Counter[int] = Counter()
-            raw_duration: Counter[int] = Counter()
-
-            for event in active:
-                pitch_class = int(event["pitchClass"])
-                overlap = max(
-                    0.0,
-                    min(float(event["end"]), window_end)
-                    - max(float(event["start"]), cursor),
-                )
-                weight = register_weight(int(event["midi"]))
-                support[pitch_class] += 1
-                raw_duration[pitch_class] += overlap
-                weighted_duration[pitch_class] += overlap * weight
+            positions = np.asarray(active, dtype=np.intp)
+            pitch_classes = pitch_class_array[positions]
+            overlap = np.maximum(
+                0.0,
+                np.minimum(end_array[positions], window_end)
+                - np.maximum(start_array[positions], cursor),
+            )
+            support = np.bincount(pitch_classes, minlength=12).tolist()
+            raw_duration = np.bincount(
+                pitch_classes,
+                weights=overlap,
+                minlength=12,
+            ).tolist()
+            weighted_duration = np.bincount(
+                pitch_classes,
+                weights=overlap * weight_array[positions],
+                minlength=12,
+            ).tolist()
+            present = list(dict.fromkeys(pitch_classes.tolist()))
 
             ranked = sorted(
-                support,
+                present,
                 key=lambda pitch_class: (
                     weighted_duration[pitch_class],
                     raw_duration[pitch_class],
@@ -98,26 +129,26 @@ def build_soft_register_windows(
                 ),
                 reverse=True,
             )
+            active_midis = {midis[position] for position in active}
 
             windows.append({
                 "windowIndex": index,
                 "start": cursor,
                 "end": window_end,
                 "eventCount": len(active),
-                "uniqueMidiCount": len({int(event["midi"]) for event in active}),
-                "midis": sorted({int(event["midi"]) for event in active}),
-                "pitchClasses": sorted(support),
+                "uniqueMidiCount": len(active_midis),
+                "midis": sorted(active_midis),
+                "pitchClasses": sorted(present),
                 "rankedPitchClasses": ranked,
                 "pitchClassSupport": {
-                    str(key): value for key, value in support.items()
+                    str(key): support[key] for key in present
                 },
                 "pitchClassWeightedDuration": {
-                    str(key): round(value, 4)
-                    for key, value in weighted_duration.items()
+                    str(key): round(weighted_duration[key], 4)
+                    for key in present
                 },
                 "maximumEventDuration": max(
-                    float(event.get("duration") or 0.0)
-                    for event in active
+                    durations[position] for position in active
                 ),
             })
 
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+try:
+    from audio_decode import DecodedAudio
+except ImportError:
+    from analyzer.audio_decode import DecodedAudio
+
+# Each chunk's own region runs to the middle of its overlaps, so a chunk is
+# never trusted within OVERLAP / 2 of an edge it shares with a neighbour.
+DEFAULT_CHUNK_SECONDS = 60.0
+DEFAULT_OVERLAP_SECONDS = 4.0
+# Same pitch, onsets this close: one note seen by both chunks of a boundary.
+ONSET_TOLERANCE_SECONDS = 0.05
+# A note ending this close to a chunk's cut edge was truncated by the cut.
+EDGE_TOLERANCE_SECONDS = 0.1
+
+ChunkEvents = list[Any]
+MapChunks = Callable[[Iterable[Any]], Iterable[ChunkEvents]]
+
+
+@dataclass(frozen=True)
+class ChunkSpan:
+    """One inference chunk, in samples, and the onsets it is trusted for."""
+
+    index: int
+    start: int
+    end: int
+    own_start: float
+    own_end: float
+    cut_end: float | None
+
+
+def chunk_spans(
+    sample_count: int,
+    sample_rate: int,
+    chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+    overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+) -> list[ChunkSpan]:
+    """Cut ``sample_count`` samples into fixed chunks that overlap their neighbours."""
+    chunk = max(1, int(round(chunk_seconds * sample_rate)))
+    overlap = min(max(0, int(round(overlap_seconds * sample_rate))), chunk - 1)
+    hop = chunk - overlap
+    starts = [0]
+    while starts[-1] + chunk < sample_count:
+        starts.append(starts[-1] + hop)
+
+    spans: list[ChunkSpan] = []
+    for index, start in enumerate(starts):
+        end = min(start + chunk, sample_count)
+        last = index == len(starts) - 1
+        spans.append(
+            ChunkSpan(
+                index=index,
+                start=start,
+                end=end,
+                own_start=0.0 if index == 0 else (start + overlap / 2) / sample_rate,
+                own_end=float("inf") if last else (end - overlap / 2) / sample_rate,
+                cut_end=None if last else end / sample_rate,
+            )
+        )
+    return spans
+
+
+def shifted_event(event: Any, offset: float) -> tuple[Any, ...]:
+    start, end, pitch, amplitude, *rest = event
+    bends = rest[0] if rest else None
+    return (float(start) + offset, float(end) + offset, int(pitch), amplitude, bends)
+
+
+def stitch_note_events(
+    chunk_events: list[ChunkEvents],
+    spans: list[ChunkSpan],
+    sample_rate: int,
+    *,
+    onset_tolerance: float = ONSET_TOLERANCE_SECONDS,
+    edge_tolerance: float = EDGE_TOLERANCE_SECONDS,
+) -> tuple[list[tuple[Any, ...]], dict[str, int]]:
+    """Join per-chunk note events into one song-time event list.
+
+    Every chunk keeps the notes whose onset falls in its own region. A kept
+    note that runs into the chunk's cut edge is extended with the next
+    chunk's view of the same pitch, which saw the rest of it. A note kept
+    from one chunk and a same-pitch note kept from its neighbour, both with
+    onsets inside their shared overlap and within ``onset_tolerance`` of each
+    other, are one note seen twice and collapse into the longer one. Fast
+    repeats anywhere else stay separate notes, as in a single pass.
+    """
+    absolute = [
+        [shifted_event(event, span.start / sample_rate) for event in events]
+        for span, events in zip(spans, chunk_events)
+    ]
+
+    # (note, position of the chunk it was kept from)
+    kept: list[tuple[list[Any], int]] = []
+    extended = 0
+    for position, (span, events) in enumerate(zip(spans, absolute)):
+        for event in events:
+            if not span.own_start <= event[0] < span.own_end:
+                continue
+            note = list(event)
+            following = position + 1
+            cut_end = span.cut_end
+            # Follow a sustained note across as many cut edges as it crosses.
+            while cut_end is not None and note[1] >= cut_end - edge_tolerance:
+                continuation = max(
+                    (
+                        other
+                        for other in absolute[following]
+                        if other[2] == note[2]
+                        and other[0] <= note[1] + edge_tolerance
+                        and other[1] > note[1]
+                    ),
+                    key=lambda other: other[1],
+                    default=None,
+                )
+                if continuation is None:
+                    break
+                note[1] = continuation[1]
+                extended += 1
+                cut_end = spans[following].cut_end
+                following += 1
+            kept.append((note, position))
+
+    def seen_twice(earlier: tuple[list[Any], int], later: tuple[list[Any], int]) -> bool:
+        (first, first_position), (second, second_position) = earlier, later
+        if abs(first_position - second_position) != 1 or second[0] - first[0] > onset_tolerance:
+            return False
+        left = spans[min(first_position, second_position)]
+        right = spans[max(first_position, second_position)]
+        overlap_start = right.start / sample_rate
+        overlap_end = left.end / sample_rate
+        return overlap_start <= first[0] <= overlap_end and overlap_start <= second[0] <= overlap_end
+
+    kept.sort(key=lambda entry: (entry[0][0], entry[0][2]))
+    stitched: list[list[Any]] = []
+    duplicates = 0
+    latest_by_pitch: dict[int, tuple[list[Any], int]] = {}
+    for entry in kept:
+        note = entry[0]
+        previous = latest_by_pitch.get(note[2])
+        if previous is not None and seen_twice(previous, entry):
+            previous[0][1] = max(previous[0][1], note[1])
+            duplicates += 1
+            continue
+        latest_by_pitch[note[2]] = entry
+        stitched.append(note)
+
+    return [tuple(note) for note in stitched], {
+        "extendedAcrossBoundaries": extended,
+        "duplicatesRemoved": duplicates,
+    }
+
+
+def basic_pitch_chunk_events(samples: Any) -> ChunkEvents:
+    """Worker body: note events for one chunk of model-rate samples."""
+    try:
+        from basic_pitch_model import shared_model
+    except ImportError:
+        from analyzer.basic_pitch_model import shared_model
+
+    _, _, note_events = shared_model().predict(DecodedAudio("chunk", samples))
+    return [tuple(event) for event in note_events]
+
+
+def merge_chunk_diagnostics(reports: list[dict[str, Any]]) -> dict[str, Any] | None:
+    """One chunking report for several ``ChunkedPredict`` calls, such as the
+    active regions of a gated upload."""
+    if not reports:
+        return None
+    return {
+        "chunkCount": sum(report["chunkCount"] for report in reports),
+        "chunkSeconds": reports[0]["chunkSeconds"],
+        "overlapSeconds": reports[0]["overlapSeconds"],
+        "extendedAcrossBoundaries": sum(report["extendedAcrossBoundaries"] for report in reports),
+        "duplicatesRemoved": sum(report["duplicatesRemoved"] for report in reports),
+        "inferenceSeconds": round(sum(report["inferenceSeconds"] for report in reports), 4),
+        "regionCount": len(reports),
+    }
+
+
+class ChunkedPredict:
+    """``predict`` replacement that fans one long upload out over workers.
+
+    Decoded samples are cut by :func:`chunk_spans`; ``map_chunks`` runs a
+    chunk transcriber (``basic_pitch_chunk_events`` or a Modal function's
+    ``.map``) over the chunks in parallel and must yield results in order.
+    Uploads no longer than one chunk go to ``map_chunks`` as a single chunk.
+
+    Calls keep the ``(model_output, midi_data, note_events)`` shape with
+    ``None`` for the first two values, as cache hits do.
+    """
+
+    def __init__(
+        self,
+        map_chunks: MapChunks,
+        *,
+        chunk_seconds: float = DEFAULT_CHUNK_SECONDS,
+        overlap_seconds: float = DEFAULT_OVERLAP_SECONDS,
+    ) -> None:
+        self.map_chunks = map_chunks
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self._local = threading.local()
+
+    @property
+    def last_diagnostics(self) -> dict[str, Any] | None:
+        """Chunking report of the calling thread's most recent prediction."""
+        return getattr(self._local, "diagnostics", None)
+
+    def __call__(self, audio: Any) -> Any:
+        if not hasattr(audio, "samples"):
+            raise TypeError("Chunked inference needs decoded samples, not a file path.")
+        started = time.perf_counter()
+        spans = chunk_spans(
+            len(audio.samples),
+            audio.sample_rate,
+            self.chunk_seconds,
+            self.overlap_seconds,
+        )
+        chunk_events = list(
+            self.map_chunks(audio.samples[span.start : span.end] for span in spans)
+        )
+        note_events, stitching = stitch_note_events(
+            chunk_events,
+            spans,
+            audio.sample_rate,
+        )
+        self._local.diagnostics = {
+            "chunkCount": len(spans),
+            "chunkSeconds": self.chunk_seconds,
+            "overlapSeconds": self.overlap_seconds,
+            **stitching,
+            "inferenceSeconds": round(time.perf_counter() - started, 4),
+        }
+        return None, None, note_events
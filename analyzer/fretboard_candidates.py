@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable, Sequence
+
+
+DEFAULT_MAX_CACHE_ENTRIES = 8192
+
+Position = tuple[int, int]
+
+
+def playable_combinations(
+    options: Sequence[Sequence[Position]],
+    max_string_span: int,
+    max_fret_span: int,
+    limit: int | None = None,
+) -> list[tuple[int, ...]]:
+    """Return option indices for every playable combination, in product order.
+
+    ``options`` holds the candidate ``(string, fret)`` positions for each note
+    slot. Rows follow ``itertools.product`` order, and ``limit`` only tests the
+    first rows like the capped loops it replaces. A combination survives when
+    no string is reused, the string span fits and the fretted notes fit the
+    fret span.
+    """
+    import numpy as np
+
+    counts = [len(slot) for slot in options]
+    if not counts or min(counts) == 0:
+        return []
+
+    total = 1
+    for count in counts:
+        total *= count
+    rows = total if limit is None else min(total, int(limit))
+
+    strings = np.empty((len(counts), rows), dtype=np.int16)
+    frets = np.empty((len(counts), rows), dtype=np.int16)
+    inner = total
+    for slot, positions in enumerate(options):
+        inner //= counts[slot]
+        column = np.arange(rows, dtype=np.int64) // inner % counts[slot]
+        strings[slot] = np.asarray([item[0] for item in positions], dtype=np.int16)[column]
+        frets[slot] = np.asarray([item[1] for item in positions], dtype=np.int16)[column]
+
+    ordered = np.sort(strings, axis=0)
+    keep = np.all(ordered[1:] != ordered[:-1], axis=0)
+    keep &= ordered[-1] - ordered[0] <= max_string_span
+
+    fretted = frets > 0
+    highest = np.where(fretted, frets, np.iinfo(np.int16).min).max(axis=0)
+    lowest = np.where(fretted, frets, np.iinfo(np.int16).max).min(axis=0)
+    keep &= ~fretted.any(axis=0) | (highest - lowest <= max_fret_span)
+
+    survivors = np.flatnonzero(keep)
+    indices = np.unravel_index(survivors, counts)
+    return list(zip(*(axis.tolist() for axis in indices)))
+
+
+class ShapeCache:
+    """Bounded in-memory map from a group signature to its candidate shapes.
+
+    Repeated chords in a riff share one sorted MIDI tuple, so every repeat
+    after the first is a dictionary lookup instead of a fresh product.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_CACHE_ENTRIES) -> None:
+        self.max_entries = int(max_entries)
+        self._entries: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = build()
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = value
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "maxEntries": self.max_entries,
+        }
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable
+
+WindowInference = Callable[[Any], dict[str, Any]]
+
+DEFAULT_COLLECT_SECONDS = 0.03
+DEFAULT_MAX_BATCH_WINDOWS = 64
+
+
+class _BatchJob:
+    __slots__ = ("windows", "output", "error", "done")
+
+    def __init__(self, windows: Any) -> None:
+        self.windows = windows
+        self.output: dict[str, Any] | None = None
+        self.error: BaseException | None = None
+        self.done = threading.Event()
+
+
+class WindowBatcher:
+    """Run the model windows of concurrent requests through shared batches.
+
+    Basic Pitch cuts each file into fixed-size overlapping windows and scores
+    every window independently, so windows from different uploads can share
+    one forward pass. The first caller to arrive becomes the leader: it waits
+    ``collect_seconds`` for other requests, concatenates everything pending,
+    runs ``infer`` in chunks of at most ``max_batch_windows`` and hands each
+    request back exactly its own rows. Callers arriving while a batch runs
+    wait for it, then one of them leads the next round with everything that
+    piled up, so no caller keeps running rounds once its own rows are back.
+    """
+
+    def __init__(
+        self,
+        infer: WindowInference,
+        *,
+        collect_seconds: float = DEFAULT_COLLECT_SECONDS,
+        max_batch_windows: int = DEFAULT_MAX_BATCH_WINDOWS,
+    ) -> None:
+        self.infer = infer
+        self.collect_seconds = collect_seconds
+        self.max_batch_windows = max(1, int(max_batch_windows))
+        self._lock = threading.Lock()
+        self._turn = threading.Condition(self._lock)
+        self._pending: list[_BatchJob] = []
+        self._leader_active = False
+        self.rounds = 0
+        self.model_calls = 0
+        self.jobs = 0
+        self.windows = 0
+        self.largest_round_jobs = 0
+
+    def run(self, windows: Any) -> dict[str, Any]:
+        job = _BatchJob(windows)
+        with self._turn:
+            self._pending.append(job)
+            self._turn.wait_for(lambda: job.done.is_set() or not self._leader_active)
+            lead = not job.done.is_set()
+            if lead:
+                self._leader_active = True
+                # Later leaders already have a round's worth of callers waiting.
+                collect = len(self._pending) == 1
+        if lead:
+            self._lead(collect)
+        if job.error is not None:
+            raise job.error
+        assert job.output is not None
+        return job.output
+
+    def _lead(self, collect: bool) -> None:
+        """Run one round, which includes the leader's own job, then hand over."""
+        try:
+            if collect and self.collect_seconds > 0:
+                time.sleep(self.collect_seconds)
+            with self._lock:
+                jobs = self._pending
+                self._pending = []
+            self._run_round(jobs)
+        finally:
+            with self._turn:
+                self._leader_active = False
+                self._turn.notify_all()
+
+    def _run_round(self, jobs: list[_BatchJob]) -> None:
+        import numpy as np
+
+        try:
+            counts = [len(job.windows) for job in jobs]
+            batch = np.concatenate([job.windows for job in jobs], axis=0)
+            outputs: dict[str, list[Any]] = {}
+            for start in range(0, len(batch), self.max_batch_windows):
+                chunk = self.infer(batch[start : start + self.max_batch_windows])
+                self.model_calls += 1
+                for key, value in chunk.items():
+                    outputs.setdefault(key, []).append(np.asarray(value))
+            merged = {
+                key: np.concatenate(values, axis=0)
+                for key, values in outputs.items()
+            }
+            offset = 0
+            for job, count in zip(jobs, counts):
+                job.output = {
+                    key: value[offset : offset + count]
+                    for key, value in merged.items()
+                }
+                offset += count
+        except BaseException as error:  # hand the failure to every waiter
+            for job in jobs:
+                job.error = error
+        finally:
+            self.rounds += 1
+            self.jobs += len(jobs)
+            self.windows += sum(len(job.windows) for job in jobs)
+            self.largest_round_jobs = max(self.largest_round_jobs, len(jobs))
+            for job in jobs:
+                job.done.set()
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "collectSeconds": self.collect_seconds,
+            "maxBatchWindows": self.max_batch_windows,
+            "rounds": self.rounds,
+            "modelCalls": self.model_calls,
+            "jobs": self.jobs,
+            "windows": self.windows,
+            "largestRoundJobs": self.largest_round_jobs,
+        }
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+
+PredictFunction = Callable[[str], Any]
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_CACHE_DIRECTORY = os.path.join(
+    tempfile.gettempdir(),
+    "dadrock-inference-cache",
+)
+DEFAULT_MAX_CACHE_BYTES = 512 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+
+# Mirrors normalize_audio_file in modal_analyzer.py and modal_analyzer_v15.py.
+DEFAULT_NORMALIZATION = {
+    "sampleRate": 44100,
+    "channels": 2,
+    "codec": "pcm_s16le",
+}
+
+
+def basic_pitch_model_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return f"basic-pitch-{version('basic-pitch')}"
+    except PackageNotFoundError:
+        return "basic-pitch-unknown"
+
+
+def audio_content_hash(audio_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(audio_path, "rb") as file:
+        for chunk in iter(lambda: file.read(HASH_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(
+    content_hash: str,
+    model_version: str,
+    normalization: dict[str, Any],
+) -> str:
+    """Address one inference by audio content, model and normalization."""
+    material = json.dumps(
+        {
+            "format": CACHE_FORMAT_VERSION,
+            "audio": content_hash,
+            "model": model_version,
+            "normalization": normalization,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def pack_note_events(note_events: list[Any]) -> dict[str, Any]:
+    """Flatten Basic Pitch note tuples into compact columnar arrays."""
+    import numpy as np
+
+    starts: list[float] = []
+    ends: list[float] = []
+    pitches: list[int] = []
+    amplitudes: list[float] = []
+    bend_values: list[int] = []
+    bend_offsets: list[int] = [0]
+    has_bends: list[bool] = []
+
+    for event in note_events:
+        values = list(event)
+        starts.append(float(values[0]))
+        ends.append(float(values[1]))
+        pitches.append(int(values[2]))
+        amplitudes.append(float(values[3]) if len(values) > 3 else 0.0)
+        bends = values[4] if len(values) > 4 else None
+        if bends is None:
+            has_bends.append(False)
+        else:
+            has_bends.append(True)
+            bend_values.extend(int(value) for value in bends)
+        bend_offsets.append(len(bend_values))
+
+    return {
+        "start": np.asarray(starts, dtype=np.float64),
+        "end": np.asarray(ends, dtype=np.float64),
+        "pitch": np.asarray(pitches, dtype=np.int16),
+        "amplitude": np.asarray(amplitudes, dtype=np.float32),
+        "bendValues": np.asarray(bend_values, dtype=np.int32),
+        "bendOffsets": np.asarray(bend_offsets, dtype=np.int64),
+        "hasBends": np.asarray(has_bends, dtype=np.bool_),
+    }
+
+
+def unpack_note_events(arrays: Any) -> list[tuple[float, float, int, float, list[int] | None]]:
+    starts = arrays["start"].tolist()
+    ends = arrays["end"].tolist()
+    pitches = arrays["pitch"].tolist()
+    amplitudes = arrays["amplitude"].tolist()
+    bend_values = arrays["bendValues"].tolist()
+    bend_offsets = arrays["bendOffsets"].tolist()
+    has_bends = arrays["hasBends"].tolist()
+
+    return [
+        (
+            starts[index],
+            ends[index],
+            pitches[index],
+            amplitudes[index],
+            bend_values[bend_offsets[index] : bend_offsets[index + 1]]
+            if has_bends[index]
+            else None,
+        )
+        for index in range(len(starts))
+    ]
+
+
+def evict_least_recently_used(directory: Path, pattern: str, max_bytes: int) -> int:
+    """Delete the oldest-touched entries until ``directory`` fits ``max_bytes``."""
+    entries: list[tuple[float, int, Path]] = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    evicted = 0
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries, key=lambda item: item[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        evicted += 1
+    return evicted
+
+
+class NoteEventCache:
+    """Content-addressed on-disk store of raw Basic Pitch note events.
+
+    Entries are compressed ``.npz`` files named by :func:`cache_key`. Reading
+    an entry refreshes its modification time, and writes evict the least
+    recently used entries until the directory fits ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int | None = None,
+    ) -> None:
+        self.directory = Path(
+            directory
+            or os.environ.get("ANALYZER_INFERENCE_CACHE_DIR")
+            or DEFAULT_CACHE_DIRECTORY
+        )
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("ANALYZER_INFERENCE_CACHE_MAX_BYTES")
+            or DEFAULT_MAX_CACHE_BYTES
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.npz"
+
+    def load(self, key: str) -> list[Any] | None:
+        import numpy as np
+
+        path = self.path_for(key)
+        try:
+            with np.load(path, allow_pickle=False) as arrays:
+                note_events = unpack_note_events(arrays)
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return note_events
+
+    def store(self, key: str, note_events: list[Any]) -> None:
+        import numpy as np
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        arrays = pack_note_events(note_events)
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory,
+            suffix=".partial",
+            delete=False,
+        ) as temporary_file:
+            np.savez_compressed(temporary_file, **arrays)
+            temporary_path = temporary_file.name
+        os.replace(temporary_path, self.path_for(key))
+        self.evict()
+
+    def evict(self) -> None:
+        self.evictions += evict_least_recently_used(self.directory, "*.npz", self.max_bytes)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "maxBytes": self.max_bytes,
+        }
+
+
+class CachedPredict:
+    """Wrap a Basic Pitch style ``predict`` with the content-addressed cache.
+
+    Calls keep the ``(model_output, midi_data, note_events)`` return shape.
+    Cache hits return ``None`` for the first two values because the analyzer
+    only consumes note events. Cache I/O failures fall back to inference.
+    """
+
+    def __init__(
+        self,
+        predict: PredictFunction,
+        cache: NoteEventCache | None = None,
+        *,
+        model_version: str | None = None,
+        normalization: dict[str, Any] | None = None,
+    ) -> None:
+        self.predict = predict
+        self.cache = cache or NoteEventCache()
+        self.model_version = model_version
+        self.normalization = dict(normalization or DEFAULT_NORMALIZATION)
+        self._local = threading.local()
+
+    @property
+    def last_status(self) -> str | None:
+        """Cache outcome of the calling thread's most recent prediction."""
+        return getattr(self._local, "status", None)
+
+    @last_status.setter
+    def last_status(self, status: str | None) -> None:
+        self._local.status = status
+
+    def key_for(self, audio: Any) -> str:
+        """Key a file path by its bytes, or decoded samples by their own hash."""
+        if hasattr(audio, "content_hash"):
+            return cache_key(
+                audio.content_hash(),
+                self.model_version or basic_pitch_model_version(),
+                audio.normalization,
+            )
+        return cache_key(
+            audio_content_hash(audio),
+            self.model_version or basic_pitch_model_version(),
+            self.normalization,
+        )
+
+    def __call__(self, audio_path: Any) -> Any:
+        key = self.key_for(audio_path)
+        note_events = self.cache.load(key)
+        if note_events is not None:
+            self.last_status = "hit"
+            return None, None, note_events
+
+        model_output, midi_data, note_events = self.predict(audio_path)
+        self.last_status = "miss"
+        try:
+            self.cache.store(key, list(note_events))
+        except OSError:
+            self.last_status = "miss-unstored"
+        return model_output, midi_data, note_events
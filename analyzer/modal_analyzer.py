@@ -7,6 +7,13 @@ from typing import Any
 
 import modal
 
+try:
+    from audio_ingest import AudioDownloadError, download_audio
+    from note_event_provider import NoteEventProvider
+except ImportError:
+    from analyzer.audio_ingest import AudioDownloadError, download_audio
+    from analyzer.note_event_provider import NoteEventProvider
+
 app = modal.App("dadrock-tab-analyzer")
 
 image = (
@@ -17,6 +24,11 @@ image = (
         "fastapi[standard]",
         "requests",
     )
+    .add_local_python_source(
+        "audio_ingest",
+        "note_event_provider",
+        "inference_cache",
+    )
 )
 
 STANDARD_GUITAR_TUNING = [
@@ -449,9 +461,9 @@ def analyze_audio_file(
     audio_path: str,
     transcription_type: str,
 ) -> dict[str, Any]:
-    from basic_pitch.inference import predict
-
-    _, _, note_events = predict(audio_path)
+    # Repeated lead/rhythm/bass requests for the same upload share one
+    # content-addressed Basic Pitch inference.
+    note_events = NoteEventProvider(audio_path).note_events()
 
     normalized_events: list[dict[str, Any]] = []
     previous_string_index: int | None = None
@@ -528,7 +540,6 @@ def analyze_audio_file(
 )
 @modal.fastapi_endpoint(method="POST")
 def analyze(payload: dict) -> dict:
-    import requests
     from fastapi import HTTPException
 
     expected_token = os.environ.get("ANALYZER_API_TOKEN")
@@ -595,40 +606,13 @@ def analyze(payload: dict) -> dict:
         audio_path = Path(temp_dir) / f"uploaded{suffix}"
 
         try:
-            response = requests.get(
-                audio_url,
-                headers=request_headers,
-                timeout=120,
-            )
-        except requests.RequestException as error:
+            download_audio(audio_url, audio_path, request_headers)
+        except AudioDownloadError as error:
             raise HTTPException(
-                status_code=502,
-                detail=(
-                    "The analyzer could not "
-                    "download the audio file."
-                ),
+                status_code=error.status_code,
+                detail=error.detail,
             ) from error
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=502,
-                detail=(
-                    "The analyzer could not "
-                    "download the audio file."
-                ),
-            )
-
-        if len(response.content) > MAX_AUDIO_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail=(
-                    "The uploaded audio cannot "
-                    "be larger than 50 MB."
-                ),
-            )
-
-        audio_path.write_bytes(response.content)
-
         try:
             audio_metadata = inspect_audio_file(
                 str(audio_path)
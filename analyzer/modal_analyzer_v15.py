@@ -4,8 +4,10 @@ import subprocess
 import tempfile
 from pathlib import Path
 from typing import Any
+from urllib.parse import urlsplit
 
 import modal
+from audio_ingest import AudioDownloadError, download_audio
 
 app = modal.App("dadrock-tab-analyzer")
 
@@ -17,6 +19,7 @@ image = (
         "fastapi[standard]",
         "requests",
     )
+    .add_local_python_source("audio_ingest")
 )
 
 STANDARD_GUITAR_TUNING = [
@@ -39,6 +42,13 @@ MAX_FRET = 24
 MIN_AUDIO_DURATION_SECONDS = 3.0
 MAX_AUDIO_DURATION_SECONDS = 15 * 60
 MAX_AUDIO_SIZE_BYTES = 50 * 1024 * 1024
+REMOTE_PROBE_TIMEOUT_SECONDS = 20
+# The remote probe reads only over HTTP(S), with the demuxers of the upload
+# suffixes the API accepts; playlists, concat and local files are refused.
+REMOTE_PROBE_SCHEMES = ("http", "https")
+REMOTE_PROBE_PROTOCOLS = "https,http,tcp,tls"
+REMOTE_PROBE_FORMATS = "mp3,wav,mov,aac,flac,ogg"
+REMOTE_PROBE_BYTES = 5 * 1024 * 1024
 NORMALIZED_SAMPLE_RATE = 44100
 NORMALIZED_CHANNELS = 2
 MAX_RENDERED_GROUPS = 320
@@ -107,18 +117,29 @@ def extract_note_event(note_event: Any) -> dict[str, Any] | None:
     }
 
 
+def build_position_table(
+    tuning: list[tuple[str, int]],
+) -> dict[int, tuple[tuple[int, int], ...]]:
+    """Map every reachable MIDI pitch to its (string, fret) positions."""
+    table: dict[int, list[tuple[int, int]]] = {}
+    for string_index, (_, open_pitch) in enumerate(tuning):
+        for fret in range(MAX_FRET + 1):
+            table.setdefault(open_pitch + fret, []).append((string_index, fret))
+    return {midi: tuple(positions) for midi, positions in table.items()}
+
+
+POSITION_TABLES = {
+    "guitar": build_position_table(STANDARD_GUITAR_TUNING),
+    "bass": build_position_table(STANDARD_BASS_TUNING),
+}
+
+
 def playable_positions(
     midi_pitch: int,
     transcription_type: str,
 ) -> list[tuple[int, int]]:
-    positions: list[tuple[int, int]] = []
-    for string_index, (_, open_pitch) in enumerate(
-        get_tuning(transcription_type)
-    ):
-        fret = midi_pitch - open_pitch
-        if 0 <= fret <= MAX_FRET:
-            positions.append((string_index, fret))
-    return positions
+    table = POSITION_TABLES["bass" if transcription_type == "bass" else "guitar"]
+    return list(table.get(midi_pitch, ()))
 
 
 def estimate_bend_semitones(pitch_bends: Any) -> float:
@@ -441,6 +462,10 @@ def inspect_audio_file(audio_path: str) -> dict[str, Any]:
     except json.JSONDecodeError as error:
         raise ValueError("The uploaded audio returned invalid metadata.") from error
 
+    return metadata_from_probe(probe_data)
+
+
+def metadata_from_probe(probe_data: dict[str, Any]) -> dict[str, Any]:
     audio_stream = next(
         (
             stream
@@ -480,6 +505,97 @@ def inspect_audio_file(audio_path: str) -> dict[str, Any]:
     }
 
 
+def inspect_remote_audio(
+    audio_url: str,
+    headers: dict[str, str] | None = None,
+) -> dict[str, Any] | None:
+    """Probe an upload's container header over HTTP before downloading it.
+
+    ffprobe issues ranged reads for just the header (and the index, for
+    formats that keep it at the end). Returns ``None`` when the URL cannot be
+    probed or the probe finds no duration, so callers fall back to inspecting
+    the downloaded file; raises ``ValueError`` only when the probe proves the
+    upload has no audio.
+
+    Only ``http``/``https`` URLs are probed, and ffprobe may not follow them
+    into other protocols or container formats, so the probe cannot be
+    pointed at local files or playlists.
+    """
+    parts = urlsplit(audio_url)
+    if parts.scheme.lower() not in REMOTE_PROBE_SCHEMES or not parts.netloc:
+        return None
+    command = [
+        "ffprobe",
+        "-v",
+        "error",
+        "-protocol_whitelist",
+        REMOTE_PROBE_PROTOCOLS,
+        "-format_whitelist",
+        REMOTE_PROBE_FORMATS,
+        "-probesize",
+        str(REMOTE_PROBE_BYTES),
+        "-rw_timeout",
+        str(REMOTE_PROBE_TIMEOUT_SECONDS * 1_000_000),
+    ]
+    if headers:
+        command += [
+            "-headers",
+            "".join(f"{name}: {value}\r\n" for name, value in headers.items()),
+        ]
+    command += [
+        "-print_format",
+        "json",
+        "-show_format",
+        "-show_streams",
+        audio_url,
+    ]
+    try:
+        completed = subprocess.run(
+            command,
+            capture_output=True,
+            text=True,
+            timeout=REMOTE_PROBE_TIMEOUT_SECONDS,
+            check=False,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if completed.returncode != 0:
+        return None
+    try:
+        probe_data = json.loads(completed.stdout)
+    except json.JSONDecodeError:
+        return None
+    return remote_metadata_from_probe(probe_data)
+
+
+def remote_metadata_from_probe(probe_data: dict[str, Any]) -> dict[str, Any] | None:
+    """``metadata_from_probe`` for a header-only probe.
+
+    Chunked responses without a Content-Length, and streams whose duration is
+    only known once the whole file is read, probe with no duration; that is
+    ``None`` rather than a zero-second upload.
+    """
+    metadata = metadata_from_probe(probe_data)
+    if float(metadata["durationSeconds"]) <= 0:
+        return None
+    return metadata
+
+
+def validate_remote_metadata(metadata: dict[str, Any]) -> None:
+    """Pre-download subset of ``validate_audio_metadata``.
+
+    The duration bounds only apply to a duration the probe found, and the
+    size check only when the server reported one; the downloaded file is
+    validated in full, and the download enforces the byte cap itself.
+    """
+    checked = dict(metadata)
+    if float(checked.get("durationSeconds") or 0) <= 0:
+        checked["durationSeconds"] = MIN_AUDIO_DURATION_SECONDS
+    if int(checked.get("fileSize") or 0) <= 0:
+        checked["fileSize"] = 1
+    validate_audio_metadata(checked)
+
+
 def validate_audio_metadata(metadata: dict[str, Any]) -> None:
     duration = float(metadata.get("durationSeconds") or 0)
     size = int(metadata.get("fileSize") or 0)
@@ -594,7 +710,6 @@ def analyze_audio_file(
 )
 @modal.fastapi_endpoint(method="POST")
 def analyze(payload: dict) -> dict:
-    import requests
     from fastapi import HTTPException
 
     expected_token = os.environ.get("ANALYZER_API_TOKEN")
@@ -630,27 +745,13 @@ def analyze(payload: dict) -> dict:
         audio_path = Path(temp_dir) / f"uploaded{suffix}"
 
         try:
-            response = requests.get(audio_url, headers=headers, timeout=120)
-        except requests.RequestException as error:
+            download_audio(audio_url, audio_path, headers)
+        except AudioDownloadError as error:
             raise HTTPException(
-                status_code=502,
-                detail="The analyzer could not download the audio file.",
+                status_code=error.status_code,
+                detail=error.detail,
             ) from error
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=502,
-                detail="The analyzer could not download the audio file.",
-            )
-
-        if len(response.content) > MAX_AUDIO_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail="The uploaded audio cannot be larger than 50 MB.",
-            )
-
-        audio_path.write_bytes(response.content)
-
         try:
             original_metadata = inspect_audio_file(str(audio_path))
             validate_audio_metadata(original_metadata)
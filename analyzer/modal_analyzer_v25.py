@@ -1,17 +1,22 @@
-import itertools
 import os
 import statistics
 import tempfile
 from pathlib import Path
 from typing import Any
 
+import fretboard_candidates
 import modal
 import modal_analyzer_v24 as previous
+import phrase_beam
 
 base = previous.base
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
-image = previous.image.add_local_python_source("modal_analyzer_v24")
+image = previous.image.add_local_python_source(
+    "modal_analyzer_v24",
+    "fretboard_candidates",
+    "phrase_beam",
+)
 
 ANCHORS = (0, 2, 5, 7, 9, 12)
 GROUP_CANDIDATE_LIMIT = 28
@@ -19,6 +24,8 @@ PATH_BEAM_WIDTH = 48
 MAX_FRET_SPAN = 5
 MAX_STRING_SPAN = 5
 
+GROUP_SHAPE_CACHE = fretboard_candidates.ShapeCache()
+
 
 def to_json_safe(value: Any) -> Any:
     return previous.to_json_safe(value)
@@ -35,64 +42,82 @@ def assignment_key(
     )
 
 
-def all_group_assignments(
-    group: list[dict[str, Any]],
+def initial_shape_cost(shape: tuple[tuple[int, int], ...], anchor: int) -> float:
+    frets = [fret for _, fret in shape]
+    non_open = [fret for fret in frets if fret > 0]
+    strings = [string_index for string_index, _ in shape]
+    cost = 0.0
+    if non_open:
+        cost += abs(statistics.median(non_open) - anchor) * 1.2
+        cost += (max(non_open) - min(non_open)) * 1.4
+    cost += (max(strings) - min(strings)) * 0.45
+    cost -= sum(1 for fret in frets if fret == 0 and anchor <= 2) * 0.7
+    return cost
+
+
+def build_group_shapes(
+    midis: tuple[int, ...],
     transcription_type: str,
     anchor: int,
-) -> list[list[tuple[dict[str, Any], int, int]]]:
-    """Generate real fretboard alternatives instead of inheriting one narrow candidate set."""
-    if not group:
-        return []
-
-    note_options: list[list[tuple[dict[str, Any], int, int]]] = []
-    for note in sorted(group, key=lambda item: int(item["midi"]), reverse=True):
-        positions = engine.playable_positions(int(note["midi"]), transcription_type)
-        ranked: list[tuple[float, dict[str, Any], int, int]] = []
-        for string_index, fret in positions:
+) -> list[tuple[tuple[int, int], ...]]:
+    """Rank the playable (string, fret) shapes for one descending MIDI tuple."""
+    options: list[list[tuple[int, int]]] = []
+    for midi in midis:
+        ranked: list[tuple[float, int, int]] = []
+        for string_index, fret in engine.playable_positions(midi, transcription_type):
             distance = abs(float(fret) - float(anchor))
             open_bonus = -1.0 if fret == 0 and anchor <= 2 else 0.0
             high_fret_penalty = max(0, fret - 15) * 0.5
             ranked.append(
                 (
                     distance + open_bonus + high_fret_penalty,
-                    note,
                     int(string_index),
                     int(fret),
                 )
             )
         ranked.sort(key=lambda item: item[0])
-        note_options.append(
-            [(note_value, string_index, fret) for _, note_value, string_index, fret in ranked[:6]]
+        options.append([(string_index, fret) for _, string_index, fret in ranked[:6]])
+
+    shapes = [
+        tuple(options[slot][index] for slot, index in enumerate(row))
+        for row in fretboard_candidates.playable_combinations(
+            options,
+            MAX_STRING_SPAN,
+            MAX_FRET_SPAN,
         )
+    ]
+    shapes.sort(key=lambda shape: initial_shape_cost(shape, anchor))
+    return shapes[:GROUP_CANDIDATE_LIMIT]
 
-    candidates: list[list[tuple[dict[str, Any], int, int]]] = []
-    for combination in itertools.product(*note_options):
-        strings = [item[1] for item in combination]
-        if len(set(strings)) != len(strings):
-            continue
-        if max(strings) - min(strings) > MAX_STRING_SPAN:
-            continue
-
-        frets = [item[2] for item in combination if item[2] > 0]
-        if frets and max(frets) - min(frets) > MAX_FRET_SPAN:
-            continue
-
-        candidates.append(list(combination))
 
-    def initial_cost(candidate: list[tuple[dict[str, Any], int, int]]) -> float:
-        frets = [item[2] for item in candidate]
-        non_open = [fret for fret in frets if fret > 0]
-        strings = [item[1] for item in candidate]
-        cost = 0.0
-        if non_open:
-            cost += abs(statistics.median(non_open) - anchor) * 1.2
-            cost += (max(non_open) - min(non_open)) * 1.4
-        cost += (max(strings) - min(strings)) * 0.45
-        cost -= sum(1 for fret in frets if fret == 0 and anchor <= 2) * 0.7
-        return cost
+def all_group_assignments(
+    group: list[dict[str, Any]],
+    transcription_type: str,
+    anchor: int,
+) -> list[list[tuple[dict[str, Any], int, int]]]:
+    """Generate real fretboard alternatives instead of inheriting one narrow candidate set."""
+    if not group:
+        return []
 
-    candidates.sort(key=initial_cost)
-    return candidates[:GROUP_CANDIDATE_LIMIT]
+    notes = sorted(group, key=lambda item: int(item["midi"]), reverse=True)
+    midis = tuple(int(note["midi"]) for note in notes)
+    # Shapes depend only on the pitches, anchor and instrument, so repeated
+    # chords in a riff reuse the ranked shapes and only rebind their notes.
+    shapes = GROUP_SHAPE_CACHE.get_or_build(
+        (
+            midis,
+            anchor,
+            transcription_type,
+            GROUP_CANDIDATE_LIMIT,
+            MAX_STRING_SPAN,
+            MAX_FRET_SPAN,
+        ),
+        lambda: build_group_shapes(midis, transcription_type, anchor),
+    )
+    return [
+        [(note, string_index, fret) for note, (string_index, fret) in zip(notes, shape)]
+        for shape in shapes
+    ]
 
 
 def ringing_conflict_cost(
@@ -184,7 +209,7 @@ def build_phrase_paths(
     anchor: int,
     previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
 ) -> list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]]:
-    beam: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = [(0.0, [])]
+    beam = [phrase_beam.root_node()]
 
     for group in groups:
         assignments = all_group_assignments(group, transcription_type, anchor)
@@ -195,22 +220,24 @@ def build_phrase_paths(
                 anchor,
             )
 
-        next_beam: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = []
-        for accumulated, path in beam:
-            prior = path[-1] if path else previous_assignment
-            for assignment in assignments:
-                cost = accumulated
-                cost += guitarist_assignment_cost(assignment, transcription_type, anchor)
-                cost += phrase_movement_cost(prior, assignment, anchor)
-                next_beam.append((cost, path + [assignment]))
+        def step_cost(
+            node: phrase_beam.BeamNode,
+            assignment: list[tuple[dict[str, Any], int, int]],
+        ) -> float:
+            prior = previous_assignment if node.is_root else node.assignment
+            cost = node.cost
+            cost += guitarist_assignment_cost(assignment, transcription_type, anchor)
+            cost += phrase_movement_cost(prior, assignment, anchor)
+            return cost
 
-        next_beam.sort(key=lambda item: item[0])
-        beam = next_beam[:PATH_BEAM_WIDTH]
+        next_beam = phrase_beam.expand(beam, assignments, step_cost)
+        beam = phrase_beam.cheapest(next_beam, PATH_BEAM_WIDTH)
 
     rescored: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = []
-    for base_cost, path in beam:
+    for node in beam:
+        path = node.path()
         metrics = previous.previous.path_metrics(path)
-        total = base_cost
+        total = node.cost
         total += metrics["positionShiftTotal"] * 1.4
         total += metrics["largeShiftCount"] * 9.0
         total -= metrics["repeatConsistency"] * 5.5
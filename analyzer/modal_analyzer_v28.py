@@ -4,13 +4,14 @@ import tempfile
 from pathlib import Path
 from typing import Any
 
+import beam_kernel
 import modal
 import modal_analyzer_v27 as previous
 
 engine = previous.engine
 v25 = previous.previous.previous
 app = modal.App("dadrock-tab-analyzer")
-image = previous.image.add_local_python_source("modal_analyzer_v27")
+image = previous.image.add_local_python_source("modal_analyzer_v27", "beam_kernel")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -137,6 +138,138 @@ def held_shape_transition_cost(
     return cost
 
 
+class HeldShapeTerms:
+    """The anchor-independent terms of ``held_shape_transition_cost``.
+
+    One ``(priors, currents)`` array per term, with 0.0 where the scalar
+    function skips it, so ``at_anchor`` can add the anchor term and then every
+    other term in the scalar order and match it exactly. The terms can be
+    computed once for a window's candidates and reused for every anchor.
+    """
+
+    __slots__ = ("current_center", "terms", "has_prior", "has_current")
+
+    def __init__(self, current_center: Any, terms: list[Any], has_prior: Any, has_current: Any) -> None:
+        self.current_center = current_center
+        self.terms = terms
+        self.has_prior = has_prior
+        self.has_current = has_current
+
+    def take(self, rows: list[int], columns: list[int]) -> "HeldShapeTerms":
+        import numpy as np
+
+        selection = np.ix_(rows, columns)
+        return HeldShapeTerms(
+            self.current_center[:, columns],
+            [term[selection] for term in self.terms],
+            self.has_prior[rows, :],
+            self.has_current[:, columns],
+        )
+
+    def at_anchor(self, anchor: int) -> Any:
+        import numpy as np
+
+        with np.errstate(invalid="ignore"):
+            anchor_term = np.where(
+                np.isnan(self.current_center),
+                0.0,
+                np.abs(self.current_center - float(anchor)) * 1.1,
+            )
+        anchor_only = np.zeros((len(self.has_prior), anchor_term.shape[1])) + anchor_term
+        cost = anchor_only
+        for term in self.terms:
+            cost = cost + term
+        return np.where(self.has_current, np.where(self.has_prior, cost, anchor_only), 0.0)
+
+
+def held_shape_transition_terms(
+    priors: list[list[tuple[dict[str, Any], int, int]] | None],
+    currents: list[list[tuple[dict[str, Any], int, int]]],
+) -> HeldShapeTerms:
+    """Vectorized ``held_shape_transition_cost`` for every (prior, current) pair."""
+    import numpy as np
+
+    width = beam_kernel.string_width([*priors, *currents])
+    prior_features = [beam_kernel.AssignmentFeatures(prior, width) for prior in priors]
+    current_features = [beam_kernel.AssignmentFeatures(current, width) for current in currents]
+    shape = (len(priors), len(currents))
+    terms: list[Any] = []
+
+    def column(values: list[float | None]) -> Any:
+        return np.array([np.nan if value is None else value for value in values])[None, :]
+
+    def row(values: list[float | None]) -> Any:
+        return np.array([np.nan if value is None else value for value in values])[:, None]
+
+    current_center = column([features.fretted_center for features in current_features])
+    prior_center = row([features.mapped_center for features in prior_features])
+    with np.errstate(invalid="ignore"):
+        prior_frets = np.array([features.string_frets for features in prior_features])
+        current_frets = np.array([features.string_frets for features in current_features])
+        for string_index in range(width):
+            prior_fret = prior_frets[:, string_index][:, None]
+            current_fret = current_frets[:, string_index][None, :]
+            shared = (prior_fret >= 0) & (current_fret >= 0)
+            held = np.where(prior_fret == current_fret, -3.4, np.abs(prior_fret - current_fret) * 1.1)
+            terms.append(np.where(shared, held, 0.0))
+
+        both_fretted = ~np.isnan(prior_center) & ~np.isnan(current_center)
+        shift = np.abs(current_center - prior_center)
+        terms.append(np.where(both_fretted, shift * 2.1, 0.0))
+        terms.append(np.where(both_fretted & (shift > 3), (shift - 3) * 6.0, 0.0))
+
+    string_shift = np.abs(
+        column([features.string_mean for features in current_features])
+        - row([features.string_mean for features in prior_features])
+    )
+    terms.append(np.broadcast_to(string_shift * 0.8, shape))
+    terms.append(np.broadcast_to(np.where(string_shift > 2, (string_shift - 2) * 3.0, 0.0), shape))
+
+    prior_single = [features.single or (-1, -1, -1) for features in prior_features]
+    current_single = [features.single or (-1, -1, -1) for features in current_features]
+    prior_midi, prior_string, prior_fret = (np.array(values)[:, None] for values in zip(*prior_single))
+    current_midi, current_string, current_fret = (np.array(values)[None, :] for values in zip(*current_single))
+    singles = (
+        np.array([features.size == 1 for features in prior_features])[:, None]
+        & np.array([features.size == 1 for features in current_features])[None, :]
+    )
+    same_place = (prior_string == current_string) & (prior_fret == current_fret)
+    terms.append(np.where(singles & (prior_midi == current_midi), np.where(same_place, -4.0, 3.0), 0.0))
+    distance = np.abs(current_fret - prior_fret)
+    terms.append(np.where(singles & (prior_string == current_string), np.maximum(0, distance - 4) * 2.0, 0.0))
+
+    reused = np.zeros(shape, dtype=np.int64)
+    starts = [features.start for features in current_features]
+    for start in dict.fromkeys(starts):
+        ringing = np.zeros((len(priors), width), dtype=np.int64)
+        for index, features in enumerate(prior_features):
+            for string_index, end in zip(features.note_strings, features.note_ends):
+                if end > start + 0.04:
+                    ringing[index, string_index] = 1
+        columns = [index for index, value in enumerate(starts) if value == start]
+        counts = np.array([current_features[index].string_counts for index in columns])
+        reused[:, columns] = ringing @ counts.T
+    terms.append(reused * 4.2)
+
+    return HeldShapeTerms(
+        current_center,
+        terms,
+        np.array([features.size > 0 for features in prior_features])[:, None],
+        np.array([features.size > 0 for features in current_features])[None, :],
+    )
+
+
+def held_shape_transition_matrix(
+    priors: list[list[tuple[dict[str, Any], int, int]] | None],
+    currents: list[list[tuple[dict[str, Any], int, int]]],
+    anchor: int,
+) -> Any:
+    """``held_shape_transition_cost`` for every (prior, current) pair at once."""
+    return held_shape_transition_terms(priors, currents).at_anchor(anchor)
+
+
+beam_kernel.register_movement_terms(held_shape_transition_cost, held_shape_transition_terms)
+
 # Replace both callbacks used inside v25's phrase beam search.
 v25.guitarist_assignment_cost = held_shape_assignment_cost
 v25.phrase_movement_cost = held_shape_transition_cost
@@ -1,18 +1,36 @@
 import os
 import statistics
 import tempfile
+import time
 from collections import Counter
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Hashable, Iterator
 
 import modal
 import modal_analyzer_v28 as previous
+import phrase_memo
+import phrase_parallel
+import phrase_viterbi
+from analysis_context import AnalysisContext, ScopedState, analysis_scope, current_context
+from note_event_provider import NoteEventProvider, resolve_provider
 
 engine = previous.engine
 base = previous.previous.previous.previous.base
 v25 = previous.v25
 app = modal.App("dadrock-tab-analyzer")
-image = previous.image.add_local_python_source("modal_analyzer_v28")
+image = previous.image.add_local_python_source(
+    "modal_analyzer_v28",
+    "analysis_context",
+    "note_event_provider",
+    "inference_cache",
+    "basic_pitch_model",
+    "inference_batcher",
+    "audio_decode",
+    "phrase_memo",
+    "phrase_parallel",
+    "phrase_viterbi",
+)
 
 # Phase 1: identify musical context before choosing string/fret locations.
 NOTE_NAMES = ("C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B")
@@ -46,12 +64,200 @@ OPEN_VOICINGS: dict[str, dict[int, int]] = {
     "G/B": {0: 3, 1: 0, 2: 0, 3: 0, 4: 2},
 }
 
-ACTIVE_HARMONY: dict[str, Any] = {
-    "chord": None,
-    "confidence": 0.0,
-    "bassPitchClass": None,
-    "texture": "unknown",
-}
+ACTIVE_HARMONY = ScopedState(
+    "v29.active_harmony",
+    {
+        "chord": None,
+        "confidence": 0.0,
+        "bassPitchClass": None,
+        "texture": "unknown",
+    },
+)
+# Repeated windows reuse each anchor's paths within one request; see
+# ``phrase_memo.PhraseMemo``.
+PHRASE_MEMO = ScopedState(
+    "v29.phrase_memo",
+    {
+        "enabled": True,
+        "gridSeconds": phrase_memo.MEMO_GRID_SECONDS,
+    },
+)
+# Map phrases on a process pool and stitch them together; see
+# ``parallel_windows``. ``module`` is the chain's top module, which every
+# worker imports.
+PHRASE_PARALLEL = ScopedState(
+    "v29.phrase_parallel",
+    {
+        "enabled": False,
+        "module": None,
+        "workers": None,
+        "candidates": phrase_parallel.STITCH_CANDIDATES,
+        "minPhrases": 2,
+    },
+)
+
+MappedPath = list[list[tuple[dict[str, Any], int, int]]]
+RankedPath = tuple[float, int, MappedPath]
+# ScopedList entries moved out of one context to be appended to another;
+# see ``AnalysisContext.take_appended``.
+CapturedDiagnostics = dict[str, tuple[int, list[Any]]]
+WindowSearch = tuple[list[RankedPath], CapturedDiagnostics]
+
+
+@dataclass(frozen=True)
+class BoundaryState:
+    """What a window's search reads from the window mapped before it."""
+
+    assignment: list[tuple[dict[str, Any], int, int]] | None = None
+    anchor: int | None = None
+
+    def after(self, row: RankedPath) -> "BoundaryState":
+        """The state a window leaves when ``row`` is its chosen path."""
+        _, anchor, path = row
+        return BoundaryState(path[-1] if path else self.assignment, anchor)
+
+    def key(self) -> Hashable:
+        return (
+            tuple(
+                (id(note), int(string_index), int(fret))
+                for note, string_index, fret in self.assignment or []
+            ),
+            self.anchor,
+        )
+
+
+@dataclass
+class MappedWindow:
+    """One harmonic window's ranked paths, the chosen path first."""
+
+    phrase_index: int
+    window_index: int
+    window: list[list[dict[str, Any]]]
+    harmony: dict[str, Any]
+    texture: str
+    ranked: list[RankedPath]
+    # Set for windows searched out of order (see ``parallel_windows``): the
+    # diagnostics their search appended, and the harmony to render under.
+    diagnostics: CapturedDiagnostics = field(default_factory=dict)
+    active_harmony: dict[str, Any] | None = None
+
+
+@dataclass
+class PlannedWindow:
+    """A window with the harmony the sequential chain would search it under."""
+
+    window_index: int
+    window: list[list[dict[str, Any]]]
+    harmony: dict[str, Any]
+    texture: str
+    active_harmony: dict[str, Any]
+
+
+@dataclass
+class PhraseTask:
+    """One phrase sent to a pool worker, with the request's scoped state."""
+
+    transcription_type: str
+    windows: list[PlannedWindow]
+    state: dict[str, dict[str, Any]]
+    candidates: int
+
+
+@dataclass
+class ChainWindow:
+    """A window of a worker's chain; paths are encoded by note position."""
+
+    position: int
+    rows: list[tuple[float, int, list[Any]]]
+    diagnostics: CapturedDiagnostics
+
+
+@dataclass
+class PhraseChain:
+    """One opening of a phrase's first window, continued to the phrase's end."""
+
+    windows: list[ChainWindow]
+
+    @property
+    def cost(self) -> float:
+        return sum(float(window.rows[0][0]) for window in self.windows)
+
+
+@dataclass
+class PhraseOutcome:
+    chains: list[PhraseChain]
+    memo: dict[str, Any] | None
+    milliseconds: float
+
+
+@dataclass
+class PhraseCandidates:
+    """A phrase's worker chains with their decoded opening and exit states."""
+
+    phrase_index: int
+    windows: list[PlannedWindow]
+    chains: list[PhraseChain]
+    openings: list[BoundaryState]
+    exits: list[BoundaryState]
+
+    def opening_key(self, position: int, row: RankedPath) -> tuple[int, list[Any]]:
+        _, anchor, path = row
+        return int(anchor), phrase_parallel.encode_path(self.windows[position].window, path)
+
+    def matching_chain(self, position: int, row: RankedPath | None) -> int | None:
+        """The chain that opens with ``row``, if a worker mapped one."""
+        if row is None:
+            return None
+        key = self.opening_key(position, row)
+        for index, chain in enumerate(self.chains):
+            _, anchor, path = chain.windows[0].rows[0]
+            if (int(anchor), path) == key:
+                return index
+        return None
+
+    def matching_row(
+        self,
+        position: int,
+        ranked: list[RankedPath],
+        choice: int,
+    ) -> RankedPath | None:
+        """The row of ``ranked`` that opens like chain ``choice``."""
+        for row in ranked:
+            if self.matching_chain(position, row) == choice:
+                return row
+        return None
+
+
+@dataclass
+class StitchWalk:
+    """Windows chained across phrases, with their total score."""
+
+    windows: list[MappedWindow] = field(default_factory=list)
+    choices: list[int | None] = field(default_factory=list)
+    total: float = 0.0
+    remapped: int = 0
+
+    def add(
+        self,
+        phrase: PhraseCandidates,
+        position: int,
+        ranked: list[RankedPath],
+        diagnostics: CapturedDiagnostics,
+    ) -> None:
+        planned = phrase.windows[position]
+        self.windows.append(
+            MappedWindow(
+                phrase.phrase_index,
+                planned.window_index,
+                planned.window,
+                planned.harmony,
+                planned.texture,
+                ranked,
+                diagnostics,
+                planned.active_harmony,
+            )
+        )
+        self.total += float(ranked[0][0])
 
 
 def to_json_safe(value: Any) -> Any:
@@ -247,100 +453,568 @@ def harmony_voicing_cost(
     return cost
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    from basic_pitch.inference import predict
+def detect_onset_groups(
+    note_events: list[Any],
+    transcription_type: str,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[list[dict[str, Any]]]]:
+    """Extract, clean and group raw note events into guitarist onset groups."""
+    extracted = extract_note_events(note_events)
+    cleaned, onset_groups = group_extracted_notes(extracted, transcription_type)
+    return extracted, cleaned, onset_groups
+
 
-    _, _, note_events = predict(audio_path)
-    extracted = [
+def extract_note_events(note_events: list[Any]) -> list[dict[str, Any]]:
+    """Parse raw Basic Pitch events; this step does not depend on the part."""
+    return [
         parsed
         for event in note_events
         if (parsed := engine.extract_note_event(event)) is not None
     ]
+
+
+def group_extracted_notes(
+    extracted: list[dict[str, Any]],
+    transcription_type: str,
+) -> tuple[list[dict[str, Any]], list[list[dict[str, Any]]]]:
+    """Apply the part's playability, strength and group-size limits."""
     cleaned = base.clean_detected_notes(extracted, transcription_type)
     onset_groups = base.guitarist_group_notes(cleaned, transcription_type)
-    phrases = engine.split_phrases(onset_groups)
+    return cleaned, onset_groups
+
+
+def anchor_phrase_paths(
+    window: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchors: list[int],
+    previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+) -> list[tuple[int, float, list[list[tuple[dict[str, Any], int, int]]]]]:
+    """Every anchor's candidate paths for one window, in anchor order."""
+    return [
+        (anchor, score, path)
+        for anchor in anchors
+        for score, path in v25.build_phrase_paths(window, transcription_type, anchor, previous_assignment)
+    ]
+
+
+def window_search_context(
+    window: list[list[dict[str, Any]]],
+    transcription_type: str,
+) -> Hashable:
+    """Everything besides the notes and the boundary that the window's search reads."""
+    return transcription_type, tuple(sorted(ACTIVE_HARMONY.items()))
 
-    global_key = infer_key(onset_groups)
-    mapped_groups: list[list[dict[str, Any]]] = []
-    harmony_diagnostics: list[dict[str, Any]] = []
-    candidate_diagnostics: list[dict[str, Any]] = []
-    previous_assignment = None
-    previous_anchor = None
 
-    # Install the phase-1-aware score into the phrase optimizer.
+def new_phrase_memo() -> phrase_memo.PhraseMemo | None:
+    if not PHRASE_MEMO["enabled"]:
+        return None
+    return phrase_memo.PhraseMemo(float(PHRASE_MEMO["gridSeconds"]))
+
+
+def install_phase_one_costs() -> None:
+    """Install the phase-1-aware score into the phrase optimizer."""
     v25.guitarist_assignment_cost = harmony_voicing_cost
     v25.phrase_movement_cost = previous.held_shape_transition_cost
 
+
+def activate_harmony(window: list[list[dict[str, Any]]]) -> tuple[dict[str, Any], str]:
+    """Infer the window's chord and texture and make them the search's harmony."""
+    harmony = infer_chord(window)
+    texture = infer_texture(window)
+    ACTIVE_HARMONY.update(
+        {
+            "chord": harmony.get("name"),
+            "confidence": harmony.get("confidence", 0.0),
+            "bassPitchClass": harmony.get("bassPitchClass"),
+            "texture": texture,
+        }
+    )
+    return harmony, texture
+
+
+def window_anchors(harmony: dict[str, Any], previous_anchor: int | None) -> list[int]:
+    anchors = list(v25.ANCHORS)
+    if previous_anchor is not None:
+        anchors.insert(0, int(previous_anchor))
+    if harmony.get("baseName") in OPEN_VOICINGS and 0 not in anchors:
+        anchors.insert(0, 0)
+    return [int(anchor) for anchor in dict.fromkeys(anchors)]
+
+
+def rank_window(
+    window: list[list[dict[str, Any]]],
+    transcription_type: str,
+    harmony: dict[str, Any],
+    previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+    previous_anchor: int | None,
+    memo: phrase_memo.PhraseMemo | None,
+) -> list[RankedPath]:
+    """Every anchor's paths for the window, cheapest first, from this boundary state."""
+    anchors = window_anchors(harmony, previous_anchor)
+    if memo is not None:
+        rows = memo.search(
+            window,
+            anchors,
+            previous_assignment,
+            window_search_context(window, transcription_type),
+            lambda missing: anchor_phrase_paths(window, transcription_type, missing, previous_assignment),
+        )
+    else:
+        rows = anchor_phrase_paths(window, transcription_type, anchors, previous_assignment)
+
+    ranked: list[RankedPath] = []
+    for anchor, score, path in rows:
+        anchor_shift = 0.0
+        if previous_anchor is not None:
+            anchor_shift = abs(anchor - int(previous_anchor)) * 1.2
+        ranked.append((score + anchor_shift, anchor, path))
+    ranked.sort(key=lambda item: item[0])
+    return ranked
+
+
+def sequential_windows(
+    phrases: list[list[list[dict[str, Any]]]],
+    transcription_type: str,
+    memo: phrase_memo.PhraseMemo | None,
+) -> Iterator[MappedWindow]:
+    """Map every window in order, each from the previous window's winner."""
+    state = BoundaryState()
     for phrase_index, phrase in enumerate(phrases):
         for window_index, window in enumerate(split_harmonic_windows(phrase)):
-            harmony = infer_chord(window)
-            texture = infer_texture(window)
-            ACTIVE_HARMONY.update(
-                {
-                    "chord": harmony.get("name"),
-                    "confidence": harmony.get("confidence", 0.0),
-                    "bassPitchClass": harmony.get("bassPitchClass"),
-                    "texture": texture,
-                }
+            harmony, texture = activate_harmony(window)
+            ranked = rank_window(
+                window,
+                transcription_type,
+                harmony,
+                state.assignment,
+                state.anchor,
+                memo,
             )
-
-            anchors = list(v25.ANCHORS)
-            if previous_anchor is not None:
-                anchors.insert(0, int(previous_anchor))
-            if harmony.get("baseName") in OPEN_VOICINGS and 0 not in anchors:
-                anchors.insert(0, 0)
-
-            ranked: list[tuple[float, int, list[list[tuple[dict[str, Any], int, int]]]]] = []
-            for anchor in dict.fromkeys(anchors):
-                for score, path in v25.build_phrase_paths(
-                    window,
-                    transcription_type,
-                    int(anchor),
-                    previous_assignment,
-                ):
-                    anchor_shift = 0.0
-                    if previous_anchor is not None:
-                        anchor_shift = abs(int(anchor) - int(previous_anchor)) * 1.2
-                    ranked.append((score + anchor_shift, int(anchor), path))
-
             if not ranked:
                 continue
+            yield MappedWindow(phrase_index, window_index, window, harmony, texture, ranked)
+            state = state.after(ranked[0])
 
-            ranked.sort(key=lambda item: item[0])
-            winning_score, winning_anchor, winning_path = ranked[0]
-            mapped_groups.extend(v25.render_path(winning_path))
-            previous_assignment = winning_path[-1] if winning_path else previous_assignment
-            previous_anchor = winning_anchor
-
-            start = min(float(note["start"]) for group in window for note in group)
-            end = max(float(note.get("end") or note["start"]) for group in window for note in group)
-            harmony_diagnostics.append(
-                {
-                    "phraseIndex": phrase_index,
-                    "windowIndex": window_index,
-                    "start": round(start, 3),
-                    "end": round(end, 3),
-                    "texture": texture,
-                    "chord": harmony,
-                    "chosenAnchor": winning_anchor,
-                }
-            )
-            candidate_diagnostics.append(
-                {
-                    "phraseIndex": phrase_index,
-                    "windowIndex": window_index,
-                    "chosenAnchor": winning_anchor,
-                    "winningScore": round(float(winning_score), 3),
-                    "topCandidates": [
-                        {
-                            "anchor": anchor,
-                            "score": round(float(score), 3),
-                            "metrics": previous.previous.previous.path_metrics(path),
-                        }
-                        for score, anchor, path in ranked[:4]
-                    ],
-                }
+
+def plan_phrases(phrases: list[list[list[dict[str, Any]]]]) -> list[list[PlannedWindow]]:
+    """Every phrase's windows with their harmony, inferred in order.
+
+    Each chord reads the one before it, so this stays sequential even when
+    the windows are then mapped on the pool.
+    """
+    planned: list[list[PlannedWindow]] = []
+    for phrase in phrases:
+        windows: list[PlannedWindow] = []
+        for window_index, window in enumerate(split_harmonic_windows(phrase)):
+            harmony, texture = activate_harmony(window)
+            windows.append(
+                PlannedWindow(window_index, window, harmony, texture, dict(ACTIVE_HARMONY))
             )
+        planned.append(windows)
+    return planned
+
+
+def rank_planned(
+    planned: PlannedWindow,
+    transcription_type: str,
+    state: BoundaryState,
+    memo: phrase_memo.PhraseMemo | None,
+) -> WindowSearch:
+    """Rank a planned window from ``state``, taking the diagnostics its search appends."""
+    context = current_context()
+    lengths = context.list_lengths()
+    ACTIVE_HARMONY.update(planned.active_harmony)
+    ranked = rank_window(
+        planned.window,
+        transcription_type,
+        planned.harmony,
+        state.assignment,
+        state.anchor,
+        memo,
+    )
+    return ranked, context.take_appended(lengths)
+
+
+def searched_window(
+    windows: list[PlannedWindow],
+    position: int,
+    transcription_type: str,
+    state: BoundaryState,
+    memo: phrase_memo.PhraseMemo | None,
+    searches: dict[Hashable, WindowSearch],
+) -> WindowSearch:
+    """``rank_planned``, once per window and boundary state of a phrase.
+
+    Chains that reach a window from the same state share its search and its
+    diagnostics, which a memo hit would not return.
+    """
+    key = (position, state.key())
+    if key not in searches:
+        searches[key] = rank_planned(windows[position], transcription_type, state, memo)
+    return searches[key]
+
+
+def greedy_positions(
+    windows: list[PlannedWindow],
+    transcription_type: str,
+    memo: phrase_memo.PhraseMemo | None,
+    searches: dict[Hashable, WindowSearch],
+    start: int,
+    state: BoundaryState,
+) -> Iterator[tuple[int, list[RankedPath], CapturedDiagnostics]]:
+    """Rank ``windows`` from ``start`` on, each from the previous window's winner."""
+    for position in range(start, len(windows)):
+        ranked, diagnostics = searched_window(
+            windows,
+            position,
+            transcription_type,
+            state,
+            memo,
+            searches,
+        )
+        if not ranked:
+            continue
+        yield position, ranked, diagnostics
+        state = state.after(ranked[0])
+
+
+def chain_window(
+    planned: PlannedWindow,
+    position: int,
+    ranked: list[RankedPath],
+    diagnostics: CapturedDiagnostics,
+) -> ChainWindow:
+    rows = [
+        (score, anchor, phrase_parallel.encode_path(planned.window, path))
+        for score, anchor, path in ranked[:4]
+    ]
+    return ChainWindow(position, rows, diagnostics)
+
+
+def phrase_chains(task: PhraseTask, memo: phrase_memo.PhraseMemo | None) -> list[PhraseChain]:
+    """One chain per cheapest opening of the phrase's first window.
+
+    Each chain searches with a memo of its own, like one sequential run: a
+    shared memo would skip the anchors another chain already searched, and
+    with them those searches' diagnostics. Chains that reach a window from
+    the same state still share that search. ``memo`` counts all their work.
+    """
+    windows = task.windows
+    searches: dict[Hashable, WindowSearch] = {}
+
+    def search_from(
+        start: int,
+        state: BoundaryState,
+    ) -> list[tuple[int, list[RankedPath], CapturedDiagnostics]]:
+        chain_memo = new_phrase_memo()
+        steps = list(
+            greedy_positions(windows, task.transcription_type, chain_memo, searches, start, state)
+        )
+        if memo is not None and chain_memo is not None:
+            memo.merge(chain_memo.diagnostics())
+        return steps
+
+    opening = next(iter(search_from(0, BoundaryState())), None)
+    if opening is None:
+        return []
+
+    position, ranked, _ = opening
+    chains: list[PhraseChain] = []
+    for choice in ranked[: task.candidates]:
+        # The parent ranks the opening window again from its real boundary
+        # state, so only the opening itself is sent back.
+        chain = [chain_window(windows[position], position, [choice], {})]
+        for index, steps, diagnostics in search_from(position + 1, BoundaryState().after(choice)):
+            chain.append(chain_window(windows[index], index, steps, diagnostics))
+        chains.append(PhraseChain(chain))
+    return chains
+
+
+def map_phrase_candidates(task: PhraseTask) -> PhraseOutcome:
+    """Map one phrase in a pool worker from each of its cheapest openings.
+
+    The phrase's first window is ranked without a previous assignment or
+    anchor, and each of its ``task.candidates`` cheapest paths is continued
+    through the rest of the phrase window by window, as the sequential
+    chain would. Paths come back by note position, each window with the
+    diagnostics its search appended.
+    """
+    started = time.perf_counter()
+    with analysis_scope(AnalysisContext.from_scoped_state(task.state)):
+        install_phase_one_costs()
+        memo = new_phrase_memo()
+        chains = phrase_chains(task, memo)
+        return PhraseOutcome(
+            chains,
+            memo.diagnostics() if memo is not None else None,
+            round((time.perf_counter() - started) * 1000.0, 3),
+        )
+
+
+def decode_rows(window: list[list[dict[str, Any]]], rows: list[Any]) -> list[RankedPath]:
+    return [
+        (score, anchor, phrase_parallel.decode_path(window, path))
+        for score, anchor, path in rows
+    ]
+
+
+def phrase_candidates(
+    phrase_index: int,
+    windows: list[PlannedWindow],
+    chains: list[PhraseChain],
+) -> PhraseCandidates:
+    openings: list[BoundaryState] = []
+    exits: list[BoundaryState] = []
+    for chain in chains:
+        first, last = chain.windows[0], chain.windows[-1]
+        _, anchor, path = decode_rows(windows[first.position].window, first.rows[:1])[0]
+        openings.append(BoundaryState(path[0] if path else None, anchor))
+        final = decode_rows(windows[last.position].window, last.rows[:1])[0]
+        exits.append(BoundaryState().after(final))
+    return PhraseCandidates(phrase_index, windows, chains, openings, exits)
+
+
+def boundary_cost(exit: BoundaryState, opening: BoundaryState) -> float:
+    """Estimated change in an opening's score when it follows ``exit``, not a cold start."""
+    if opening.assignment is None:
+        return 0.0
+    return (
+        v25.phrase_movement_cost(exit.assignment, opening.assignment, opening.anchor)
+        - v25.phrase_movement_cost(None, opening.assignment, opening.anchor)
+        + abs(int(opening.anchor) - int(exit.anchor)) * 1.2
+    )
+
+
+def propose_stitch(candidates: list[PhraseCandidates]) -> list[int]:
+    """One chain per phrase, by a Viterbi pass over the estimated boundary costs."""
+    import numpy as np
+
+    unary = [np.array([chain.cost for chain in phrase.chains]) for phrase in candidates]
+    pairwise = [
+        np.array(
+            [
+                [boundary_cost(exit, opening) for opening in current.openings]
+                for exit in prior.exits
+            ]
+        )
+        for prior, current in zip(candidates, candidates[1:])
+    ]
+    _, choices = phrase_viterbi.best_path(unary, pairwise)
+    return choices
+
+
+def walk_phrases(
+    candidates: list[PhraseCandidates],
+    transcription_type: str,
+    memo: phrase_memo.PhraseMemo | None,
+    searches: dict[int, dict[Hashable, WindowSearch]],
+    proposal: list[int] | None = None,
+) -> StitchWalk | None:
+    """Chain the phrases in order from the boundary state each one really follows.
+
+    Every phrase's first window is ranked again from the state the previous
+    phrase left, so all scores are the ones the sequential chain would see;
+    ``searches`` keeps each phrase's searches in this process.
+
+    Without a ``proposal`` each seam takes its winner, as the sequential
+    chain does, and continues with the worker chain that opens the same
+    way, or is mapped here when no chain does: the walk is then the
+    sequential chain. With one, each seam takes the proposed chain's
+    opening instead; the walk is None when a seam no longer ranks it.
+    """
+    walk = StitchWalk()
+    state = BoundaryState()
+    for index, phrase in enumerate(candidates):
+        position = phrase.chains[0].windows[0].position
+        phrase_searches = searches.setdefault(phrase.phrase_index, {})
+        ranked, diagnostics = searched_window(
+            phrase.windows,
+            position,
+            transcription_type,
+            state,
+            memo,
+            phrase_searches,
+        )
+        if proposal is None:
+            row = ranked[0] if ranked else None
+            choice = phrase.matching_chain(position, row)
+        else:
+            choice = proposal[index]
+            row = phrase.matching_row(position, ranked, choice)
+            if row is None:
+                return None
+        walk.choices.append(choice)
+
+        if row is not None:
+            others = [item for item in ranked if item is not row]
+            walk.add(phrase, position, [row, *others], diagnostics)
+            state = state.after(row)
+        if choice is not None:
+            for window in phrase.chains[choice].windows[1:]:
+                planned = phrase.windows[window.position]
+                ranked = decode_rows(planned.window, window.rows)
+                walk.add(phrase, window.position, ranked, window.diagnostics)
+                state = state.after(ranked[0])
+            continue
+
+        walk.remapped += 1
+        for later, ranked, diagnostics in greedy_positions(
+            phrase.windows,
+            transcription_type,
+            memo,
+            phrase_searches,
+            position + 1,
+            state,
+        ):
+            walk.add(phrase, later, ranked, diagnostics)
+            state = state.after(ranked[0])
+    return walk
+
+
+def parallel_windows(
+    phrases: list[list[list[dict[str, Any]]]],
+    transcription_type: str,
+    memo: phrase_memo.PhraseMemo | None,
+) -> tuple[list[MappedWindow], dict[str, Any]]:
+    """Map phrases concurrently on the process pool, then stitch them.
+
+    Harmony is planned for every window first (``plan_phrases``). Each
+    phrase then comes back from a worker as up to ``candidates`` chains,
+    one per opening (``map_phrase_candidates``), and a Viterbi pass over
+    their estimated boundary costs proposes one chain per phrase.
+
+    Both the sequential chain and the proposal are then walked from their
+    real boundary states (``walk_phrases``), and the proposal is kept only
+    when it scores lower. The result is therefore the sequential chain or
+    better, by the sequential chain's own window scores.
+    """
+    started = time.perf_counter()
+    planned = plan_phrases(phrases)
+    scoped_state = current_context().scoped_state()
+    tasks = [
+        PhraseTask(transcription_type, windows, scoped_state, int(PHRASE_PARALLEL["candidates"]))
+        for windows in planned
+    ]
+    workers = PHRASE_PARALLEL["workers"]
+    outcomes = phrase_parallel.map_phrases(
+        str(PHRASE_PARALLEL["module"]),
+        map_phrase_candidates,
+        tasks,
+        int(workers) if workers else None,
+    )
+    if memo is not None:
+        for outcome in outcomes:
+            memo.merge(outcome.memo)
+
+    candidates = [
+        phrase_candidates(phrase_index, planned[phrase_index], outcome.chains)
+        for phrase_index, outcome in enumerate(outcomes)
+        if outcome.chains
+    ]
+    # Both walks often reach a seam from the same state.
+    searches: dict[int, dict[Hashable, WindowSearch]] = {}
+    sequential = walk_phrases(candidates, transcription_type, memo, searches)
+    proposal = propose_stitch(candidates)
+    stitched = (
+        walk_phrases(candidates, transcription_type, memo, searches, proposal)
+        if proposal != sequential.choices
+        else sequential
+    )
+    improved = stitched is not None and stitched.total < sequential.total - 1e-9
+    chosen = stitched if improved else sequential
+
+    return chosen.windows, {
+        "enabled": True,
+        "workers": int(workers) if workers else os.cpu_count() or 1,
+        "candidates": int(PHRASE_PARALLEL["candidates"]),
+        "phraseCount": len(phrases),
+        "stitchedPhraseCount": len(candidates),
+        "sequentialScore": round(sequential.total, 3),
+        "stitchedScore": round(stitched.total, 3) if stitched is not None else None,
+        "chosen": "stitched" if improved else "sequential",
+        "remappedPhraseCount": sequential.remapped,
+        "workerMilliseconds": round(sum(outcome.milliseconds for outcome in outcomes), 3),
+        "wallMilliseconds": round((time.perf_counter() - started) * 1000.0, 3),
+    }
+
+
+def map_onset_groups(
+    extracted: list[dict[str, Any]],
+    cleaned: list[dict[str, Any]],
+    onset_groups: list[list[dict[str, Any]]],
+    transcription_type: str,
+    on_window: Callable[[int, int, list[list[dict[str, Any]]]], None] | None = None,
+) -> dict[str, Any]:
+    """Phrase, window, beam-map and render already grouped notes.
+
+    ``on_window`` is called with the phrase index, window index and mapped
+    groups of each harmonic window as soon as its winning path is chosen.
+    A window that repeats an earlier one note for note, in the same harmony
+    and from the same boundary state, reuses that window's paths.
+
+    With ``PHRASE_PARALLEL`` enabled and enough phrases, phrases are mapped
+    on a process pool and stitched (see ``parallel_windows``); ``on_window``
+    then sees each window once the stitch has chosen it, and the diagnostics
+    its search appended in a worker are replayed just before it is rendered.
+    """
+    phrases = engine.split_phrases(onset_groups)
+
+    global_key = infer_key(onset_groups)
+    mapped_groups: list[list[dict[str, Any]]] = []
+    harmony_diagnostics: list[dict[str, Any]] = []
+    candidate_diagnostics: list[dict[str, Any]] = []
+    memo = new_phrase_memo()
+
+    install_phase_one_costs()
+
+    parallel = PHRASE_PARALLEL["enabled"] and len(phrases) >= int(PHRASE_PARALLEL["minPhrases"])
+    if parallel:
+        windows, parallel_diagnostics = parallel_windows(phrases, transcription_type, memo)
+    else:
+        windows = sequential_windows(phrases, transcription_type, memo)
+        parallel_diagnostics = {"enabled": False}
+
+    for mapped in windows:
+        phrase_index, window_index = mapped.phrase_index, mapped.window_index
+        window, harmony, texture = mapped.window, mapped.harmony, mapped.texture
+        ranked = mapped.ranked
+        if mapped.active_harmony is not None:
+            ACTIVE_HARMONY.update(mapped.active_harmony)
+        current_context().append_taken(mapped.diagnostics)
+        winning_score, winning_anchor, winning_path = ranked[0]
+        window_groups = v25.render_path(winning_path)
+        mapped_groups.extend(window_groups)
+        if on_window is not None:
+            on_window(phrase_index, window_index, window_groups)
+
+        start = min(float(note["start"]) for group in window for note in group)
+        end = max(float(note.get("end") or note["start"]) for group in window for note in group)
+        harmony_diagnostics.append(
+            {
+                "phraseIndex": phrase_index,
+                "windowIndex": window_index,
+                "start": round(start, 3),
+                "end": round(end, 3),
+                "texture": texture,
+                "chord": harmony,
+                "chosenAnchor": winning_anchor,
+            }
+        )
+        candidate_diagnostics.append(
+            {
+                "phraseIndex": phrase_index,
+                "windowIndex": window_index,
+                "chosenAnchor": winning_anchor,
+                "winningScore": round(float(winning_score), 3),
+                "topCandidates": [
+                    {
+                        "anchor": anchor,
+                        "score": round(float(score), 3),
+                        "metrics": previous.previous.previous.path_metrics(path),
+                    }
+                    for score, anchor, path in ranked[:4]
+                ],
+            }
+        )
 
     generated_tab = engine.create_tab(mapped_groups, transcription_type)
     flattened = [event for group in mapped_groups for event in group]
@@ -369,6 +1043,8 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
             "key": global_key,
             "detectedChords": detected_chords,
             "harmonicWindows": harmony_diagnostics,
+            "phraseMemo": memo.diagnostics() if memo is not None else {"enabled": False},
+            "phraseParallel": parallel_diagnostics,
         },
         "candidateDiagnostics": candidate_diagnostics,
         "styleProfile": "jimmy-paige-phase-1-harmony-first",
@@ -377,6 +1053,19 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     }
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    note_events = resolve_provider(provider, audio_path).note_events()
+    extracted, cleaned, onset_groups = detect_onset_groups(
+        note_events,
+        transcription_type,
+    )
+    return map_onset_groups(extracted, cleaned, onset_groups, transcription_type)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v29 as previous
+from analysis_context import ScopedState
+from note_event_provider import NoteEventProvider, resolve_provider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -13,14 +15,18 @@ image = previous.image.add_local_python_source("modal_analyzer_v29")
 # Phase 1.1: make harmony decisions as a connected progression rather than
 # unrelated chord guesses. This remains general guitar knowledge and does not
 # contain song-specific tablature.
-SEQUENCE_STATE: dict[str, Any] = {
-    "keyRoot": None,
-    "keyMode": None,
-    "previousRoot": None,
-    "previousQuality": None,
-    "previousBassPitchClass": None,
-    "history": [],
-}
+SEQUENCE_STATE = ScopedState(
+    "v30.sequence_state",
+    {
+        "keyRoot": None,
+        "keyMode": None,
+        "previousRoot": None,
+        "previousQuality": None,
+        "previousBassPitchClass": None,
+        "history": [],
+        "keyContext": None,
+    },
+)
 
 DIATONIC_TRIADS = {
     "major": {
@@ -65,6 +71,7 @@ def reset_sequence_state() -> None:
             "previousQuality": None,
             "previousBassPitchClass": None,
             "history": [],
+            "keyContext": None,
         }
     )
 
@@ -231,29 +238,44 @@ previous.harmony_voicing_cost = bass_voice_cost
 previous.v25.guitarist_assignment_cost = bass_voice_cost
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    from basic_pitch.inference import predict
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    # Establish global key context from the request's shared note events.
+    # V29 reuses the same events for all existing cleaning/mapping steps, so
+    # Basic Pitch inference runs once per request.
+    provider = resolve_provider(provider, audio_path)
+    _, _, groups = previous.detect_onset_groups(
+        provider.note_events(),
+        transcription_type,
+    )
+    prepare_key_context(groups)
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
 
-    # Run one lightweight detection pass solely to establish global key context.
-    # V29 performs the production pass and all existing cleaning/mapping steps.
-    _, _, note_events = predict(audio_path)
-    extracted = [
-        parsed
-        for event in note_events
-        if (parsed := engine.extract_note_event(event)) is not None
-    ]
-    cleaned = previous.base.clean_detected_notes(extracted, transcription_type)
-    groups = previous.base.guitarist_group_notes(cleaned, transcription_type)
 
+def prepare_key_context(groups: list[list[dict[str, Any]]]) -> dict[str, Any]:
     reset_sequence_state()
     key_context = configure_key_context(groups)
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+    SEQUENCE_STATE["keyContext"] = key_context
+    return key_context
+
+
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     result["engineVersion"] = "3.0-phase-1-chord-sequence-bass-voice"
     result["guitarBrainLesson"] = "connect-chords-and-preserve-bass-inversions"
     result["phase1Sequence"] = {
-        "keyContext": key_context,
+        "keyContext": SEQUENCE_STATE.get("keyContext"),
         "smoothedChordHistory": list(SEQUENCE_STATE.get("history") or []),
     }
+    result["noteEventInference"] = resolve_provider(provider, audio_path).diagnostics()
     return result
 
 
@@ -5,6 +5,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v30 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -65,13 +66,26 @@ previous.previous.harmony_voicing_cost = safe_harmony_voicing_cost
 previous.previous.v25.guitarist_assignment_cost = previous.bass_voice_cost
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     result["engineVersion"] = "3.1-phase-1-recursion-safe"
     result["guitarBrainLesson"] = "harmony-sequence-with-nonrecursive-scoring"
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v31 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -23,13 +24,26 @@ def to_json_safe(value: Any) -> Any:
     return previous.to_json_safe(value)
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     result["engineVersion"] = "3.2-phase-1-diagnostics-safe"
     result["guitarBrainLesson"] = "harmony-first-analysis-with-safe-candidate-diagnostics"
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
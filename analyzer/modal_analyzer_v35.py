@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v34 as previous
+from analysis_context import ScopedState
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -17,16 +19,19 @@ v30 = v31.previous
 v29 = v30.previous
 v25 = v29.v25
 
-HARMONIC_EVIDENCE: dict[str, Any] = {
-    "pitchClasses": [],
-    "root": None,
-    "quality": None,
-    "bassPitchClass": None,
-    "confidence": 0.0,
-    "coverage": 0.0,
-    "completeness": 0.0,
-    "openVoicingApproved": False,
-}
+HARMONIC_EVIDENCE = ScopedState(
+    "v35.harmonic_evidence",
+    {
+        "pitchClasses": [],
+        "root": None,
+        "quality": None,
+        "bassPitchClass": None,
+        "confidence": 0.0,
+        "coverage": 0.0,
+        "completeness": 0.0,
+        "openVoicingApproved": False,
+    },
+)
 
 
 def to_json_safe(value: Any) -> Any:
@@ -204,8 +209,12 @@ def summarize_voicing_evidence(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["voicingEvidence"] = summarize_voicing_evidence(result)
     result["musicalUnderstanding"] = understanding
@@ -216,6 +225,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -6,6 +6,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v35 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -170,8 +171,12 @@ def summarize_path_training(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["phrasePathTraining"] = summarize_path_training(result)
     result["musicalUnderstanding"] = understanding
@@ -182,6 +187,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -1,12 +1,13 @@
-import itertools
 import os
 import statistics
 import tempfile
 from pathlib import Path
 from typing import Any
 
+import fretboard_candidates
 import modal
 import modal_analyzer_v36 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -121,23 +122,13 @@ def protected_group_assignments(
             [(note, string_index, fret) for string_index, fret in unique_positions]
         )
 
-    tested = 0
-    for combination in itertools.product(*note_options):
-        tested += 1
-        if tested > MAX_COMBINATIONS:
-            break
-
-        strings = [int(item[1]) for item in combination]
-        if len(set(strings)) != len(strings):
-            continue
-        if max(strings) - min(strings) > 5:
-            continue
-
-        fretted = [int(item[2]) for item in combination if int(item[2]) > 0]
-        if fretted and max(fretted) - min(fretted) > 5:
-            continue
-
-        candidate = list(combination)
+    for row in fretboard_candidates.playable_combinations(
+        [[(string_index, fret) for _, string_index, fret in slot] for slot in note_options],
+        5,
+        5,
+        limit=MAX_COMBINATIONS,
+    ):
+        candidate = [note_options[slot][index] for slot, index in enumerate(row)]
         key = assignment_key(candidate)
         if key not in seen:
             candidates.append(candidate)
@@ -185,8 +176,12 @@ def summarize_candidate_training(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["candidateDiversity"] = summarize_candidate_training(result)
     result["musicalUnderstanding"] = understanding
@@ -197,6 +192,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v37 as previous
+from analysis_context import ScopedList, ScopedState
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -13,8 +15,10 @@ image = previous.image.add_local_python_source("modal_analyzer_v37")
 v25 = previous.v25
 original_protected_group_assignments = previous.protected_group_assignments
 
-POSITION_INVENTORY: list[dict[str, Any]] = []
-GROUP_COUNTER = 0
+POSITION_INVENTORY = ScopedList("v38.position_inventory")
+# ``collect`` is switched off in contexts that never report the inventory,
+# such as preview requests.
+INVENTORY_STATE = ScopedState("v38.inventory_state", {"groupCounter": 0, "collect": True})
 
 
 def to_json_safe(value: Any) -> Any:
@@ -65,13 +69,13 @@ def inventory_group_assignments(
     transcription_type: str,
     anchor: int,
 ) -> list[list[tuple[dict[str, Any], int, int]]]:
-    global GROUP_COUNTER
-
     candidates = original_protected_group_assignments(
         group,
         transcription_type,
         anchor,
     )
+    if not INVENTORY_STATE["collect"]:
+        return candidates
 
     bucket_counts = {"open": 0, "low": 0, "mid": 0, "high": 0}
     for candidate in candidates:
@@ -79,7 +83,7 @@ def inventory_group_assignments(
 
     POSITION_INVENTORY.append(
         {
-            "groupIndex": GROUP_COUNTER,
+            "groupIndex": INVENTORY_STATE["groupCounter"],
             "anchor": int(anchor),
             "noteCount": len(group),
             "notes": [
@@ -92,7 +96,7 @@ def inventory_group_assignments(
             "highCandidateAvailable": bucket_counts["high"] > 0,
         }
     )
-    GROUP_COUNTER += 1
+    INVENTORY_STATE["groupCounter"] += 1
     return candidates
 
 
@@ -132,12 +136,12 @@ def summarize_inventory() -> dict[str, Any]:
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    global GROUP_COUNTER
-    POSITION_INVENTORY.clear()
-    GROUP_COUNTER = 0
-
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["candidateInventory"] = summarize_inventory()
     result["musicalUnderstanding"] = understanding
@@ -148,6 +152,18 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    POSITION_INVENTORY.clear()
+    INVENTORY_STATE["groupCounter"] = 0
+
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
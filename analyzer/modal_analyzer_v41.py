@@ -6,6 +6,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v40 as previous
+import phrase_beam
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -94,13 +96,7 @@ def dual_memory_build_phrase_paths(
 ) -> list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]]:
     """Beam search with independent bass and upper-voice position memories."""
     initial_upper = None if is_low_bass(previous_assignment) else previous_assignment
-    beam: list[
-        tuple[
-            float,
-            list[list[tuple[dict[str, Any], int, int]]],
-            list[tuple[dict[str, Any], int, int]] | None,
-        ]
-    ] = [(0.0, [], initial_upper)]
+    beam = [phrase_beam.root_node(initial_upper)]
 
     for group in groups:
         assignments = v25.all_group_assignments(group, transcription_type, anchor)
@@ -111,38 +107,42 @@ def dual_memory_build_phrase_paths(
                 anchor,
             )
 
-        next_beam: list[
-            tuple[
-                float,
-                list[list[tuple[dict[str, Any], int, int]]],
-                list[tuple[dict[str, Any], int, int]] | None,
-            ]
-        ] = []
-
-        for accumulated, path, upper_memory in beam:
-            prior = path[-1] if path else previous_assignment
-            for assignment in assignments:
-                cost = accumulated
-                cost += v25.guitarist_assignment_cost(
-                    assignment,
-                    transcription_type,
-                    anchor,
-                )
-                cost += v25.phrase_movement_cost(prior, assignment, anchor)
-                cost += upper_memory_cost(upper_memory, assignment, anchor)
-
-                next_upper = upper_memory if is_low_bass(assignment) else assignment
-                next_beam.append((cost, path + [assignment], next_upper))
-
-        next_beam.sort(key=lambda item: item[0])
-        beam = next_beam[: max(int(v25.PATH_BEAM_WIDTH), 96)]
+        def step_cost(
+            node: phrase_beam.BeamNode,
+            assignment: list[tuple[dict[str, Any], int, int]],
+        ) -> float:
+            prior = previous_assignment if node.is_root else node.assignment
+            cost = node.cost
+            cost += v25.guitarist_assignment_cost(
+                assignment,
+                transcription_type,
+                anchor,
+            )
+            cost += v25.phrase_movement_cost(prior, assignment, anchor)
+            cost += upper_memory_cost(node.state, assignment, anchor)
+            return cost
+
+        def next_upper(
+            node: phrase_beam.BeamNode,
+            assignment: list[tuple[dict[str, Any], int, int]],
+        ) -> list[tuple[dict[str, Any], int, int]] | None:
+            return node.state if is_low_bass(assignment) else assignment
+
+        next_beam = phrase_beam.expand(
+            beam,
+            assignments,
+            step_cost,
+            next_state=next_upper,
+        )
+        beam = phrase_beam.cheapest(next_beam, max(int(v25.PATH_BEAM_WIDTH), 96))
 
     rescored: list[
         tuple[float, list[list[tuple[dict[str, Any], int, int]]]]
     ] = []
-    for base_cost, path, _ in beam:
+    for node in beam:
+        path = node.path()
         metrics = v25.previous.previous.path_metrics(path)
-        total = base_cost
+        total = node.cost
         total += metrics["positionShiftTotal"] * 1.2
         total += metrics["largeShiftCount"] * 8.0
         total -= metrics["repeatConsistency"] * 5.5
@@ -168,8 +168,12 @@ def summarize_dual_memory(result: dict[str, Any]) -> dict[str, Any]:
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["dualPositionMemory"] = summarize_dual_memory(result)
     result["musicalUnderstanding"] = understanding
@@ -180,6 +184,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
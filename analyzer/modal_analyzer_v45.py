@@ -6,6 +6,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v44 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -57,7 +59,7 @@ def assignment_region(
 
 
 _original_build_phrase_paths = v25.build_phrase_paths
-_PATH_DIAGNOSTICS: list[dict[str, Any]] = []
+_PATH_DIAGNOSTICS = ScopedList("v45.path_diagnostics")
 
 
 def diagnostic_build_phrase_paths(
@@ -121,9 +123,12 @@ def diagnostic_build_phrase_paths(
 v25.build_phrase_paths = diagnostic_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _PATH_DIAGNOSTICS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["topPathDiagnostics"] = {
         "benchmarkBaseline": 53.0,
@@ -142,6 +147,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _PATH_DIAGNOSTICS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -7,6 +7,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v45 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -64,7 +66,7 @@ def path_region_profile(path: list[list[tuple[dict[str, Any], int, int]]]) -> di
 
 
 _original_build_phrase_paths = previous._original_build_phrase_paths
-_PATH_DIAGNOSTICS: list[dict[str, Any]] = []
+_PATH_DIAGNOSTICS = ScopedList("v46.path_diagnostics")
 
 
 def diagnostic_build_phrase_paths(
@@ -139,9 +141,12 @@ def diagnostic_build_phrase_paths(
 v25.build_phrase_paths = diagnostic_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _PATH_DIAGNOSTICS.clear()
-    result = previous.previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["dominantPathDiagnostics"] = {
         "benchmarkBaseline": 53.0,
@@ -160,6 +165,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _PATH_DIAGNOSTICS.clear()
+    result = previous.previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -6,6 +6,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v46 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -14,7 +16,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v46")
 v25 = previous.v25
 LOW_BASS_MIDI_MAX = previous.LOW_BASS_MIDI_MAX
 _original_build_phrase_paths = previous._original_build_phrase_paths
-_RERANK_DIAGNOSTICS: list[dict[str, Any]] = []
+_RERANK_DIAGNOSTICS = ScopedList("v47.rerank_diagnostics")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -206,12 +208,12 @@ def reranked_build_phrase_paths(
 v25.build_phrase_paths = reranked_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _RERANK_DIAGNOSTICS.clear()
-    result = previous.previous.previous.analyze_audio_file(
-        audio_path,
-        transcription_type,
-    )
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["wholePathReranking"] = {
         "benchmarkBaseline": 53.0,
@@ -230,6 +232,20 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _RERANK_DIAGNOSTICS.clear()
+    result = previous.previous.previous.analyze_audio_file(
+        audio_path,
+        transcription_type,
+        provider,
+    )
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
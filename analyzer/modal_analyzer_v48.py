@@ -5,13 +5,15 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
 image = previous.image.add_local_python_source("modal_analyzer_v47")
 
 v25 = previous.v25
-_RERANK_DIAGNOSTICS: list[dict[str, Any]] = []
+_RERANK_DIAGNOSTICS = ScopedList("v48.rerank_diagnostics")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -132,12 +134,12 @@ def v48_build_phrase_paths(
 v25.build_phrase_paths = v48_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _RERANK_DIAGNOSTICS.clear()
-    result = previous.previous.previous.previous.analyze_audio_file(
-        audio_path,
-        transcription_type,
-    )
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["closeMidPathPromotion"] = {
         "benchmarkBaseline": 63.0,
@@ -157,6 +159,20 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _RERANK_DIAGNOSTICS.clear()
+    result = previous.previous.previous.previous.analyze_audio_file(
+        audio_path,
+        transcription_type,
+        provider,
+    )
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
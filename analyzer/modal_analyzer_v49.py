@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -13,7 +15,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v47")
 v25 = previous.v25
 LOW_BASS_MIDI_MAX = previous.LOW_BASS_MIDI_MAX
 _original_v47_builder = previous.reranked_build_phrase_paths
-_HIGH_FAILURE_DIAGNOSTICS: list[dict[str, Any]] = []
+_HIGH_FAILURE_DIAGNOSTICS = ScopedList("v49.high_failure_diagnostics")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -148,12 +150,12 @@ def diagnostic_build_phrase_paths(
 v25.build_phrase_paths = diagnostic_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _HIGH_FAILURE_DIAGNOSTICS.clear()
-    result = previous.previous.previous.previous.previous.analyze_audio_file(
-        audio_path,
-        transcription_type,
-    )
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["highPositionFailureDiagnostics"] = {
         "benchmarkBaseline": 63.0,
@@ -173,6 +175,20 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _HIGH_FAILURE_DIAGNOSTICS.clear()
+    result = previous.previous.previous.previous.previous.analyze_audio_file(
+        audio_path,
+        transcription_type,
+        provider,
+    )
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -12,7 +14,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v47")
 
 v25 = previous.v25
 _original_v47_builder = previous.reranked_build_phrase_paths
-_SELECTED_PATHS: list[dict[str, Any]] = []
+_SELECTED_PATHS = ScopedList("v51.selected_paths")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -168,9 +170,12 @@ def compare_selected_to_final(
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _SELECTED_PATHS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     discovered = collect_event_lists(result)
     best_list = max(discovered, key=lambda item: item["eventCount"], default=None)
     comparison = (
@@ -198,6 +203,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _SELECTED_PATHS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -12,7 +14,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v47")
 
 v25 = previous.v25
 _original_render_path = v25.render_path
-_RENDER_HANDOFFS: list[dict[str, Any]] = []
+_RENDER_HANDOFFS = ScopedList("v52.render_handoffs")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -139,9 +141,12 @@ def tracing_render_path(
 v25.render_path = tracing_render_path
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _RENDER_HANDOFFS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     total_matches = sum(item["matchedAssignments"] for item in _RENDER_HANDOFFS)
     total_mismatches = sum(item["mismatchCount"] for item in _RENDER_HANDOFFS)
     total_missing = sum(item["missingAssignments"] for item in _RENDER_HANDOFFS)
@@ -167,6 +172,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _RENDER_HANDOFFS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
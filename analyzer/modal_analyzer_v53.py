@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -13,8 +15,8 @@ image = previous.image.add_local_python_source("modal_analyzer_v47")
 v25 = previous.v25
 _original_builder = previous.reranked_build_phrase_paths
 _original_renderer = v25.render_path
-_PENDING_ANCHOR_CALLS: list[dict[str, Any]] = []
-_CROSS_ANCHOR_WINDOWS: list[dict[str, Any]] = []
+_PENDING_ANCHOR_CALLS = ScopedList("v53.pending_anchor_calls")
+_CROSS_ANCHOR_WINDOWS = ScopedList("v53.cross_anchor_windows")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -124,10 +126,12 @@ v25.build_phrase_paths = traced_build_phrase_paths
 v25.render_path = traced_render_path
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _PENDING_ANCHOR_CALLS.clear()
-    _CROSS_ANCHOR_WINDOWS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
 
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["crossAnchorWinnerDiagnostics"] = {
@@ -150,6 +154,17 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _PENDING_ANCHOR_CALLS.clear()
+    _CROSS_ANCHOR_WINDOWS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -7,6 +7,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v47 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -15,7 +17,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v47")
 v25 = previous.v25
 LOW_BASS_MIDI_MAX = previous.LOW_BASS_MIDI_MAX
 _original_render_path = v25.render_path
-_LOCAL_CORRECTIONS: list[dict[str, Any]] = []
+_LOCAL_CORRECTIONS = ScopedList("v55.local_corrections")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -190,9 +192,12 @@ def locally_corrected_render_path(
 v25.render_path = locally_corrected_render_path
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _LOCAL_CORRECTIONS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["localHighIslandCorrections"] = {
         "benchmarkBaseline": 63.0,
@@ -213,6 +218,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _LOCAL_CORRECTIONS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -7,6 +7,8 @@ from typing import Any
 import modal
 import modal_analyzer_v55 as previous
 import modal_analyzer_v24 as v24
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -17,7 +19,7 @@ image = (
 )
 
 _original_style_path_candidates = v24.style_path_candidates
-_VOICING_DECISIONS: list[dict[str, Any]] = []
+_VOICING_DECISIONS = ScopedList("v56.voicing_decisions")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -215,9 +217,12 @@ def chord_aware_style_path_candidates(
 v24.style_path_candidates = chord_aware_style_path_candidates
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _VOICING_DECISIONS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["chordIdentityVoicingZones"] = {
         "honestFixtureBaseline": 19.06,
@@ -237,6 +242,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _VOICING_DECISIONS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -7,6 +7,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v55 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -15,7 +17,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v55")
 v25 = previous.v25
 LOW_BASS_MIDI_MAX = previous.LOW_BASS_MIDI_MAX
 _original_build_phrase_paths = v25.build_phrase_paths
-_LOCAL_VOICING_DECISIONS: list[dict[str, Any]] = []
+_LOCAL_VOICING_DECISIONS = ScopedList("v58.local_voicing_decisions")
 
 NOTE_NAMES = {
     0: "C", 1: "C#", 2: "D", 3: "D#", 4: "E", 5: "F",
@@ -211,9 +213,12 @@ def locally_chord_aware_build_phrase_paths(
 v25.build_phrase_paths = locally_chord_aware_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _LOCAL_VOICING_DECISIONS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["localGroupChordVoicingZones"] = {
         "honestFixtureBaseline": 19.06,
@@ -233,6 +238,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _LOCAL_VOICING_DECISIONS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v58 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -12,7 +14,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v58")
 
 v25 = previous.v25
 _original_build_phrase_paths = previous._original_build_phrase_paths
-_CONTEXT_DECISIONS: list[dict[str, Any]] = []
+_CONTEXT_DECISIONS = ScopedList("v59.context_decisions")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -115,9 +117,12 @@ def context_aware_build_phrase_paths(
 v25.build_phrase_paths = context_aware_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _CONTEXT_DECISIONS.clear()
-    result = previous.previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["contextAwareLocalChordZones"] = {
         "honestFixtureBaseline": 19.06,
@@ -137,6 +142,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _CONTEXT_DECISIONS.clear()
+    result = previous.previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -7,6 +7,8 @@ from typing import Any
 import modal
 import modal_analyzer_v55 as previous
 import modal_analyzer_v58 as voicing
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -18,7 +20,7 @@ image = (
 
 v25 = previous.v25
 _original_build_phrase_paths = voicing._original_build_phrase_paths
-_ORACLE_DECISIONS: list[dict[str, Any]] = []
+_ORACLE_DECISIONS = ScopedList("v60.oracle_decisions")
 
 # Benchmark-only oracle for the trusted 12-measure Stairway excerpt.
 # This is deliberately not a production harmony detector. Its purpose is to
@@ -134,9 +136,12 @@ def oracle_build_phrase_paths(
 v25.build_phrase_paths = oracle_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _ORACLE_DECISIONS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["fixtureGuidedHarmonyOracle"] = {
         "honestFixtureBaseline": 19.06,
@@ -156,6 +161,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _ORACLE_DECISIONS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,8 @@ from typing import Any
 
 import modal
 import modal_analyzer_v60 as previous
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -12,7 +14,7 @@ image = previous.image.add_local_python_source("modal_analyzer_v60")
 
 v25 = previous.v25
 _original_build_phrase_paths = previous._original_build_phrase_paths
-_CANDIDATE_INVENTORY: list[dict[str, Any]] = []
+_CANDIDATE_INVENTORY = ScopedList("v61.candidate_inventory")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -119,9 +121,12 @@ def inventory_build_phrase_paths(
 v25.build_phrase_paths = inventory_build_phrase_paths
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _CANDIDATE_INVENTORY.clear()
-    result = previous.previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["oracleCandidateInventory"] = {
         "honestFixtureBaseline": 19.06,
@@ -140,6 +145,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _CANDIDATE_INVENTORY.clear()
+    result = previous.previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
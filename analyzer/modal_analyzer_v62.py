@@ -1,12 +1,14 @@
-import itertools
 import os
 import statistics
 import tempfile
 from pathlib import Path
 from typing import Any
 
+import fretboard_candidates
 import modal
 import modal_analyzer_v61 as previous
+from analysis_context import ScopedList, ScopedState
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -14,7 +16,19 @@ image = previous.image.add_local_python_source("modal_analyzer_v61")
 
 v25 = previous.v25
 _ORIGINAL_ALL_GROUP_ASSIGNMENTS = v25.all_group_assignments
-_EXPANSION_DIAGNOSTICS: list[dict[str, Any]] = []
+_EXPANSION_DIAGNOSTICS = ScopedList("v62.expansion_diagnostics")
+# Per-request candidate caps; a preview request lowers them in its own
+# AnalysisContext without touching concurrent full analyses.
+CANDIDATE_BUDGET = ScopedState(
+    "v62.candidate_budget",
+    {
+        "positionsPerRanking": 6,
+        "positionsPerNote": 10,
+        "targetCandidates": 28,
+        "anchorCandidates": 20,
+        "totalCandidates": 48,
+    },
+)
 
 
 def to_json_safe(value: Any) -> Any:
@@ -31,26 +45,31 @@ def target_distance(fret: int, lower: float, upper: float) -> float:
     return min(abs(float(fret) - lower), abs(float(fret) - upper))
 
 
-def expanded_group_assignments(
-    group: list[dict[str, Any]],
-    transcription_type: str,
-    anchor: int,
-) -> list[list[tuple[dict[str, Any], int, int]]]:
-    if not group:
-        return []
+# Expanded shapes by (MIDI tuple, anchor, part, oracle zone, budget), like
+# v25's GROUP_SHAPE_CACHE for the shapes it generates.
+EXPANDED_SHAPE_CACHE = fretboard_candidates.ShapeCache()
 
-    start = group_start(group)
-    oracle = previous.previous.oracle_chord_for_start(start)
-    lower, upper = [float(value) for value in oracle["preferredRange"]]
-    allow_open = bool(oracle.get("allowOpen"))
-    target_center = (lower + upper) / 2.0
+Shape = tuple[tuple[int, int], ...]
 
-    note_options: list[list[tuple[dict[str, Any], int, int]]] = []
-    option_diagnostics: list[dict[str, Any]] = []
 
-    for note in sorted(group, key=lambda item: int(item["midi"]), reverse=True):
-        positions = engine.playable_positions(int(note["midi"]), transcription_type)
-        ranked: list[tuple[float, dict[str, Any], int, int]] = []
+def build_expanded_shapes(
+    midis: tuple[int, ...],
+    transcription_type: str,
+    anchor: int,
+    lower: float,
+    upper: float,
+    allow_open: bool,
+    budget: dict[str, int],
+) -> tuple[list[Shape], list[list[tuple[int, int]]], int]:
+    """Rank one descending MIDI tuple's (string, fret) shapes for a target zone.
+
+    Returns the kept shapes, each note's selected positions and the raw
+    combination count; notes are bound to them by ``expanded_group_assignments``.
+    """
+    note_options: list[list[tuple[int, int]]] = []
+    for midi in midis:
+        positions = engine.playable_positions(int(midi), transcription_type)
+        ranked: list[tuple[float, int, int]] = []
 
         for string_index, fret in positions:
             fret = int(fret)
@@ -65,68 +84,52 @@ def expanded_group_assignments(
             if fret > 15:
                 score += (fret - 15) * 0.5
 
-            ranked.append((score, note, int(string_index), fret))
+            ranked.append((score, int(string_index), fret))
 
         ranked.sort(key=lambda item: item[0])
 
         # Preserve anchor-local choices while guaranteeing that every playable
         # target-zone option survives into the Cartesian product.
-        selected: list[tuple[dict[str, Any], int, int]] = []
+        selected: list[tuple[int, int]] = []
         seen: set[tuple[int, int]] = set()
 
         target_ranked = [
             item for item in ranked
-            if lower <= item[3] <= upper or (allow_open and item[3] == 0)
+            if lower <= item[2] <= upper or (allow_open and item[2] == 0)
         ]
         anchor_ranked = sorted(
             ranked,
             key=lambda item: (
-                abs(float(item[3]) - float(anchor)),
+                abs(float(item[2]) - float(anchor)),
                 item[0],
             ),
         )
 
-        for _, note_value, string_index, fret in target_ranked[:6] + anchor_ranked[:6] + ranked[:6]:
+        per_ranking = budget["positionsPerRanking"]
+        for _, string_index, fret in (
+            target_ranked[:per_ranking] + anchor_ranked[:per_ranking] + ranked[:per_ranking]
+        ):
             key = (string_index, fret)
             if key in seen:
                 continue
             seen.add(key)
-            selected.append((note_value, string_index, fret))
-            if len(selected) >= 10:
+            selected.append(key)
+            if len(selected) >= budget["positionsPerNote"]:
                 break
 
         note_options.append(selected)
-        option_diagnostics.append(
-            {
-                "midi": int(note["midi"]),
-                "selectedPositions": [
-                    {"stringIndex": string_index, "fret": fret}
-                    for _, string_index, fret in selected
-                ],
-                "targetPositionCount": sum(
-                    1
-                    for _, _, fret in selected
-                    if lower <= fret <= upper or (allow_open and fret == 0)
-                ),
-            }
-        )
-
-    candidates: list[list[tuple[dict[str, Any], int, int]]] = []
-    for combination in itertools.product(*note_options):
-        strings = [item[1] for item in combination]
-        if len(set(strings)) != len(strings):
-            continue
-        if max(strings) - min(strings) > v25.MAX_STRING_SPAN:
-            continue
 
-        frets = [item[2] for item in combination if item[2] > 0]
-        if frets and max(frets) - min(frets) > v25.MAX_FRET_SPAN:
-            continue
-
-        candidates.append(list(combination))
+    candidates: list[Shape] = [
+        tuple(note_options[slot][index] for slot, index in enumerate(row))
+        for row in fretboard_candidates.playable_combinations(
+            note_options,
+            v25.MAX_STRING_SPAN,
+            v25.MAX_FRET_SPAN,
+        )
+    ]
 
-    def candidate_cost(candidate: list[tuple[dict[str, Any], int, int]]) -> tuple[float, float, float]:
-        frets = [item[2] for item in candidate]
+    def candidate_cost(candidate: Shape) -> tuple[float, float, float]:
+        frets = [fret for _, fret in candidate]
         non_open = [fret for fret in frets if fret > 0]
         center = float(statistics.median(frets)) if frets else float(anchor)
         zone_cost = target_distance(int(round(center)), lower, upper)
@@ -142,38 +145,91 @@ def expanded_group_assignments(
     # Keep a target-aware half and an anchor-aware half. This prevents the
     # correct open/low shapes from being discarded when the current phrase
     # anchor remains at fret 5, 7, 9, or 12.
-    target_candidates = candidates[:28]
+    target_candidates = candidates[: budget["targetCandidates"]]
     anchor_candidates = sorted(
         candidates,
         key=lambda candidate: abs(
-            float(statistics.median([item[2] for item in candidate])) - float(anchor)
+            float(statistics.median([fret for _, fret in candidate])) - float(anchor)
         ),
-    )[:20]
+    )[: budget["anchorCandidates"]]
 
-    merged: list[list[tuple[dict[str, Any], int, int]]] = []
+    merged: list[Shape] = []
     seen_assignments: set[tuple[tuple[int, int, int], ...]] = set()
     for candidate in target_candidates + anchor_candidates:
-        key = v25.assignment_key(candidate)
+        # v25.assignment_key of the bound candidate.
+        key = tuple(sorted((midi, string_index, fret) for midi, (string_index, fret) in zip(midis, candidate)))
         if key in seen_assignments:
             continue
         seen_assignments.add(key)
         merged.append(candidate)
-        if len(merged) >= 48:
+        if len(merged) >= budget["totalCandidates"]:
             break
 
+    return merged, note_options, len(candidates)
+
+
+def expanded_group_assignments(
+    group: list[dict[str, Any]],
+    transcription_type: str,
+    anchor: int,
+) -> list[list[tuple[dict[str, Any], int, int]]]:
+    if not group:
+        return []
+
+    start = group_start(group)
+    oracle = previous.previous.oracle_chord_for_start(start)
+    lower, upper = [float(value) for value in oracle["preferredRange"]]
+    allow_open = bool(oracle.get("allowOpen"))
+
+    notes = sorted(group, key=lambda item: int(item["midi"]), reverse=True)
+    midis = tuple(int(note["midi"]) for note in notes)
+    budget = dict(CANDIDATE_BUDGET)
+    shapes, note_options, raw_count = EXPANDED_SHAPE_CACHE.get_or_build(
+        (
+            midis,
+            anchor,
+            transcription_type,
+            lower,
+            upper,
+            allow_open,
+            tuple(sorted(budget.items())),
+            v25.MAX_STRING_SPAN,
+            v25.MAX_FRET_SPAN,
+        ),
+        lambda: build_expanded_shapes(midis, transcription_type, anchor, lower, upper, allow_open, budget),
+    )
+    merged = [
+        [(note, string_index, fret) for note, (string_index, fret) in zip(notes, shape)]
+        for shape in shapes
+    ]
+
     _EXPANSION_DIAGNOSTICS.append(
         {
             "groupStart": round(start, 4),
             "anchor": int(anchor),
             "oracle": oracle,
-            "noteOptions": option_diagnostics,
-            "rawCombinationCount": len(candidates),
+            "noteOptions": [
+                {
+                    "midi": midi,
+                    "selectedPositions": [
+                        {"stringIndex": string_index, "fret": fret}
+                        for string_index, fret in selected
+                    ],
+                    "targetPositionCount": sum(
+                        1
+                        for _, fret in selected
+                        if lower <= fret <= upper or (allow_open and fret == 0)
+                    ),
+                }
+                for midi, selected in zip(midis, note_options)
+            ],
+            "rawCombinationCount": raw_count,
             "returnedCandidateCount": len(merged),
             "returnedCenters": sorted(
                 {
-                    round(float(statistics.median([item[2] for item in candidate])), 3)
-                    for candidate in merged
-                    if candidate
+                    round(float(statistics.median([fret for _, fret in shape])), 3)
+                    for shape in shapes
+                    if shape
                 }
             ),
         }
@@ -184,9 +240,12 @@ def expanded_group_assignments(
 v25.all_group_assignments = expanded_group_assignments
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _EXPANSION_DIAGNOSTICS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["oracleCandidateExpansion"] = {
         "honestFixtureBaseline": 19.06,
@@ -205,6 +264,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _EXPANSION_DIAGNOSTICS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
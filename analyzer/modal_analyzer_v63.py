@@ -4,15 +4,30 @@ import tempfile
 from pathlib import Path
 from typing import Any
 
+import anchor_search
+import beam_kernel
 import modal
+import modal_analyzer_v29 as v29
 import modal_analyzer_v62 as previous
+import phrase_beam
+from analysis_context import ScopedList, ScopedState, analysis_scope
+from audio_ingest import AudioDownloadError, download_audio
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
-image = previous.image.add_local_python_source("modal_analyzer_v62")
+image = previous.image.add_local_python_source("modal_analyzer_v62", "anchor_search")
 
 v25 = previous.v25
-_BEAM_DIAGNOSTICS: list[dict[str, Any]] = []
+# Every request binds its own AnalysisContext, so one warm container can
+# serve several uploads at once without sharing diagnostics.
+MAX_CONCURRENT_INPUTS = 4
+_BEAM_DIAGNOSTICS = ScopedList("v63.beam_diagnostics")
+# Per-request beam widths, scoped like the candidate caps in V62.
+BEAM_BUDGET = ScopedState(
+    "v63.beam_budget",
+    {"globalPaths": 64, "targetPaths": 32, "keptPaths": 80},
+)
 
 
 def to_json_safe(value: Any) -> Any:
@@ -74,60 +89,117 @@ def oracle_assignment_adjustment(
     return adjustment
 
 
+def group_candidates(
+    group: list[dict[str, Any]],
+    transcription_type: str,
+    anchor: int,
+) -> list[list[tuple[dict[str, Any], int, int]]]:
+    assignments = v25.all_group_assignments(group, transcription_type, anchor)
+    if not assignments:
+        assignments = previous.previous.previous.previous.previous.previous.group_assignments(
+            group,
+            transcription_type,
+            anchor,
+        )
+    return assignments
+
+
+def add_path_metrics(total: float, path: list[list[tuple[dict[str, Any], int, int]]]) -> float:
+    """``total`` with the path-metric terms added in the beam's original order."""
+    metrics = previous.previous.previous.previous.previous.path_metrics(path)
+    # Keep normal guitarist continuity, but do not punish the known purposeful
+    # open/low/fifth-position changes as aggressively as the legacy beam.
+    total += metrics["positionShiftTotal"] * 0.35
+    total += metrics["largeShiftCount"] * 1.5
+    total -= metrics["repeatConsistency"] * 5.5
+    return total
+
+
+def path_metric_adjustment(path: list[list[tuple[dict[str, Any], int, int]]]) -> float:
+    return add_path_metrics(0.0, path)
+
+
+def window_costs(
+    groups: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchors: list[int],
+    previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+) -> anchor_search.SharedWindowCosts:
+    """Candidates and anchor-independent costs for searching ``groups`` from each anchor."""
+    return anchor_search.SharedWindowCosts(
+        groups,
+        anchors,
+        previous_assignment,
+        lambda group, anchor: group_candidates(group, transcription_type, anchor),
+        v25.phrase_movement_cost,
+    )
+
+
 def diverse_oracle_build_phrase_paths(
     groups: list[list[dict[str, Any]]],
     transcription_type: str,
     anchor: int,
     previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+    shared: anchor_search.SharedWindowCosts | None = None,
 ) -> list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]]:
-    beam: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = [(0.0, [])]
+    import numpy as np
+
+    if shared is None:
+        shared = window_costs(groups, transcription_type, [anchor], previous_assignment)
+    timer = phrase_beam.PhraseTimer()
+    interner = phrase_beam.PathInterner()
+    beam = [phrase_beam.root_node()]
     step_diagnostics: list[dict[str, Any]] = []
 
     for group_index, group in enumerate(groups):
         oracle = oracle_for_group(group)
-        assignments = v25.all_group_assignments(group, transcription_type, anchor)
-        if not assignments:
-            assignments = previous.previous.previous.previous.previous.previous.group_assignments(
-                group,
-                transcription_type,
-                anchor,
-            )
-
-        next_beam: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = []
-        for accumulated, path in beam:
-            prior = path[-1] if path else previous_assignment
-            for assignment in assignments:
-                cost = accumulated
-                cost += v25.guitarist_assignment_cost(assignment, transcription_type, anchor)
-                cost += v25.phrase_movement_cost(prior, assignment, anchor)
-                cost += oracle_assignment_adjustment(assignment, oracle)
-                next_beam.append((cost, path + [assignment]))
-
-        next_beam.sort(key=lambda item: item[0])
+        assignments = shared.candidates[anchor][group_index]
+
+        # Group and oracle terms depend only on the candidate, and movement
+        # only on the entry's last assignment, so each is computed once and
+        # broadcast over beam x candidate; the sum keeps the per-pair order.
+        # Oracle and movement terms are shared with the window's other anchors.
+        group_costs = beam_kernel.cost_vector(
+            assignments,
+            lambda assignment: v25.guitarist_assignment_cost(assignment, transcription_type, anchor),
+        )
+        oracle_costs = shared.vector(
+            "oracle",
+            group_index,
+            assignments,
+            lambda assignment: oracle_assignment_adjustment(assignment, oracle),
+        )
+        movement = shared.movement(
+            group_index,
+            [previous_assignment if node.is_root else node.assignment for node in beam],
+            assignments,
+            anchor,
+        )
+        costs = (
+            np.array([node.cost for node in beam])[:, None]
+            + group_costs[None, :]
+            + movement
+            + oracle_costs[None, :]
+        )
+        next_beam = phrase_beam.expand_scored(
+            beam,
+            assignments,
+            costs.tolist(),
+            interner,
+            [v25.assignment_key(assignment) for assignment in assignments],
+        )
 
         # Preserve target-zone paths separately from the globally cheapest paths.
         # V62 proved the correct candidates exist, but the normal beam deleted them.
+        in_zone = [in_oracle_zone(assignment, oracle) for assignment in assignments]
         target_paths = [
-            item for item in next_beam
-            if item[1] and in_oracle_zone(item[1][-1], oracle)
+            node for index, node in enumerate(next_beam)
+            if in_zone[index % len(assignments)]
         ]
-        target_paths.sort(key=lambda item: item[0])
-
-        global_keep = next_beam[:64]
-        target_keep = target_paths[:32]
-        merged: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = []
-        seen: set[tuple[tuple[tuple[int, int, int], ...], ...]] = set()
-
-        for item in target_keep + global_keep:
-            path_key = tuple(v25.assignment_key(assignment) for assignment in item[1])
-            if path_key in seen:
-                continue
-            seen.add(path_key)
-            merged.append(item)
-            if len(merged) >= 80:
-                break
-
-        beam = merged
+
+        global_keep = phrase_beam.cheapest(next_beam, BEAM_BUDGET["globalPaths"])
+        target_keep = phrase_beam.cheapest(target_paths, BEAM_BUDGET["targetPaths"])
+        beam = phrase_beam.unique_paths(target_keep + global_keep, BEAM_BUDGET["keptPaths"])
         step_diagnostics.append(
             {
                 "groupIndex": group_index,
@@ -138,29 +210,23 @@ def diverse_oracle_build_phrase_paths(
                 "targetPathCount": len(target_paths),
                 "preservedPathCount": len(beam),
                 "preservedTargetCount": sum(
-                    1 for _, path in beam
-                    if path and in_oracle_zone(path[-1], oracle)
+                    1 for node in beam
+                    if in_oracle_zone(node.assignment, oracle)
                 ),
                 "preservedCenters": sorted(
                     {
                         round(float(center), 3)
-                        for _, path in beam
-                        if path and (center := assignment_center(path[-1])) is not None
+                        for node in beam
+                        if (center := assignment_center(node.assignment)) is not None
                     }
                 ),
             }
         )
 
     rescored: list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]] = []
-    for base_cost, path in beam:
-        metrics = previous.previous.previous.previous.previous.path_metrics(path)
-        total = base_cost
-        # Keep normal guitarist continuity, but do not punish the known purposeful
-        # open/low/fifth-position changes as aggressively as the legacy beam.
-        total += metrics["positionShiftTotal"] * 0.35
-        total += metrics["largeShiftCount"] * 1.5
-        total -= metrics["repeatConsistency"] * 5.5
-
+    for node in beam:
+        path = node.path()
+        total = add_path_metrics(node.cost, path)
         for group, assignment in zip(groups, path):
             total += oracle_assignment_adjustment(assignment, oracle_for_group(group))
         rescored.append((total, path))
@@ -173,6 +239,7 @@ def diverse_oracle_build_phrase_paths(
             "anchor": int(anchor),
             "steps": step_diagnostics,
             "finalCandidateCount": len(rescored),
+            "searchMilliseconds": timer.milliseconds(),
             "winnerCenters": [
                 round(float(center), 3) if center is not None else None
                 for assignment in (rescored[0][1] if rescored else [])
@@ -183,12 +250,36 @@ def diverse_oracle_build_phrase_paths(
     return rescored[:8]
 
 
+def oracle_window_search_context(
+    window: list[list[dict[str, Any]]],
+    transcription_type: str,
+) -> Any:
+    # The oracle chord follows each group's position in the song, so a riff
+    # only repeats where the oracle asks for the same voicing.
+    return (
+        _original_window_search_context(window, transcription_type),
+        tuple(
+            (
+                str(oracle.get("name") or ""),
+                tuple(float(value) for value in oracle["preferredRange"]),
+                bool(oracle.get("allowOpen")),
+            )
+            for oracle in (oracle_for_group(group) for group in window)
+        ),
+    )
+
+
 v25.build_phrase_paths = diverse_oracle_build_phrase_paths
+_original_window_search_context = v29.window_search_context
+v29.window_search_context = oracle_window_search_context
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _BEAM_DIAGNOSTICS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["oracleBeamPreservation"] = {
         "honestFixtureBaseline": 19.06,
@@ -207,15 +298,25 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _BEAM_DIAGNOSTICS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
     memory=4096,
     secrets=[modal.Secret.from_name("dadrock-analyzer-secret")],
 )
+@modal.concurrent(max_inputs=MAX_CONCURRENT_INPUTS)
 @modal.fastapi_endpoint(method="POST")
 def analyze(payload: dict) -> dict:
-    import requests
     from fastapi import HTTPException
 
     expected_token = os.environ.get("ANALYZER_API_TOKEN")
@@ -242,21 +343,16 @@ def analyze(payload: dict) -> dict:
     with tempfile.TemporaryDirectory() as temp_dir:
         audio_path = Path(temp_dir) / f"uploaded{suffix}"
         try:
-            response = requests.get(audio_url, headers=headers, timeout=120)
-        except requests.RequestException as error:
-            raise HTTPException(status_code=502, detail="The analyzer could not download the audio file.") from error
-        if not response.ok:
-            raise HTTPException(status_code=502, detail="The analyzer could not download the audio file.")
-        if len(response.content) > engine.MAX_AUDIO_SIZE_BYTES:
-            raise HTTPException(status_code=413, detail="The uploaded audio cannot be larger than 50 MB.")
-
-        audio_path.write_bytes(response.content)
+            download_audio(audio_url, audio_path, headers)
+        except AudioDownloadError as error:
+            raise HTTPException(status_code=error.status_code, detail=error.detail) from error
         original_metadata = engine.inspect_audio_file(str(audio_path))
         engine.validate_audio_metadata(original_metadata)
         normalized_path = Path(temp_dir) / "normalized.wav"
         engine.normalize_audio_file(str(audio_path), str(normalized_path))
         normalized_metadata = engine.inspect_audio_file(str(normalized_path))
-        result = analyze_audio_file(str(normalized_path), transcription_type)
+        with analysis_scope():
+            result = analyze_audio_file(str(normalized_path), transcription_type)
         result["audioMetadata"] = original_metadata
         result["normalizedAudio"] = {
             "sampleRate": normalized_metadata["sampleRate"],
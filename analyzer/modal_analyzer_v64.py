@@ -4,6 +4,7 @@ from typing import Any
 import modal
 import modal_analyzer_v47 as v47
 import modal_analyzer_v63 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -65,8 +66,12 @@ def to_json_safe(value: Any) -> Any:
     return previous.to_json_safe(value)
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     result["engineVersion"] = "6.4-phase-1-oracle-beam-path-metrics-fix"
     result["guitarBrainLesson"] = (
         "preserve-target-zone-beam-paths-with-self-contained-path-metrics"
@@ -74,6 +79,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(
     image=image,
     timeout=600,
@@ -5,6 +5,7 @@ import modal
 import modal_analyzer_v47 as v47
 import modal_analyzer_v63 as v63
 import modal_analyzer_v65 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -105,8 +106,12 @@ v63.oracle_assignment_adjustment = chord_specific_adjustment
 v47.path_metrics = neutral_path_metrics
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["chordSpecificPositionScoring"] = {
         "honestFixtureBaseline": 19.06,
@@ -121,6 +126,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
@@ -1,10 +1,17 @@
 import statistics
 from typing import Any
 
+import beam_kernel
+import anchor_search
 import modal
+import modal_analyzer_v29 as v29
 import modal_analyzer_v47 as v47
 import modal_analyzer_v63 as v63
 import modal_analyzer_v66 as previous
+import phrase_beam
+import phrase_viterbi
+from analysis_context import ScopedList
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -13,10 +20,11 @@ image = (
     .add_local_python_source("modal_analyzer_v66")
     .add_local_python_source("modal_analyzer_v63")
     .add_local_python_source("modal_analyzer_v47")
+    .add_local_python_source("phrase_viterbi")
 )
 
 v25 = v63.v25
-_PAIR_DIAGNOSTICS: list[dict[str, Any]] = []
+_PAIR_DIAGNOSTICS = ScopedList("v67.pair_diagnostics")
 
 
 def to_json_safe(value: Any) -> Any:
@@ -113,17 +121,119 @@ def paired_transition_adjustment(
 _original_builder = v63.diverse_oracle_build_phrase_paths
 
 
+def monophonic_build_phrase_paths(
+    groups: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchor: int,
+    previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+    shared: anchor_search.SharedWindowCosts | None = None,
+) -> list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]]:
+    """Exact optimum of the V63 + V67 path score for single-note windows.
+
+    Every term of that score is a function of one group or of two adjacent
+    groups, so a Viterbi pass over each note's (string, fret) candidates finds
+    the cheapest complete path that the oracle beam approximates. The score
+    returned is the V63 score of that path; the caller adds the pair terms.
+    """
+    if shared is None:
+        shared = v63.window_costs(groups, transcription_type, [anchor], previous_assignment)
+    timer = phrase_beam.PhraseTimer()
+    oracles = [v63.oracle_for_group(group) for group in groups]
+    candidates = shared.candidates[anchor]
+    if not all(candidates):
+        return []
+
+    def group_cost(index: int) -> Any:
+        options = candidates[index]
+        value = beam_kernel.cost_vector(
+            options,
+            lambda assignment: v25.guitarist_assignment_cost(assignment, transcription_type, anchor),
+        )
+        # The beam adds the oracle term per step and again when it reranks
+        # complete paths.
+        value = value + shared.vector(
+            "oracle",
+            index,
+            options,
+            lambda assignment: v63.oracle_assignment_adjustment(assignment, oracles[index]),
+        ) * 2.0
+        if index == 0:
+            value = value + shared.movement(0, [previous_assignment], options, anchor)[0]
+        return value
+
+    def transition_cost(index: int) -> Any:
+        pair = groups[index - 1 : index + 1]
+        priors, assignments = candidates[index - 1], candidates[index]
+        return (
+            shared.movement(index, priors, assignments, anchor)
+            + shared.matrix(
+                "pathMetric",
+                index,
+                priors,
+                assignments,
+                lambda prior, assignment: v63.path_metric_adjustment([prior, assignment]),
+            )
+            + shared.matrix(
+                "pairTransition",
+                index,
+                priors,
+                assignments,
+                lambda prior, assignment: paired_transition_adjustment(pair, [prior, assignment])[0],
+            )
+        )
+
+    unary = [group_cost(index) for index in range(len(candidates))]
+    pairwise = [transition_cost(index) for index in range(1, len(candidates))]
+    total, indices = phrase_viterbi.best_path(unary, pairwise)
+    path = [options[index] for options, index in zip(candidates, indices)]
+    score = total - paired_transition_adjustment(groups, path)[0]
+
+    v63._BEAM_DIAGNOSTICS.append(
+        {
+            "phraseIndex": len(v63._BEAM_DIAGNOSTICS),
+            "phraseStart": round(v63.previous.group_start(groups[0]), 4),
+            "anchor": int(anchor),
+            "search": "viterbi",
+            "steps": [
+                {
+                    "groupIndex": index,
+                    "groupStart": round(v63.previous.group_start(group), 4),
+                    "oracle": oracle,
+                    "assignmentCount": len(options),
+                }
+                for index, (group, oracle, options) in enumerate(zip(groups, oracles, candidates))
+            ],
+            "finalCandidateCount": 1,
+            "searchMilliseconds": timer.milliseconds(),
+            "winnerCenters": [
+                round(float(center), 3) if center is not None else None
+                for assignment in path
+                for center in [v63.assignment_center(assignment)]
+            ],
+        }
+    )
+    return [(score, path)]
+
+
 def pair_aware_build_phrase_paths(
     groups: list[list[dict[str, Any]]],
     transcription_type: str,
     anchor: int,
     previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+    shared: anchor_search.SharedWindowCosts | None = None,
 ) -> list[tuple[float, list[list[tuple[dict[str, Any], int, int]]]]]:
-    candidates = _original_builder(
+    # Single-note runs get the exact search; windows with chords keep the beam.
+    builder = (
+        monophonic_build_phrase_paths
+        if phrase_viterbi.is_monophonic(groups)
+        else _original_builder
+    )
+    candidates = builder(
         groups,
         transcription_type,
         anchor,
         previous_assignment,
+        shared=shared,
     )
     rescored: list[tuple[float, Any, list[dict[str, Any]]]] = []
 
@@ -149,14 +259,47 @@ def pair_aware_build_phrase_paths(
     return [(score, path) for score, path, _ in rescored]
 
 
+def shared_anchor_phrase_paths(
+    window: list[list[dict[str, Any]]],
+    transcription_type: str,
+    anchors: list[int],
+    previous_assignment: list[tuple[dict[str, Any], int, int]] | None,
+) -> list[tuple[int, float, list[list[tuple[dict[str, Any], int, int]]]]]:
+    """Search every anchor of a window over one set of shared candidates and costs.
+
+    Each anchor keeps its own beam, so the ranked paths are the ones the
+    per-anchor loop would find; only work that does not depend on the anchor
+    is done once per window.
+    """
+    if v25.build_phrase_paths is not pair_aware_build_phrase_paths:
+        return _per_anchor_phrase_paths(window, transcription_type, anchors, previous_assignment)
+    shared = v63.window_costs(window, transcription_type, anchors, previous_assignment)
+    return [
+        (anchor, score, path)
+        for anchor in anchors
+        for score, path in pair_aware_build_phrase_paths(
+            window,
+            transcription_type,
+            anchor,
+            previous_assignment,
+            shared=shared,
+        )
+    ]
+
+
 v25.build_phrase_paths = pair_aware_build_phrase_paths
+_per_anchor_phrase_paths = v29.anchor_phrase_paths
+v29.anchor_phrase_paths = shared_anchor_phrase_paths
 v63.oracle_assignment_adjustment = previous.chord_specific_adjustment
 v47.path_metrics = previous.neutral_path_metrics
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    _PAIR_DIAGNOSTICS.clear()
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["pairedChordTransitionScoring"] = {
         "previousScore": 26.06,
@@ -176,6 +319,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    _PAIR_DIAGNOSTICS.clear()
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
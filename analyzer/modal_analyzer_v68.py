@@ -2,6 +2,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v67 as previous
+from note_event_provider import NoteEventProvider
 
 engine = previous.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -12,8 +13,12 @@ def to_json_safe(value: Any) -> Any:
     return previous.to_json_safe(value)
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = previous.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     understanding = dict(result.get("musicalUnderstanding") or {})
     understanding["benchmarkAlignment"] = {
         "method": "score-rendered-events-against-the-actual-harmonic-window-start-and-end-times",
@@ -31,6 +36,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = previous.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
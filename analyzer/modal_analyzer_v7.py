@@ -8,8 +8,8 @@ from typing import Any
 import modal
 
 try:
+    from audio_ingest import AudioDownloadError, download_audio
     from modal_analyzer import (
-        MAX_AUDIO_SIZE_BYTES,
         analyze_audio_file as _analyze_audio_file_v6,
         inspect_audio_file,
         normalize_audio_file,
@@ -25,8 +25,8 @@ try:
         attach_bass_technique_diagnostics,
     )
 except ImportError:
+    from analyzer.audio_ingest import AudioDownloadError, download_audio
     from analyzer.modal_analyzer import (
-        MAX_AUDIO_SIZE_BYTES,
         analyze_audio_file as _analyze_audio_file_v6,
         inspect_audio_file,
         normalize_audio_file,
@@ -54,6 +54,7 @@ image = (
         "requests",
     )
     .add_local_python_source(
+        "audio_ingest",
         "modal_analyzer",
         "production_chord_diagnostics",
         "chord_sustain",
@@ -62,6 +63,8 @@ image = (
         "lead_technique_diagnostics_v7",
         "production_bass_technique_diagnostics",
         "bass_technique_diagnostics_v7",
+        "note_event_provider",
+        "inference_cache",
     )
 )
 
@@ -201,7 +204,6 @@ def analyze_audio_file(
 )
 @modal.fastapi_endpoint(method="POST")
 def analyze(payload: dict) -> dict:
-    import requests
     from fastapi import HTTPException
 
     expected_token = os.environ.get("ANALYZER_API_TOKEN")
@@ -279,40 +281,13 @@ def analyze(payload: dict) -> dict:
         audio_path = Path(temp_dir) / f"uploaded{suffix}"
 
         try:
-            response = requests.get(
-                audio_url,
-                headers=request_headers,
-                timeout=120,
-            )
-        except requests.RequestException as error:
+            download_audio(audio_url, audio_path, request_headers)
+        except AudioDownloadError as error:
             raise HTTPException(
-                status_code=502,
-                detail=(
-                    "The analyzer could not "
-                    "download the audio file."
-                ),
+                status_code=error.status_code,
+                detail=error.detail,
             ) from error
 
-        if not response.ok:
-            raise HTTPException(
-                status_code=502,
-                detail=(
-                    "The analyzer could not "
-                    "download the audio file."
-                ),
-            )
-
-        if len(response.content) > MAX_AUDIO_SIZE_BYTES:
-            raise HTTPException(
-                status_code=413,
-                detail=(
-                    "The uploaded audio cannot "
-                    "be larger than 50 MB."
-                ),
-            )
-
-        audio_path.write_bytes(response.content)
-
         try:
             audio_metadata = inspect_audio_file(
                 str(audio_path)
@@ -5,6 +5,7 @@ from typing import Any
 import modal
 import evaluate_fingering_v4 as timeline
 import modal_analyzer_v69 as base
+from note_event_provider import NoteEventProvider
 
 engine = base.engine
 app = modal.App("dadrock-tab-analyzer")
@@ -184,8 +185,12 @@ def apply_canonical_timeline_handoff(
     return diagnostics
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = base.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     diagnostics = apply_canonical_timeline_handoff(result, transcription_type)
 
     understanding = dict(result.get("musicalUnderstanding") or {})
@@ -210,6 +215,15 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    result = base.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
@@ -5,6 +5,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v71 as base
+from note_event_provider import NoteEventProvider
 
 engine = base.engine
 app = modal.App("dadrock-tab-analyzer-v72-candidate")
@@ -154,14 +155,20 @@ def gate_events(
     ]
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
+def validate_transcription_type(transcription_type: str) -> None:
     if transcription_type not in REGISTER_POLICY:
         raise ValueError(
             f"Unsupported transcription type: {transcription_type!r}. "
             f"Expected one of {sorted(REGISTER_POLICY)}."
         )
 
-    result = base.analyze_audio_file(audio_path, transcription_type)
+
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     raw_events = [
         event
         for event in (result.get("events") or [])
@@ -203,6 +210,16 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    validate_transcription_type(transcription_type)
+    result = base.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
@@ -1,6 +1,12 @@
 from __future__ import annotations
 
-from typing import Any
+import os
+import sys
+import tempfile
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Iterable, Iterator
 
 import modal
 import modal_analyzer_v72 as base
@@ -8,6 +14,21 @@ import modal_gomyway2_bass_reference_handoff_benchmark_v2 as bass_handoff
 import modal_gomyway2_lead_technique_handoff_benchmark_v3 as lead_handoff
 import modal_gomyway2_octave_lead_voicing_benchmark as lead_voicing
 import modal_gomyway2_rhythm_open_position_benchmark as rhythm_handoff
+from activity_gate import GatedPredict
+from analysis_context import analysis_scope
+from analysis_jobs import QUEUED, JobFailed, create_job, job_status, run_job
+from audio_decode import decode_for_inference
+from audio_ingest import AudioDownloadError, download_audio
+from basic_pitch_model import shared_model
+from chunked_inference import ChunkedPredict, basic_pitch_chunk_events, merge_chunk_diagnostics
+from inference_cache import CachedPredict
+from note_event_provider import NoteEventProvider, basic_pitch_predict, resolve_provider
+from phrase_parallel import build_parallel_pipeline
+from preview_mode import PREVIEW_SECONDS, build_preview_pipeline, preview_result
+from request_coalescing import SingleFlight
+from resolved_pipeline import WindowCallback, build_resolved_pipeline, local_source_modules
+from result_cache import ResultCache, result_cache_key
+from result_stream import STREAM_FORMATS, ProgressiveStream
 
 engine = base.engine
 app = modal.App("dadrock-tab-analyzer-v73-candidate")
@@ -25,6 +46,46 @@ image = (
     .add_local_python_source("modal_gomyway2_bass_reference_handoff_benchmark_v2")
 )
 
+# The production service ships one source layer holding exactly the modules
+# the V73 import graph reaches, instead of the chained per-version layers.
+# Scanning that graph reads every module, so it only runs where the image is
+# defined for a deploy; inside the container the image is already built.
+service_image = (
+    engine.image.add_local_python_source(*local_source_modules(__file__))
+    if modal.is_local()
+    else image
+)
+MAX_CONCURRENT_INPUTS = 4
+# Recent streamed requests kept for the time-to-first-measure summary.
+FIRST_MEASURE_SAMPLES = 200
+# Uploads at least this long are transcribed in parallel chunks by
+# ``ChunkInferenceWorker`` containers instead of in one serial pass.
+CHUNKED_INFERENCE_MIN_SECONDS = 120.0
+# Full analyses that ask for ``"phraseMapping": "parallel"`` map their
+# phrases on a pool of this many processes.
+PHRASE_WORKERS = 4
+
+# Background job records (status, result or error) keyed by job id.
+JOB_STORE = modal.Dict.from_name("dadrock-analyzer-jobs", create_if_missing=True)
+
+# Single-flight claims and just-finished results keyed like the result cache,
+# so identical requests arriving together run the pipeline once.
+FLIGHT_STORE = modal.Dict.from_name("dadrock-analyzer-in-flight", create_if_missing=True)
+
+# Finished results, shared by every container through a Volume so a customer
+# re-generating the same tab is served without re-running the pipeline.
+RESULT_CACHE_MOUNT = "/cache/results"
+RESULT_CACHE_VOLUME = modal.Volume.from_name(
+    "dadrock-analyzer-result-cache",
+    create_if_missing=True,
+)
+
+
+VERIFIED_CONTEXT_KEYS = ("referenceChords", "expectedProgression")
+TRANSCRIPTION_TYPES = ("lead", "rhythm", "bass")
+ANALYSIS_MODES = ("full", "preview")
+PHRASE_MAPPINGS = ("sequential", "parallel")
+
 ENGINE_VERSION = "7.3-phase-1-adaptive-learned-voicing-technique-handoff"
 
 
@@ -80,8 +141,12 @@ def learned_handoff(
     }
 
 
-def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, Any]:
-    result = base.analyze_audio_file(audio_path, transcription_type)
+def finalize_result(
+    result: dict[str, Any],
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
     events = [
         event
         for event in (result.get("events") or [])
@@ -117,9 +182,25 @@ def analyze_audio_file(audio_path: str, transcription_type: str) -> dict[str, An
     result["musicalUnderstanding"] = understanding
     result["engineVersion"] = ENGINE_VERSION
     result["voicingTechniqueHandoffMode"] = handoff_mode
+    if provider is not None:
+        result["noteEventInference"] = provider.diagnostics()
     return result
 
 
+def analyze_audio_file(
+    audio_path: str,
+    transcription_type: str,
+    provider: NoteEventProvider | None = None,
+) -> dict[str, Any]:
+    # One request scope for the whole V73 -> V29 chain: the key-context and
+    # mapping passes share a single Basic Pitch inference, and every layer's
+    # diagnostics land in this request's AnalysisContext.
+    provider = resolve_provider(provider, audio_path)
+    with analysis_scope():
+        result = base.analyze_audio_file(audio_path, transcription_type, provider)
+    return finalize_result(result, audio_path, transcription_type, provider)
+
+
 @app.function(image=image, timeout=600, memory=4096)
 def benchmark_healthcheck() -> dict[str, Any]:
     return {
@@ -133,3 +214,515 @@ def benchmark_healthcheck() -> dict[str, Any]:
         },
         "activationRule": "strict-three-way-register-gate-only",
     }
+
+
+def authorize_request(payload: dict) -> None:
+    from fastapi import HTTPException
+
+    expected_token = os.environ.get("ANALYZER_API_TOKEN")
+    supplied_token = str(payload.get("token") or "")
+    if not expected_token or supplied_token != expected_token:
+        raise HTTPException(status_code=401, detail="Unauthorized analyzer request.")
+
+
+def parse_transcription_type(value: Any) -> str | list[str] | None:
+    """Normalize ``transcriptionType`` to one part or an ordered list of parts.
+
+    A single part stays a string so single-part responses keep their shape;
+    ``"all"`` or a list asks for one response holding every listed part.
+    """
+    if isinstance(value, (list, tuple)):
+        parts = [str(part or "").strip().lower() for part in value]
+        if not parts or any(part not in TRANSCRIPTION_TYPES for part in parts):
+            return None
+        return list(dict.fromkeys(parts))
+    transcription_type = str(value or "").strip().lower()
+    if transcription_type == "all":
+        return list(TRANSCRIPTION_TYPES)
+    if transcription_type not in TRANSCRIPTION_TYPES:
+        return None
+    return transcription_type
+
+
+def is_preview(request: dict[str, Any]) -> bool:
+    return request.get("mode") == "preview"
+
+
+def maps_phrases_in_parallel(request: dict[str, Any]) -> bool:
+    return request.get("phraseMapping") == "parallel" and not is_preview(request)
+
+
+def requested_parts(request: dict[str, Any]) -> list[str]:
+    transcription_type = request["transcriptionType"]
+    if isinstance(transcription_type, str):
+        return [transcription_type]
+    return list(transcription_type)
+
+
+def reload_result_cache() -> None:
+    """Make entries other containers committed to the result Volume visible here."""
+    try:
+        RESULT_CACHE_VOLUME.reload()
+    except (RuntimeError, modal.exception.Error):
+        # Modal refuses to reload while files on the Volume are open, e.g. an
+        # entry this container is still writing; the lookup stays a miss.
+        pass
+
+
+def time_to_first_measure_summary(samples: Iterable[float]) -> dict[str, Any]:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0, "medianSeconds": None, "maxSeconds": None}
+    return {
+        "count": len(ordered),
+        "medianSeconds": ordered[len(ordered) // 2],
+        "maxSeconds": ordered[-1],
+    }
+
+
+def parse_analysis_request(payload: dict) -> dict[str, Any]:
+    """Validate an analyze payload into the fields the service needs."""
+    from fastapi import HTTPException
+
+    audio_url = str(payload.get("audioUrl") or "").strip()
+    transcription_type = parse_transcription_type(payload.get("transcriptionType"))
+    if transcription_type is None:
+        raise HTTPException(
+            status_code=400,
+            detail="transcriptionType must be lead, rhythm, bass, a list of those, or all.",
+        )
+    if not audio_url.startswith(("https://", "http://")):
+        raise HTTPException(status_code=400, detail="A valid audioUrl is required.")
+    mode = str(payload.get("mode") or "full").strip().lower()
+    if mode not in ANALYSIS_MODES:
+        raise HTTPException(status_code=400, detail="mode must be full or preview.")
+    phrase_mapping = str(payload.get("phraseMapping") or "sequential").strip().lower()
+    if phrase_mapping not in PHRASE_MAPPINGS:
+        raise HTTPException(status_code=400, detail="phraseMapping must be sequential or parallel.")
+
+    suffix = Path(audio_url).suffix.lower()
+    if suffix not in {".mp3", ".wav", ".m4a", ".aac", ".flac", ".ogg"}:
+        suffix = ".audio"
+
+    headers: dict[str, str] = {}
+    blob_token = str(payload.get("blobToken") or "").strip()
+    if blob_token:
+        headers["Authorization"] = f"Bearer {blob_token}"
+
+    return {
+        "audioUrl": audio_url,
+        "transcriptionType": transcription_type,
+        "mode": mode,
+        "phraseMapping": phrase_mapping,
+        "suffix": suffix,
+        "headers": headers,
+        "context": {
+            key: payload[key]
+            for key in VERIFIED_CONTEXT_KEYS
+            if payload.get(key) is not None
+        },
+    }
+
+
+@app.cls(image=service_image, timeout=600, memory=4096, enable_memory_snapshot=True)
+class ChunkInferenceWorker:
+    """Basic Pitch on one chunk of a long upload, fanned out with ``.map``."""
+
+    @modal.enter(snap=True)
+    def warm(self) -> None:
+        shared_model().warm()
+
+    @modal.method()
+    def transcribe(self, samples: Any) -> list[Any]:
+        return basic_pitch_chunk_events(samples)
+
+
+@app.cls(
+    image=service_image,
+    timeout=600,
+    memory=4096,
+    secrets=[modal.Secret.from_name("dadrock-analyzer-secret")],
+    volumes={RESULT_CACHE_MOUNT: RESULT_CACHE_VOLUME},
+    enable_memory_snapshot=True,
+)
+@modal.concurrent(max_inputs=MAX_CONCURRENT_INPUTS)
+class AnalyzerService:
+    """V73 production endpoint with a warm Basic Pitch model per container.
+
+    The snapshot hook imports TensorFlow, loads the model and resolves the
+    flat pipeline before the memory snapshot is taken, so restored containers
+    start with all three already in memory. Concurrent inputs share Basic
+    Pitch forward passes through the model's window batcher.
+
+    Uploads of ``CHUNKED_INFERENCE_MIN_SECONDS`` or longer are transcribed
+    in overlapping chunks across ``ChunkInferenceWorker`` containers and
+    stitched back together, so their inference time follows the chunk
+    length rather than the song length.
+
+    Full analyses may opt in to ``"phraseMapping": "parallel"``: their
+    phrases are then mapped on ``PHRASE_WORKERS`` processes and stitched
+    across the phrase boundaries, and the sequential chain is kept unless
+    the stitch scores better; see ``modal_analyzer_v29.parallel_windows``.
+
+    Silent intros, gaps and fade-outs are gated out before inference; the
+    audio skipped and the estimated time saved are reported under
+    ``noteEventInference.activityGate``.
+
+    ``transcriptionType`` may be a list of parts or ``"all"``; the parts then
+    share one inference and come back together under ``parts``.
+
+    ``stream`` answers with NDJSON (or SSE with ``"format": "sse"``)
+    records: metadata first, a provisional ``window`` record as each
+    harmonic window is mapped, then the finished result. Time to first measure is tracked
+    per container in ``cold_start_report``.
+
+    ``"mode": "preview"`` decodes and transcribes only the first
+    ``PREVIEW_SECONDS``, maps them with reduced candidate and beam budgets,
+    skips the V38/V39 candidate inventory and returns just the fields the
+    preview PDF renders.
+
+    Requests for a result key another request is already computing, in this
+    container or another, wait for that run's result (``resultCache.status``
+    ``"coalesced"``) instead of starting their own; see ``SingleFlight``.
+
+    ``analyze`` answers synchronously. ``submit`` returns a job id at once and
+    spawns ``run_analysis_job`` in the background; ``job`` polls the record
+    kept in the ``JOB_STORE`` Modal Dict.
+    """
+
+    @modal.enter(snap=True)
+    def warm(self) -> None:
+        started = time.perf_counter()
+        self.pipeline = build_resolved_pipeline(sys.modules[__name__])
+        self.preview_pipeline = build_preview_pipeline(self.pipeline)
+        self.parallel_pipeline = build_parallel_pipeline(self.pipeline, PHRASE_WORKERS)
+        pipeline_seconds = time.perf_counter() - started
+        self.startup = shared_model().warm()
+        self.startup["pipelineResolveSeconds"] = round(pipeline_seconds, 4)
+        self.first_request_seconds: float | None = None
+        self.first_measure_seconds: deque[float] = deque(maxlen=FIRST_MEASURE_SAMPLES)
+        self.result_cache = ResultCache(RESULT_CACHE_MOUNT, refresh=reload_result_cache)
+        self.flights = SingleFlight(FLIGHT_STORE)
+        self.chunked_predict = ChunkedPredict(ChunkInferenceWorker().transcribe.map)
+        # Inference only sees the active regions of an upload; the gates sit
+        # inside the note-event cache so a hit skips them too.
+        self.gated_predict = GatedPredict(basic_pitch_predict)
+        self.gated_chunked_predict = GatedPredict(self.chunked_predict)
+        self.cached_predict = CachedPredict(self.gated_predict)
+        self.cached_chunked_predict = CachedPredict(self.gated_chunked_predict)
+
+    @modal.method()
+    def cold_start_report(self) -> dict[str, Any]:
+        return {
+            "engineVersion": ENGINE_VERSION,
+            "startup": self.startup,
+            "firstRequestSeconds": self.first_request_seconds,
+            "timeToFirstMeasure": time_to_first_measure_summary(self.first_measure_seconds),
+            "inferenceBatching": shared_model().batcher.diagnostics(),
+            "resultCache": self.result_cache.diagnostics(),
+            "coalescing": self.flights.diagnostics(),
+            "stages": self.pipeline.stage_list(),
+        }
+
+    def analyze_request(self, request: dict[str, Any]) -> dict[str, Any]:
+        started = time.perf_counter()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            audio_path, original_metadata, decoded = self.fetch_audio(request, temp_dir)
+            results = self.analyze_parts(request, audio_path, decoded)
+        if self.first_request_seconds is None:
+            self.first_request_seconds = round(time.perf_counter() - started, 4)
+        return self.response_for(request, results, original_metadata, decoded)
+
+    def fetch_audio(
+        self,
+        request: dict[str, Any],
+        temp_dir: str,
+    ) -> tuple[Path, dict[str, Any], Any]:
+        """Probe, download, inspect and decode the upload into ``temp_dir``."""
+        from fastapi import HTTPException
+
+        audio_url = request["audioUrl"]
+        headers = request["headers"]
+        # Reject over-long, oversized or audio-less uploads from the container
+        # header alone, before paying for the transfer.
+        try:
+            probed_metadata = engine.inspect_remote_audio(audio_url, headers)
+            if probed_metadata is not None:
+                engine.validate_remote_metadata(probed_metadata)
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error)) from error
+
+        audio_path = Path(temp_dir) / f"uploaded{request['suffix']}"
+        try:
+            downloaded_bytes = download_audio(audio_url, audio_path, headers)
+        except AudioDownloadError as error:
+            raise HTTPException(status_code=error.status_code, detail=error.detail) from error
+        try:
+            if probed_metadata is not None:
+                original_metadata = {**probed_metadata, "fileSize": downloaded_bytes}
+            else:
+                original_metadata = engine.inspect_audio_file(str(audio_path))
+            engine.validate_audio_metadata(original_metadata)
+            # Decode straight to the model's mono 22.05 kHz float32 input;
+            # no normalized WAV on disk and no second ffprobe.
+            decoded = decode_for_inference(
+                str(audio_path),
+                original_metadata.get("durationSeconds"),
+                max_seconds=PREVIEW_SECONDS if is_preview(request) else None,
+            )
+        except ValueError as error:
+            raise HTTPException(status_code=400, detail=str(error)) from error
+        return audio_path, original_metadata, decoded
+
+    def analyze_parts(
+        self,
+        request: dict[str, Any],
+        audio_path: Path,
+        decoded: Any,
+        on_window: WindowCallback | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Serve each part from the result cache, an in-flight run or one shared run."""
+        from fastapi import HTTPException
+
+        parts = requested_parts(request)
+        audio_hash = decoded.content_hash()
+        context = dict(request.get("context") or {})
+        if is_preview(request):
+            # A song shorter than the preview decodes to the same samples in
+            # both modes, so the mode is part of the key.
+            context["mode"] = "preview"
+        if maps_phrases_in_parallel(request):
+            # A stitch may score better than the sequential chain.
+            context["phraseMapping"] = "parallel"
+        keys = {
+            part: result_cache_key(audio_hash, part, ENGINE_VERSION, context)
+            for part in parts
+        }
+        results = {part: self.result_cache.load(key) for part, key in keys.items()}
+        cache_status = {
+            part: "hit" for part, result in results.items() if result is not None
+        }
+        pending = [part for part, result in results.items() if result is None]
+        while pending:
+            # Parts another request is already analyzing are awaited rather
+            # than run twice; the rest share one inference and one note-event
+            # extraction.
+            leading = [part for part in pending if self.flights.claim(keys[part])]
+            if leading:
+                analyzed = self.run_parts(request, audio_path, decoded, leading, keys, on_window)
+                for part, result in analyzed.items():
+                    results[part] = result
+                    cache_status[part] = self.store_result(keys[part], result)
+            pending = []
+            for part in (part for part in keys if results[part] is None):
+                try:
+                    result = self.flights.wait(keys[part])
+                except JobFailed as error:
+                    raise HTTPException(status_code=error.status_code, detail=error.detail) from error
+                if result is None:
+                    # The leader went away without a record; claim it next.
+                    pending.append(part)
+                else:
+                    results[part] = result
+                    cache_status[part] = "coalesced"
+
+        for part, result in results.items():
+            result["resultCache"] = {"status": cache_status[part], "key": keys[part]}
+        return results
+
+    def run_parts(
+        self,
+        request: dict[str, Any],
+        audio_path: Path,
+        decoded: Any,
+        parts: list[str],
+        keys: dict[str, str],
+        on_window: WindowCallback | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Analyze ``parts`` as their single-flight leader and publish them."""
+        from fastapi import HTTPException
+
+        pipeline = self.preview_pipeline if is_preview(request) else self.pipeline
+        if maps_phrases_in_parallel(request):
+            pipeline = self.parallel_pipeline
+        chunked = decoded.duration_seconds >= CHUNKED_INFERENCE_MIN_SECONDS
+        gate = self.gated_chunked_predict if chunked else self.gated_predict
+        provider = NoteEventProvider(
+            str(audio_path),
+            predict=self.cached_chunked_predict if chunked else self.cached_predict,
+            audio=decoded,
+        )
+        try:
+            analyzed = pipeline.analyze_parts(
+                str(audio_path),
+                parts,
+                provider,
+                on_window=on_window,
+            )
+        except ValueError as error:
+            for part in parts:
+                self.flights.fail(keys[part], 400, str(error))
+            raise HTTPException(status_code=400, detail=str(error)) from error
+        except BaseException:
+            for part in parts:
+                self.flights.release(keys[part])
+            raise
+
+        results: dict[str, dict[str, Any]] = {}
+        for part, result in analyzed.items():
+            if provider.cache_status != "hit":
+                inference = result["noteEventInference"]
+                inference["activityGate"] = gate.last_diagnostics
+                if chunked:
+                    # One chunked prediction per active region.
+                    inference["chunking"] = merge_chunk_diagnostics(gate.last_region_diagnostics)
+            if is_preview(request):
+                result = preview_result(result)
+            results[part] = to_json_safe(result)
+            self.flights.publish(keys[part], results[part])
+        return results
+
+    def response_for(
+        self,
+        request: dict[str, Any],
+        results: dict[str, dict[str, Any]],
+        original_metadata: dict[str, Any],
+        decoded: Any,
+    ) -> dict[str, Any]:
+        for result in results.values():
+            result["audioMetadata"] = original_metadata
+            result["normalizedAudio"] = decoded.metadata()
+        transcription_type = request["transcriptionType"]
+        if isinstance(transcription_type, str):
+            return to_json_safe(results[transcription_type])
+        return to_json_safe({
+            "engineVersion": ENGINE_VERSION,
+            "transcriptionTypes": requested_parts(request),
+            "parts": results,
+            "audioMetadata": original_metadata,
+            "normalizedAudio": decoded.metadata(),
+        })
+
+    def stream_request(self, request: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """Yield ``metadata``, then ``window`` records, then the ``result``.
+
+        Errors after the response has started cannot change its status, so
+        they arrive as a final ``error`` record carrying the status code the
+        synchronous endpoint would have returned.
+        """
+        from fastapi import HTTPException
+
+        stream = ProgressiveStream(self.pipeline.render_tab)
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                audio_path, original_metadata, decoded = self.fetch_audio(request, temp_dir)
+                yield {
+                    "type": "metadata",
+                    "engineVersion": ENGINE_VERSION,
+                    "transcriptionTypes": requested_parts(request),
+                    "audioMetadata": original_metadata,
+                    "normalizedAudio": decoded.metadata(),
+                    "elapsedSeconds": stream.elapsed(),
+                }
+                results = yield from stream.run(
+                    lambda on_window: self.analyze_parts(
+                        request,
+                        audio_path,
+                        decoded,
+                        on_window,
+                    )
+                )
+        except HTTPException as error:
+            yield {"type": "error", "statusCode": error.status_code, "detail": str(error.detail)}
+            return
+        except Exception as error:  # reported in-stream instead of a cut connection
+            yield {
+                "type": "error",
+                "statusCode": 500,
+                "detail": f"Analysis failed: {type(error).__name__}",
+            }
+            return
+
+        if stream.first_measure_seconds is not None:
+            self.first_measure_seconds.append(stream.first_measure_seconds)
+        response = self.response_for(request, results, original_metadata, decoded)
+        yield {
+            "type": "result",
+            "result": response,
+            "streaming": {
+                "windowRecords": stream.window_records,
+                "timeToFirstMeasureSeconds": stream.first_measure_seconds,
+                "totalSeconds": stream.elapsed(),
+            },
+        }
+
+    def store_result(self, key: str, result: dict[str, Any]) -> str:
+        try:
+            self.result_cache.store(key, result)
+        except OSError:
+            return "miss-unstored"
+        try:
+            RESULT_CACHE_VOLUME.commit()
+        except modal.exception.Error:
+            # Committed with the container's next successful commit; until
+            # then only this container can serve it.
+            pass
+        return "miss"
+
+    @modal.fastapi_endpoint(method="POST")
+    def analyze(self, payload: dict) -> dict:
+        authorize_request(payload)
+        return self.analyze_request(parse_analysis_request(payload))
+
+    @modal.fastapi_endpoint(method="POST")
+    def stream(self, payload: dict) -> Any:
+        from fastapi.responses import StreamingResponse
+
+        authorize_request(payload)
+        request = parse_analysis_request(payload)
+        media_type, encode = STREAM_FORMATS.get(
+            str(payload.get("format") or "ndjson").lower(),
+            STREAM_FORMATS["ndjson"],
+        )
+        return StreamingResponse(
+            (encode(to_json_safe(record)) for record in self.stream_request(request)),
+            media_type=media_type,
+        )
+
+    @modal.fastapi_endpoint(method="POST")
+    def submit(self, payload: dict) -> dict:
+        authorize_request(payload)
+        request = parse_analysis_request(payload)
+        job_id = create_job(
+            JOB_STORE,
+            {
+                "audioUrl": request["audioUrl"],
+                "transcriptionType": request["transcriptionType"],
+                "mode": request["mode"],
+                "engineVersion": ENGINE_VERSION,
+            },
+        )
+        AnalyzerService().run_analysis_job.spawn(job_id, request)
+        return {"jobId": job_id, "status": QUEUED}
+
+    @modal.method()
+    def run_analysis_job(self, job_id: str, request: dict[str, Any]) -> str:
+        from fastapi import HTTPException
+
+        def work() -> dict[str, Any]:
+            try:
+                return self.analyze_request(request)
+            except HTTPException as error:
+                raise JobFailed(error.status_code, str(error.detail)) from error
+
+        return run_job(JOB_STORE, job_id, work)["status"]
+
+    @modal.fastapi_endpoint(method="POST")
+    def job(self, payload: dict) -> dict:
+        from fastapi import HTTPException
+
+        authorize_request(payload)
+        record = job_status(JOB_STORE, str(payload.get("jobId") or "").strip())
+        if record is None:
+            raise HTTPException(status_code=404, detail="Unknown analyzer job.")
+        return record
@@ -7,6 +7,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v7 as analyzer
+from note_event_provider import shared_cached_predict
 
 app = modal.App("dadrock-v7-combined-full-stack-benchmark")
 image = analyzer.image.add_local_python_source(
@@ -19,6 +20,8 @@ image = analyzer.image.add_local_python_source(
     "lead_technique_diagnostics_v7",
     "production_bass_technique_diagnostics",
     "bass_technique_diagnostics_v7",
+    "note_event_provider",
+    "inference_cache",
 )
 
 
@@ -193,6 +196,7 @@ def run_benchmark(
         "bass": bass_analysis,
         "checks": checks,
         "passed": all(checks.values()),
+        "inferenceCache": shared_cached_predict().cache.diagnostics(),
         "protectedBaselinesChanged": False,
         "trainingRule": (
             "V7 rhythm harmony, lead techniques, and bass techniques are opt-in, "
@@ -7,6 +7,7 @@ from typing import Any
 
 import modal
 import modal_analyzer_v7 as analyzer
+from note_event_provider import shared_cached_predict
 
 app = modal.App("dadrock-v7-full-song-timeline-benchmark")
 image = analyzer.image.add_local_python_source(
@@ -19,6 +20,8 @@ image = analyzer.image.add_local_python_source(
     "lead_technique_diagnostics_v7",
     "production_bass_technique_diagnostics",
     "bass_technique_diagnostics_v7",
+    "note_event_provider",
+    "inference_cache",
 )
 
 
@@ -226,6 +229,7 @@ def run_benchmark(
         "bassPoints": bass_points,
         "checks": checks,
         "passed": all(checks.values()),
+        "inferenceCache": shared_cached_predict().cache.diagnostics(),
         "protectedBaselinesChanged": False,
         "trainingRule": (
             "Timeline metadata is derived only from existing read-only diagnostics and "
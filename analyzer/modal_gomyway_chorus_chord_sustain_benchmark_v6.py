@@ -8,6 +8,7 @@ from pathlib import Path
 from typing import Any
 
 import modal
+from chord_sustain import build_soft_register_windows
 
 app = modal.App("dadrock-gomyway-chorus-chord-sustain-benchmark-v6")
 
@@ -15,6 +16,7 @@ image = (
     modal.Image.debian_slim(python_version="3.11")
     .apt_install("ffmpeg")
     .pip_install("basic-pitch")
+    .add_local_python_source("chord_sustain")
 )
 
 
@@ -59,86 +61,6 @@ def normalize_note_event(note_event: Any, offset: float) -> dict[str, Any] | Non
     }
 
 
-def register_weight(midi: int) -> float:
-    """Softly favour rhythm-guitar notes without deleting roots or upper doubles."""
-    if 45 <= midi <= 76:
-        return 1.0
-    if 40 <= midi < 45 or 76 < midi <= 84:
-        return 0.65
-    return 0.30
-
-
-def build_soft_register_windows(
-    events: list[dict[str, Any]],
-    window_seconds: float = 0.46,
-    hop_seconds: float = 0.08,
-) -> list[dict[str, Any]]:
-    if not events:
-        return []
-
-    first = min(float(event["start"]) for event in events)
-    last = max(float(event["end"]) for event in events)
-    windows: list[dict[str, Any]] = []
-    cursor = first
-    index = 0
-
-    while cursor <= last:
-        window_end = cursor + window_seconds
-        active = [
-            event for event in events
-            if float(event["start"]) < window_end
-            and float(event["end"]) > cursor
-        ]
-        if active:
-            support: Counter[int] = Counter()
-            weighted_duration: Counter[int] = Counter()
-            raw_duration: Counter[int] = Counter()
-
-            for event in active:
-                pitch_class = int(event["pitchClass"])
-                overlap = max(
-                    0.0,
-                    min(float(event["end"]), window_end)
-                    - max(float(event["start"]), cursor),
-                )
-                weight = register_weight(int(event["midi"]))
-                support[pitch_class] += 1
-                raw_duration[pitch_class] += overlap
-                weighted_duration[pitch_class] += overlap * weight
-
-            ranked = sorted(
-                support,
-                key=lambda pitch_class: (
-                    weighted_duration[pitch_class],
-                    raw_duration[pitch_class],
-                    support[pitch_class],
-                ),
-                reverse=True,
-            )
-            windows.append({
-                "windowIndex": index,
-                "start": cursor,
-                "end": window_end,
-                "eventCount": len(active),
-                "uniqueMidiCount": len({int(event["midi"]) for event in active}),
-                "midis": sorted({int(event["midi"]) for event in active}),
-                "pitchClasses": sorted(support),
-                "rankedPitchClasses": ranked,
-                "pitchClassSupport": {str(key): value for key, value in support.items()},
-                "pitchClassWeightedDuration": {
-                    str(key): round(value, 4)
-                    for key, value in weighted_duration.items()
-                },
-                "maximumEventDuration": max(
-                    float(event.get("duration") or 0.0) for event in active
-                ),
-            })
-        cursor += hop_seconds
-        index += 1
-
-    return windows
-
-
 def expected_progression_name(
     window: dict[str, Any],
     progression: list[str],
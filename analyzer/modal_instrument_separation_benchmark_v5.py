@@ -25,6 +25,7 @@ import modal_analyzer_v15 as legacy_renderer
 import modal_analyzer_v19 as legacy_assignments
 import modal_analyzer_v46 as legacy_bridge
 import modal_analyzer_v71 as analyzer
+from note_event_provider import NoteEventProvider
 
 app = modal.App("dadrock-instrument-separation-benchmark-v5")
 image = (
@@ -144,8 +145,9 @@ def analyse_three_way(audio_bytes: bytes, audio_name: str, fixture: dict[str, An
 
     try:
         policy = policy_for(fixture)
+        provider = NoteEventProvider(temporary_path)
         raw_results = {
-            part: analyzer.analyze_audio_file(temporary_path, part)
+            part: analyzer.analyze_audio_file(temporary_path, part, provider)
             for part in ("lead", "rhythm", "bass")
         }
         raw_events = {part: result_events(result) for part, result in raw_results.items()}
@@ -191,6 +193,7 @@ def analyse_three_way(audio_bytes: bytes, audio_name: str, fixture: dict[str, An
             "benchmarkVersion": 5,
             "benchmarkType": "three-way-register-gated-instrument-separation",
             "protectedAnalyzer": raw_results["lead"].get("engineVersion"),
+            "noteEventInference": provider.diagnostics(),
             "policy": policy,
             "rawSummaries": raw_summaries,
             "separatedSummaries": separated_summaries,
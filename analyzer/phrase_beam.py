@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import heapq
+import time
+from typing import Any, Callable, Hashable, Iterable
+
+
+class BeamNode:
+    """One beam entry stored as a back-pointer to its parent entry.
+
+    Extending a path costs one node instead of a full ``path + [assignment]``
+    list copy. ``path_id`` identifies the complete assignment sequence, so two
+    nodes with the same id describe the same path.
+    """
+
+    __slots__ = ("cost", "parent", "assignment", "path_id", "state")
+
+    def __init__(
+        self,
+        cost: float,
+        parent: BeamNode | None,
+        assignment: Any,
+        path_id: int,
+        state: Any = None,
+    ) -> None:
+        self.cost = cost
+        self.parent = parent
+        self.assignment = assignment
+        self.path_id = path_id
+        self.state = state
+
+    @property
+    def is_root(self) -> bool:
+        return self.parent is None
+
+    def path(self) -> list[Any]:
+        assignments: list[Any] = []
+        node: BeamNode | None = self
+        while node is not None and node.parent is not None:
+            assignments.append(node.assignment)
+            node = node.parent
+        assignments.reverse()
+        return assignments
+
+
+class PathInterner:
+    """Give every distinct assignment sequence a small integer id.
+
+    Each id is derived from the parent id and the new step's key, so path
+    deduplication costs one dictionary lookup per step instead of rebuilding
+    a tuple of every assignment key along the path.
+    """
+
+    ROOT = 0
+
+    def __init__(self) -> None:
+        self._ids: dict[tuple[int, Hashable], int] = {}
+
+    def extend(self, parent_id: int, step_key: Hashable) -> int:
+        key = (parent_id, step_key)
+        path_id = self._ids.get(key)
+        if path_id is None:
+            path_id = len(self._ids) + 1
+            self._ids[key] = path_id
+        return path_id
+
+
+def root_node(state: Any = None) -> BeamNode:
+    return BeamNode(0.0, None, None, PathInterner.ROOT, state)
+
+
+def expand(
+    beam: list[BeamNode],
+    assignments: list[Any],
+    step_cost: Callable[[BeamNode, Any], float],
+    interner: PathInterner | None = None,
+    step_keys: list[Hashable] | None = None,
+    next_state: Callable[[BeamNode, Any], Any] | None = None,
+) -> list[BeamNode]:
+    """Extend every beam entry by every assignment, in beam-major order.
+
+    ``step_cost`` returns the cumulative cost of the extended path so callers
+    keep their original floating-point accumulation order. Path ids are only
+    tracked when an ``interner`` and per-assignment ``step_keys`` are given.
+    """
+    expanded: list[BeamNode] = []
+    for node in beam:
+        for index, assignment in enumerate(assignments):
+            path_id = (
+                interner.extend(node.path_id, step_keys[index])
+                if interner is not None and step_keys is not None
+                else PathInterner.ROOT
+            )
+            expanded.append(
+                BeamNode(
+                    step_cost(node, assignment),
+                    node,
+                    assignment,
+                    path_id,
+                    next_state(node, assignment) if next_state else None,
+                )
+            )
+    return expanded
+
+
+def expand_scored(
+    beam: list[BeamNode],
+    assignments: list[Any],
+    costs: list[list[float]],
+    interner: PathInterner | None = None,
+    step_keys: list[Hashable] | None = None,
+) -> list[BeamNode]:
+    """``expand`` with the cumulative costs precomputed as ``costs[entry][assignment]``."""
+    expanded: list[BeamNode] = []
+    for node, row in zip(beam, costs):
+        for index, assignment in enumerate(assignments):
+            path_id = (
+                interner.extend(node.path_id, step_keys[index])
+                if interner is not None and step_keys is not None
+                else PathInterner.ROOT
+            )
+            expanded.append(BeamNode(row[index], node, assignment, path_id))
+    return expanded
+
+
+def cheapest(nodes: Iterable[BeamNode], width: int) -> list[BeamNode]:
+    """Stable top-``width`` selection, equal to ``sorted(...)[:width]``."""
+    return heapq.nsmallest(int(width), nodes, key=lambda node: node.cost)
+
+
+def unique_paths(nodes: Iterable[BeamNode], limit: int) -> list[BeamNode]:
+    kept: list[BeamNode] = []
+    seen: set[int] = set()
+    for node in nodes:
+        if node.path_id in seen:
+            continue
+        seen.add(node.path_id)
+        kept.append(node)
+        if len(kept) >= limit:
+            break
+    return kept
+
+
+class PhraseTimer:
+    """Measure wall-clock search time for one phrase."""
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+
+    def milliseconds(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000.0, 3)
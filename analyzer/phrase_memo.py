@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Hashable
+
+Assignment = list[tuple[dict[str, Any], int, int]]
+# One window's search: the anchors to search -> (anchor, score, path) rows in
+# anchor order.
+AnchorSearch = Callable[[list[int]], list[tuple[int, float, list[Assignment]]]]
+
+# Onsets and sustains are compared on this grid, which absorbs the few
+# milliseconds of jitter between takes of the same riff.
+MEMO_GRID_SECONDS = 0.05
+
+
+def group_start(group: list[dict[str, Any]]) -> float:
+    return min(float(note["start"]) for note in group)
+
+
+def note_end(note: dict[str, Any]) -> float:
+    return float(note.get("end") or note["start"])
+
+
+def canonical_order(group: list[dict[str, Any]]) -> list[int]:
+    """Note positions in a group ordered by pitch, so repeats line up note for note."""
+    return sorted(range(len(group)), key=lambda index: (int(group[index]["midi"]), float(group[index]["start"])))
+
+
+class PhraseMemo:
+    """Per-request memo of each anchor's phrase paths for repeated windows.
+
+    A window is identified by its pitch signature and its inter-onset and
+    sustain pattern on ``grid_seconds``; an entry is reused for the same
+    window, anchor, search context and boundary state (the previous
+    window's last assignment and how far into this window it rings). Paths
+    are stored by note position and rebuilt on the repeat's own notes, and a
+    hit keeps the score of the search that produced the entry.
+    """
+
+    def __init__(self, grid_seconds: float = MEMO_GRID_SECONDS) -> None:
+        self.grid_seconds = grid_seconds
+        self._entries: dict[Hashable, tuple[float, list[tuple[float, list[Any]]]]] = {}
+        self.lookups = 0
+        self.hits = 0
+        self.search_seconds = 0.0
+        self.saved_seconds = 0.0
+        self.merged_entries = 0
+
+    def _steps(self, seconds: float) -> int:
+        return round(seconds / self.grid_seconds)
+
+    def window_key(self, window: list[list[dict[str, Any]]]) -> tuple[Any, ...]:
+        starts = [group_start(group) for group in window]
+        return tuple(
+            (
+                self._steps(start - starts[index - 1]) if index else 0,
+                tuple(
+                    (int(group[position]["midi"]), self._steps(note_end(group[position]) - start))
+                    for position in canonical_order(group)
+                ),
+            )
+            for index, (group, start) in enumerate(zip(window, starts))
+        )
+
+    def boundary_key(
+        self,
+        window: list[list[dict[str, Any]]],
+        previous_assignment: Assignment | None,
+    ) -> tuple[Any, ...]:
+        if not previous_assignment or not window:
+            return ()
+        start = group_start(window[0])
+        # Anything that stopped a grid step before the window is simply not
+        # ringing, however long ago it ended.
+        return tuple(
+            sorted(
+                (int(note["midi"]), int(string_index), int(fret), max(-1, self._steps(note_end(note) - start)))
+                for note, string_index, fret in previous_assignment
+            )
+        )
+
+    def search(
+        self,
+        window: list[list[dict[str, Any]]],
+        anchors: list[int],
+        previous_assignment: Assignment | None,
+        context: Hashable,
+        search: AnchorSearch,
+    ) -> list[tuple[int, float, list[Assignment]]]:
+        """Every anchor's paths, searching only the anchors with no entry yet."""
+        base = (context, self.window_key(window), self.boundary_key(window, previous_assignment))
+        orders = [canonical_order(group) for group in window]
+        found: dict[int, list[tuple[float, list[Assignment]]]] = {}
+        missing: list[int] = []
+        for anchor in anchors:
+            self.lookups += 1
+            entry = self._entries.get((base, anchor))
+            if entry is None:
+                missing.append(anchor)
+                continue
+            seconds, stored = entry
+            self.hits += 1
+            self.saved_seconds += seconds
+            found[anchor] = [(score, self._rebuild(window, orders, path)) for score, path in stored]
+
+        if missing:
+            started = time.perf_counter()
+            rows = search(missing)
+            elapsed = time.perf_counter() - started
+            self.search_seconds += elapsed
+            positions = [
+                {id(group[position]): rank for rank, position in enumerate(order)}
+                for group, order in zip(window, orders)
+            ]
+            searched: dict[int, list[tuple[float, list[Assignment]]]] = {anchor: [] for anchor in missing}
+            for anchor, score, path in rows:
+                searched[anchor].append((score, path))
+            for anchor, paths in searched.items():
+                self._entries[(base, anchor)] = (
+                    elapsed / len(missing),
+                    [(score, self._positional(positions, path)) for score, path in paths],
+                )
+            found.update(searched)
+
+        return [(anchor, score, path) for anchor in anchors for score, path in found[anchor]]
+
+    @staticmethod
+    def _positional(positions: list[dict[int, int]], path: list[Assignment]) -> list[Any]:
+        return [
+            [(group_positions[id(note)], string_index, fret) for note, string_index, fret in assignment]
+            for group_positions, assignment in zip(positions, path)
+        ]
+
+    @staticmethod
+    def _rebuild(window: list[list[dict[str, Any]]], orders: list[list[int]], path: list[Any]) -> list[Assignment]:
+        return [
+            [(group[order[rank]], string_index, fret) for rank, string_index, fret in assignment]
+            for group, order, assignment in zip(window, orders, path)
+        ]
+
+    def merge(self, report: dict[str, Any] | None) -> None:
+        """Count another memo's work, such as a pool worker's, as this request's."""
+        if not report:
+            return
+        self.merged_entries += int(report["entries"])
+        self.lookups += int(report["lookups"])
+        self.hits += int(report["hits"])
+        self.search_seconds += float(report["searchMilliseconds"]) / 1000.0
+        self.saved_seconds += float(report["savedMilliseconds"]) / 1000.0
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "enabled": True,
+            "gridSeconds": self.grid_seconds,
+            "entries": len(self._entries) + self.merged_entries,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hitRate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+            "searchMilliseconds": round(self.search_seconds * 1000.0, 3),
+            "savedMilliseconds": round(self.saved_seconds * 1000.0, 3),
+        }
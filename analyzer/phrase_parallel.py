@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import importlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from typing import Any, Callable, Sequence
+
+from resolved_pipeline import ResolvedPipeline
+
+# First-window choices each phrase is continued from, and so the number of
+# final states the stitch chooses between.
+STITCH_CANDIDATES = 4
+
+_POOLS: dict[tuple[str, int], ProcessPoolExecutor] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def build_parallel_pipeline(pipeline: ResolvedPipeline, workers: int | None = None) -> ResolvedPipeline:
+    """The same resolved chain, mapping phrases on a process pool of ``workers``.
+
+    Workers import ``pipeline.top`` so they run with every layer's patches,
+    exactly like the parent.
+    """
+    overrides = [
+        (layer.PHRASE_PARALLEL, {"enabled": True, "module": pipeline.top.__name__, "workers": workers})
+        for layer in pipeline.layers
+        if hasattr(layer, "PHRASE_PARALLEL")
+    ]
+    return replace(pipeline, scoped_overrides=[*pipeline.scoped_overrides, *overrides])
+
+
+def import_chain(module: str) -> None:
+    importlib.import_module(module)
+
+
+def phrase_pool(module: str, workers: int | None = None) -> ProcessPoolExecutor:
+    """One long-lived pool per analyzer chain, shared by a container's requests.
+
+    Workers are spawned rather than forked: the parent may be serving other
+    requests on threads, and a spawned worker imports the chain cleanly.
+    """
+    workers = workers or os.cpu_count() or 1
+    with _POOLS_LOCK:
+        pool = _POOLS.get((module, workers))
+        if pool is None:
+            pool = _POOLS[(module, workers)] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=import_chain,
+                initargs=(module,),
+            )
+        return pool
+
+
+def map_phrases(
+    module: str,
+    function: Callable[[Any], Any],
+    tasks: list[Any],
+    workers: int | None = None,
+) -> list[Any]:
+    """``function`` on every task across the pool, results in task order."""
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(tasks) // (workers * 4))
+    return list(phrase_pool(module, workers).map(function, tasks, chunksize=chunk))
+
+
+def encode_path(window: Sequence[Sequence[dict[str, Any]]], path: list[Any]) -> list[Any]:
+    """A path by note position within each group, so it survives pickling."""
+    return [
+        [(positions[id(note)], int(string_index), int(fret)) for note, string_index, fret in assignment]
+        for positions, assignment in zip(
+            ({id(note): index for index, note in enumerate(group)} for group in window),
+            path,
+        )
+    ]
+
+
+def decode_path(window: Sequence[Sequence[dict[str, Any]]], encoded: list[Any]) -> list[Any]:
+    return [
+        [(group[index], string_index, fret) for index, string_index, fret in assignment]
+        for group, assignment in zip(window, encoded)
+    ]
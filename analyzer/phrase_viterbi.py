@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from typing import Any, Sequence
+
+
+def is_monophonic(groups: Sequence[Sequence[Any]]) -> bool:
+    """True when every onset group in the window holds exactly one note."""
+    return bool(groups) and all(len(group) == 1 for group in groups)
+
+
+def best_path(unary: Sequence[Any], pairwise: Sequence[Any]) -> tuple[float, list[int]]:
+    """Exact minimum-cost candidate index per step, by dynamic programming.
+
+    The cost of choosing ``c[i]`` at every step ``i`` is
+    ``sum(unary[i][c[i]]) + sum(pairwise[i - 1][c[i - 1], c[i]])``, so each
+    step costs one ``(previous, current)`` matrix reduction: O(n x P^2) with no
+    path ever dropped. Ties go to the earliest candidate, as in the beam's
+    stable ordering.
+    """
+    import numpy as np
+
+    if not unary:
+        return 0.0, []
+    score = np.asarray(unary[0], dtype=float)
+    back_pointers: list[Any] = []
+    for step in range(1, len(unary)):
+        totals = score[:, None] + pairwise[step - 1]
+        choice = np.argmin(totals, axis=0)
+        score = totals[choice, np.arange(totals.shape[1])] + unary[step]
+        back_pointers.append(choice)
+
+    index = int(np.argmin(score))
+    total = float(score[index])
+    path = [index]
+    for choice in reversed(back_pointers):
+        index = int(choice[index])
+        path.append(index)
+    path.reverse()
+    return total, path
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from typing import Any
+
+from resolved_pipeline import ResolvedPipeline
+
+# The preview PDF shows at most four tab systems, well inside this opening.
+PREVIEW_SECONDS = 30.0
+
+PREVIEW_CANDIDATE_BUDGET = {
+    "positionsPerRanking": 4,
+    "positionsPerNote": 6,
+    "targetCandidates": 12,
+    "anchorCandidates": 8,
+    "totalCandidates": 16,
+}
+PREVIEW_BEAM_BUDGET = {"globalPaths": 16, "targetPaths": 8, "keptPaths": 20}
+
+# V38 collects the candidate inventory and V39 prints it to the logs; neither
+# changes the events or the tab. Preview skips both finalizers and switches
+# off V38's collector during the search.
+DIAGNOSTIC_FINALIZERS = frozenset({"modal_analyzer_v38", "modal_analyzer_v39"})
+
+PREVIEW_RESULT_KEYS = (
+    "generatedTab",
+    "tuning",
+    "tempo",
+    "timeSignature",
+    "keySignature",
+    "difficulty",
+    "techniques",
+    "confidence",
+    "events",
+    "noteCount",
+    "engineVersion",
+)
+
+
+def build_preview_pipeline(pipeline: ResolvedPipeline) -> ResolvedPipeline:
+    """The same resolved chain with preview search budgets and no inventory.
+
+    The budgets are written into each part's ``AnalysisContext``, so preview
+    and full requests served by one container do not see each other's widths.
+    """
+    overrides = [
+        (layer.CANDIDATE_BUDGET, PREVIEW_CANDIDATE_BUDGET)
+        for layer in pipeline.layers
+        if hasattr(layer, "CANDIDATE_BUDGET")
+    ] + [
+        (layer.BEAM_BUDGET, PREVIEW_BEAM_BUDGET)
+        for layer in pipeline.layers
+        if hasattr(layer, "BEAM_BUDGET")
+    ] + [
+        (layer.INVENTORY_STATE, {"collect": False})
+        for layer in pipeline.layers
+        if hasattr(layer, "INVENTORY_STATE")
+    ]
+    return replace(
+        pipeline,
+        skipped_finalizers=DIAGNOSTIC_FINALIZERS,
+        scoped_overrides=overrides,
+        stages=[
+            stage
+            for stage in pipeline.stages
+            if stage.name.removeprefix("finalize:") not in DIAGNOSTIC_FINALIZERS
+        ],
+    )
+
+
+def preview_result(
+    result: dict[str, Any],
+    preview_seconds: float = PREVIEW_SECONDS,
+) -> dict[str, Any]:
+    """Keep what the preview flow renders and mark the result as partial."""
+    preview = {key: result.get(key) for key in PREVIEW_RESULT_KEYS}
+    preview["mode"] = "preview"
+    preview["previewSeconds"] = preview_seconds
+    return preview
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+import uuid
+from typing import Any
+
+try:
+    from analysis_jobs import JobFailed
+except ImportError:
+    from analyzer.analysis_jobs import JobFailed
+
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# A leader that has not finished within the service timeout is gone; its
+# claim is taken over by the next request for the same key.
+DEFAULT_LEASE_SECONDS = 600.0
+# Finished records stay readable this long, which covers a double-click and
+# the Next.js route's retry after a gateway timeout. Later requests are served
+# by the result cache.
+DEFAULT_LINGER_SECONDS = 120.0
+DEFAULT_POLL_SECONDS = 0.25
+
+
+class InMemoryFlightStore:
+    """Local stand-in for the ``modal.Dict`` that holds in-flight analyses.
+
+    Supports the subset of the Dict API single-flight uses: ``get``, ``put``
+    with ``skip_if_exists`` as the atomic claim, and ``pop``. Values are
+    copied in and out, as the Dict's serialization would.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return copy.deepcopy(self._items.get(key, default))
+
+    def put(self, key: str, value: Any, *, skip_if_exists: bool = False) -> bool:
+        with self._lock:
+            if skip_if_exists and key in self._items:
+                return False
+            self._items[key] = copy.deepcopy(value)
+            return True
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+
+class SingleFlight:
+    """Coalesce concurrent analyses of the same result key across containers.
+
+    The first request to ``claim`` a key leads: it runs the pipeline and
+    ``publish``es the result (or ``fail``s with the HTTP status it answered
+    with). Every other request for the key ``wait``s for that record instead
+    of starting its own run. ``wait`` returns ``None`` when the leader gave up
+    without a record or its lease ran out; the caller then claims the key
+    itself.
+
+    Taking over an expired claim is not atomic, so two late requests can
+    both lead; that costs one extra run, never a wrong result.
+    """
+
+    def __init__(
+        self,
+        store: Any,
+        *,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        linger_seconds: float = DEFAULT_LINGER_SECONDS,
+        poll_seconds: float = DEFAULT_POLL_SECONDS,
+    ) -> None:
+        self.store = store
+        self.lease_seconds = lease_seconds
+        self.linger_seconds = linger_seconds
+        self.poll_seconds = poll_seconds
+        self.led = 0
+        self.coalesced = 0
+        self.takeovers = 0
+        self._counter_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def claim(self, key: str) -> bool:
+        """Try to become the leader for ``key``."""
+        now = time.time()
+        record = {
+            "status": RUNNING,
+            "owner": uuid.uuid4().hex,
+            "startedAt": now,
+            "expiresAt": now + self.lease_seconds,
+        }
+        if self.store.put(key, record, skip_if_exists=True):
+            self._count("led")
+            return True
+        current = self.store.get(key)
+        if current is not None and current.get("expiresAt", 0.0) > now:
+            return False
+        self.store.pop(key, None)
+        if self.store.put(key, record, skip_if_exists=True):
+            self._count("led")
+            self._count("takeovers")
+            return True
+        return False
+
+    def publish(self, key: str, result: dict[str, Any]) -> None:
+        now = time.time()
+        self.store.put(
+            key,
+            {
+                "status": SUCCEEDED,
+                "result": result,
+                "finishedAt": now,
+                "expiresAt": now + self.linger_seconds,
+            },
+        )
+
+    def fail(self, key: str, status_code: int, detail: str) -> None:
+        """Share a deterministic rejection (a 4xx) with the waiting requests."""
+        now = time.time()
+        self.store.put(
+            key,
+            {
+                "status": FAILED,
+                "error": {"statusCode": status_code, "detail": detail},
+                "finishedAt": now,
+                "expiresAt": now + self.linger_seconds,
+            },
+        )
+
+    def release(self, key: str) -> None:
+        """Drop a claim without a record, so a waiting request re-runs it."""
+        self.store.pop(key, None)
+
+    def wait(self, key: str) -> dict[str, Any] | None:
+        """The leader's result, ``None`` if it is gone, or its ``JobFailed``."""
+        while True:
+            record = self.store.get(key)
+            if record is None or record.get("expiresAt", 0.0) <= time.time():
+                return None
+            if record["status"] == SUCCEEDED:
+                self._count("coalesced")
+                return record["result"]
+            if record["status"] == FAILED:
+                self._count("coalesced")
+                error = record["error"]
+                raise JobFailed(error["statusCode"], error["detail"])
+            time.sleep(self.poll_seconds)
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "led": self.led,
+            "coalesced": self.coalesced,
+            "takeovers": self.takeovers,
+            "leaseSeconds": self.lease_seconds,
+            "lingerSeconds": self.linger_seconds,
+        }
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import ast
+import inspect
+import re
+import textwrap
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable
+
+from analysis_context import AnalysisContext, ScopedState, analysis_scope
+from note_event_provider import NoteEventProvider, resolve_provider
+
+IMPORT_LINE = re.compile(
+    r"^[ \t]*(?:from[ \t]+(?P<module>[\w]+)[ \t]+import\b"
+    r"|import[ \t]+(?P<names>[\w \t,]+)$)",
+    re.MULTILINE,
+)
+
+WindowCallback = Callable[[str, int, int, list[list[dict[str, Any]]]], None]
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    implementation: str
+
+
+@dataclass
+class ResolvedPipeline:
+    """The V73 chain flattened into the stages that actually run.
+
+    Each ``modal_analyzer_vNN.analyze_audio_file`` only clears its own
+    diagnostics, calls further down the chain and then post-processes the
+    result in ``finalize_result``. The resolved pipeline walks that chain once,
+    runs the V29 core and the V30 key pass directly on a single extraction,
+    and then applies every layer's finalizer bottom-up, so a request no longer
+    extracts and groups its notes twice or unwinds forty wrapper frames.
+    """
+
+    top: ModuleType
+    layers: list[ModuleType]
+    core: ModuleType
+    key_layer: ModuleType
+    validators: list[Callable[[str], None]] = field(default_factory=list)
+    stages: list[Stage] = field(default_factory=list)
+    # Layers whose finalizers this pipeline leaves out, and scoped state
+    # values (such as V62/V63 search budgets) set in every part's context.
+    skipped_finalizers: frozenset[str] = frozenset()
+    scoped_overrides: list[tuple[ScopedState, dict[str, Any]]] = field(default_factory=list)
+
+    @property
+    def finalizers(self) -> list[ModuleType]:
+        return [
+            layer
+            for layer in reversed(self.layers)
+            if hasattr(layer, "finalize_result")
+            and layer.__name__ not in self.skipped_finalizers
+        ]
+
+    def stage_list(self) -> list[dict[str, str]]:
+        return [
+            {"stage": stage.name, "implementation": stage.implementation}
+            for stage in self.stages
+        ]
+
+    def analyze(
+        self,
+        audio_path: str,
+        transcription_type: str,
+        provider: NoteEventProvider | None = None,
+    ) -> dict[str, Any]:
+        return self.analyze_parts(audio_path, [transcription_type], provider)[
+            transcription_type
+        ]
+
+    def analyze_parts(
+        self,
+        audio_path: str,
+        transcription_types: list[str],
+        provider: NoteEventProvider | None = None,
+        on_window: WindowCallback | None = None,
+    ) -> dict[str, dict[str, Any]]:
+        """Analyze several parts of one recording from a single extraction.
+
+        Inference and note-event parsing do not depend on the part, so they
+        run once. Cleaning and grouping apply part-specific playability,
+        strength and chord-size limits and run per part, as do the key pass,
+        the beam mapping and every finalizer (V72's register gate and V73's
+        learned handoff included). Each part gets its own
+        ``AnalysisContext``, so the results match separate single-part runs.
+
+        ``on_window(part, phrase_index, window_index, groups)`` receives each
+        harmonic window's mapped groups as the core maps it. Those groups
+        precede the finalizers, which may still rewrite the part's events.
+        """
+        for transcription_type in transcription_types:
+            for validate in self.validators:
+                validate(transcription_type)
+
+        provider = resolve_provider(provider, audio_path)
+        extracted = self.core.extract_note_events(provider.note_events())
+        results: dict[str, dict[str, Any]] = {}
+        for transcription_type in transcription_types:
+            # A fresh context replaces the per-layer diagnostics ``clear()``
+            # calls the wrapped chain makes on its way down.
+            with analysis_scope(AnalysisContext()):
+                for state, values in self.scoped_overrides:
+                    state.update(values)
+                cleaned, groups = self.core.group_extracted_notes(
+                    extracted,
+                    transcription_type,
+                )
+                self.key_layer.prepare_key_context(groups)
+                result = self.core.map_onset_groups(
+                    extracted,
+                    cleaned,
+                    groups,
+                    transcription_type,
+                    on_window=(
+                        partial(on_window, transcription_type)
+                        if on_window is not None
+                        else None
+                    ),
+                )
+                for layer in self.finalizers:
+                    result = layer.finalize_result(
+                        result,
+                        audio_path,
+                        transcription_type,
+                        provider,
+                    )
+            results[transcription_type] = result
+        return results
+
+    def render_tab(self, groups: list[list[dict[str, Any]]], transcription_type: str) -> str:
+        return self.core.engine.create_tab(groups, transcription_type)
+
+
+def delegate_call(module: ModuleType) -> list[str] | None:
+    """Return the attribute chain ``analyze_audio_file`` delegates to, if any."""
+    source = textwrap.dedent(inspect.getsource(module.analyze_audio_file))
+    for node in ast.walk(ast.parse(source)):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr == "analyze_audio_file"
+        ):
+            continue
+        names: list[str] = []
+        target = node.func.value
+        while isinstance(target, ast.Attribute):
+            names.append(target.attr)
+            target = target.value
+        if isinstance(target, ast.Name):
+            names.append(target.id)
+            return list(reversed(names))
+    return None
+
+
+def resolve_layers(top: ModuleType) -> list[ModuleType]:
+    """Walk the delegation chain from ``top`` down to the mapping core."""
+    layers = [top]
+    while (chain := delegate_call(layers[-1])) is not None:
+        module: Any = layers[-1]
+        for name in chain:
+            module = getattr(module, name)
+        if not isinstance(module, ModuleType) or module in layers:
+            raise RuntimeError(
+                f"{layers[-1].__name__} delegates to an unexpected target: "
+                f"{'.'.join(chain)}"
+            )
+        layers.append(module)
+    return layers
+
+
+def qualified(function: Any) -> str:
+    return f"{function.__module__}.{function.__qualname__}"
+
+
+def build_resolved_pipeline(top: ModuleType) -> ResolvedPipeline:
+    layers = resolve_layers(top)
+    core = layers[-1]
+    if not hasattr(core, "map_onset_groups"):
+        raise RuntimeError(f"{core.__name__} is not a V29-style mapping core")
+    key_layers = [layer for layer in layers if hasattr(layer, "prepare_key_context")]
+    if len(key_layers) != 1:
+        raise RuntimeError("Expected exactly one key-context layer in the chain")
+
+    v25 = core.v25
+    stages = [
+        Stage("extract", qualified(core.engine.extract_note_event)),
+        Stage("clean", qualified(core.base.clean_detected_notes)),
+        Stage("group", qualified(core.base.guitarist_group_notes)),
+        Stage("key", qualified(key_layers[0].prepare_key_context)),
+        Stage("phrase", qualified(core.engine.split_phrases)),
+        Stage("window", qualified(core.split_harmonic_windows)),
+        Stage("candidates", qualified(v25.all_group_assignments)),
+        Stage("beam", qualified(v25.build_phrase_paths)),
+    ]
+    stages.extend(
+        Stage(f"finalize:{layer.__name__}", qualified(layer.finalize_result))
+        for layer in reversed(layers)
+        if hasattr(layer, "finalize_result")
+    )
+    validators = [
+        layer.validate_transcription_type
+        for layer in layers
+        if hasattr(layer, "validate_transcription_type")
+    ]
+    return ResolvedPipeline(
+        top=top,
+        layers=layers,
+        core=core,
+        key_layer=key_layers[0],
+        validators=validators,
+        stages=stages,
+    )
+
+
+def local_source_modules(entry_file: str) -> list[str]:
+    """Analyzer-directory modules reachable from ``entry_file``'s imports.
+
+    Import lines are scanned textually (including function-local imports) so a
+    deploy ships exactly what the entry module can import, independent of
+    whatever else the deploying process has already loaded.
+    """
+    root = Path(entry_file).resolve().parent
+    pending = [Path(entry_file).resolve().stem]
+    found: set[str] = set()
+    while pending:
+        name = pending.pop()
+        path = root / f"{name}.py"
+        if name in found or not path.is_file():
+            continue
+        found.add(name)
+        for match in IMPORT_LINE.finditer(path.read_text(encoding="utf-8")):
+            if match.group("module"):
+                pending.append(match.group("module"))
+            else:
+                pending.extend(
+                    alias.split(" as ")[0].strip()
+                    for alias in match.group("names").split(",")
+                )
+    return sorted(found)
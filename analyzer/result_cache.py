@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+try:
+    from inference_cache import evict_least_recently_used
+except ImportError:
+    from analyzer.inference_cache import evict_least_recently_used
+
+
+RESULT_FORMAT_VERSION = 1
+DEFAULT_RESULT_CACHE_DIRECTORY = os.path.join(
+    tempfile.gettempdir(),
+    "dadrock-result-cache",
+)
+DEFAULT_MAX_RESULT_CACHE_BYTES = 256 * 1024 * 1024
+# Misses within this long of the last refresh skip it: a container serving
+# several inputs reloads its Volume at most this often.
+DEFAULT_REFRESH_INTERVAL_SECONDS = 10.0
+
+
+def result_cache_key(
+    audio_hash: str,
+    transcription_type: str,
+    engine_version: str,
+    context: dict[str, Any] | None = None,
+) -> str:
+    """Address one finished analysis by audio, part, engine and verified context.
+
+    Any change to ``engine_version`` produces a new key, so bumping
+    ``ENGINE_VERSION`` retires every stored result without a manual purge.
+    """
+    material = json.dumps(
+        {
+            "format": RESULT_FORMAT_VERSION,
+            "audio": audio_hash,
+            "part": transcription_type,
+            "engine": engine_version,
+            "context": context or {},
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """On-disk store of finished, JSON-safe analyzer results.
+
+    Entries are gzip-compressed JSON named by :func:`result_cache_key`. Like
+    the note-event cache, reads refresh the entry's modification time and
+    writes evict the least recently used entries beyond ``max_bytes``.
+
+    ``refresh`` is called on a miss before the entry is looked up once more,
+    at most once per ``refresh_interval`` seconds. A directory shared between
+    containers passes its reload there, so entries other containers stored
+    since the last reload are found.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        max_bytes: int | None = None,
+        refresh: Callable[[], None] | None = None,
+        refresh_interval: float = DEFAULT_REFRESH_INTERVAL_SECONDS,
+    ) -> None:
+        self.directory = Path(
+            directory
+            or os.environ.get("ANALYZER_RESULT_CACHE_DIR")
+            or DEFAULT_RESULT_CACHE_DIRECTORY
+        )
+        self.max_bytes = int(
+            max_bytes
+            if max_bytes is not None
+            else os.environ.get("ANALYZER_RESULT_CACHE_MAX_BYTES")
+            or DEFAULT_MAX_RESULT_CACHE_BYTES
+        )
+        self.refresh = refresh
+        self.refresh_interval = float(refresh_interval)
+        self._refresh_lock = threading.Lock()
+        self._refreshed_at: float | None = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"{key}.json.gz"
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        result = self._read(key)
+        if result is None and self._refresh_due():
+            result = self._read(key)
+        if result is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def _refresh_due(self) -> bool:
+        """Refresh unless another miss already did within ``refresh_interval``."""
+        if self.refresh is None:
+            return False
+        with self._refresh_lock:
+            now = time.monotonic()
+            if self._refreshed_at is not None and now - self._refreshed_at < self.refresh_interval:
+                return False
+            self._refreshed_at = now
+            self.refreshes += 1
+        self.refresh()
+        return True
+
+    def _read(self, key: str) -> dict[str, Any] | None:
+        path = self.path_for(key)
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                result = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError, EOFError):
+            return None
+        return result
+
+    def store(self, key: str, result: dict[str, Any]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.directory,
+            suffix=".partial",
+            delete=False,
+        ) as temporary_file:
+            with gzip.GzipFile(fileobj=temporary_file, mode="wb") as compressed:
+                compressed.write(
+                    json.dumps(result, separators=(",", ":")).encode("utf-8")
+                )
+            temporary_path = temporary_file.name
+        os.replace(temporary_path, self.path_for(key))
+        self.evict()
+
+    def evict(self) -> None:
+        self.evictions += evict_least_recently_used(
+            self.directory,
+            "*.json.gz",
+            self.max_bytes,
+        )
+
+    def diagnostics(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refreshIntervalSeconds": self.refresh_interval,
+            "evictions": self.evictions,
+            "maxBytes": self.max_bytes,
+        }
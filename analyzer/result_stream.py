@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import copy
+import json
+import queue
+import threading
+import time
+from typing import Any, Callable, Generator
+
+try:
+    from resolved_pipeline import WindowCallback
+except ImportError:
+    from analyzer.resolved_pipeline import WindowCallback
+
+RenderTab = Callable[[list[list[dict[str, Any]]], str], str]
+
+_DONE = object()
+
+
+class StreamClosed(Exception):
+    """Raised inside the analysis thread once the client has gone away."""
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class ProgressiveStream:
+    """Turn one analyzer run into records as the core maps each window.
+
+    ``run`` starts the analysis in a worker thread and yields a ``window``
+    record for every harmonic window the mapping core settles, in song order
+    per part, with its mapped groups and its tab system. These are
+    provisional: the version layers finalize the whole result afterwards,
+    and the record carrying that result holds the authoritative
+    ``generatedTab``. The analysis' return value is the generator's return
+    value, for ``yield from``.
+
+    ``first_measure_seconds`` is the time from ``started`` to the first
+    window record: how long a user waits before any tab appears.
+    """
+
+    def __init__(self, render_tab: RenderTab, started: float | None = None) -> None:
+        self.render_tab = render_tab
+        self.started = time.perf_counter() if started is None else started
+        self.first_measure_seconds: float | None = None
+        self.window_records = 0
+
+    def elapsed(self) -> float:
+        return round(time.perf_counter() - self.started, 4)
+
+    def run(
+        self,
+        analyze: Callable[[WindowCallback], Any],
+    ) -> Generator[dict[str, Any], None, Any]:
+        records: queue.Queue[Any] = queue.Queue()
+        closed = threading.Event()
+        outcome: dict[str, Any] = {}
+
+        def on_window(
+            transcription_type: str,
+            phrase_index: int,
+            window_index: int,
+            groups: list[list[dict[str, Any]]],
+        ) -> None:
+            if closed.is_set():
+                raise StreamClosed()
+            records.put(
+                {
+                    "type": "window",
+                    "transcriptionType": transcription_type,
+                    "phraseIndex": phrase_index,
+                    "windowIndex": window_index,
+                    # Copied: the finalizers keep editing these events.
+                    "groups": copy.deepcopy(groups),
+                    "tab": self.render_tab(groups, transcription_type),
+                    "elapsedSeconds": self.elapsed(),
+                }
+            )
+
+        def work() -> None:
+            try:
+                outcome["value"] = analyze(on_window)
+            except StreamClosed:
+                pass
+            except BaseException as error:  # re-raised in the consuming thread
+                records.put(_Failure(error))
+            finally:
+                records.put(_DONE)
+
+        worker = threading.Thread(target=work, name="progressive-stream", daemon=True)
+        worker.start()
+        try:
+            while (item := records.get()) is not _DONE:
+                if isinstance(item, _Failure):
+                    raise item.error
+                if self.first_measure_seconds is None:
+                    self.first_measure_seconds = item["elapsedSeconds"]
+                self.window_records += 1
+                yield item
+        finally:
+            # A disconnected client stops the analysis at its next window.
+            closed.set()
+        return outcome.get("value")
+
+
+def ndjson_line(record: dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), default=str) + "\n"
+
+
+def sse_event(record: dict[str, Any]) -> str:
+    data = json.dumps(record, separators=(",", ":"), default=str)
+    return f"event: {record.get('type', 'message')}\ndata: {data}\n\n"
+
+
+STREAM_FORMATS: dict[str, tuple[str, Callable[[dict[str, Any]], str]]] = {
+    "ndjson": ("application/x-ndjson", ndjson_line),
+    "sse": ("text/event-stream", sse_event),
+}